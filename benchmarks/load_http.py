@@ -0,0 +1,504 @@
+"""Load test of the streamable HTTP transport against the fake Kaiten API.
+
+For each auth mode (``none``, ``shared``, ``oauth``) the harness starts the
+fake Kaiten API and ``kaiten-mcp-http`` as subprocesses on free local ports,
+then runs ``--clients`` concurrent MCP clients for ``--duration`` seconds.
+Every client sends ``initialize`` once and then picks operations from
+``--mix`` (``initialize``, ``list_tools`` or a tool name) by weight. In
+``oauth`` mode each client first onboards through ``/register``,
+``/authorize`` and ``/token`` with its own Kaiten token, so the fake API
+treats it as a separate user and the server as a separate tenant.
+
+    python benchmarks/load_http.py                          # all modes, 50 clients, 20 s
+    python benchmarks/load_http.py --mode oauth --clients 200 --duration 60
+    python benchmarks/load_http.py --mix list_tools=1,kaiten_get_card=5
+
+Reported per mode: requests/s, p50/p95/p99 latency (overall and per
+operation), errors, the server's event loop lag and its resident memory
+before, at peak and after the run; the last two are read from ``/metrics``.
+The client's rate limiter is opened up unless ``KAITEN_RATE_LIMIT_RPS`` is
+set, so the numbers describe the transport rather than the 5 req/s Kaiten
+budget. The generator shares one event loop too: if its own CPU is
+saturated, spread the clients over several runs or machines.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import platform
+import random
+import re
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+from mcp.types import LATEST_PROTOCOL_VERSION
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = HERE / "load_results.json"
+DEFAULT_MIX = (
+    "initialize=1,list_tools=2,kaiten_get_card=4,kaiten_list_cards=2,kaiten_list_spaces=1"
+)
+MODES = ("none", "shared", "oauth")
+SHARED_TOKEN = "load-shared-token"
+REDIRECT_URI = "http://127.0.0.1/callback"
+FORMAT_VERSION = 1
+
+_METRIC_LINE_RE = re.compile(r'^(\w+)(?:\{le="([^"]+)"\})? (\S+)$')
+
+
+class LoadError(Exception):
+    """A request that did not produce a successful MCP result."""
+
+    def __init__(self, kind: str):
+        super().__init__(kind)
+        self.kind = kind
+
+
+@dataclass
+class Recorder:
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: Counter[str] = field(default_factory=Counter)
+
+    def add(self, operation: str, seconds: float, error: str | None = None) -> None:
+        self.latencies.setdefault(operation, []).append(seconds)
+        if error is not None:
+            self.errors[f"{operation}: {error}"] += 1
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name:
+            mix[name] = float(weight or 1)
+    if not mix or any(weight < 0 for weight in mix.values()) or not sum(mix.values()):
+        raise ValueError(f"invalid --mix: {value!r}")
+    return mix
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def _summary(values: list[float], duration: float) -> dict[str, Any]:
+    return {
+        "requests": len(values),
+        "rps": round(len(values) / duration, 1),
+        **{
+            f"p{int(q * 100)}_ms": round(percentile(values, q) * 1000, 2) if values else None
+            for q in (0.5, 0.95, 0.99)
+        },
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _spawn(entrypoint: str, args: list[str], env: dict[str, str], log: Any) -> subprocess.Popen:
+    module, function = entrypoint.split(":")
+    code = f"from {module} import {function}; {function}()"
+    return subprocess.Popen(
+        [sys.executable, "-c", code, *args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=log,
+    )
+
+
+async def _wait_ready(http: httpx.AsyncClient, url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if (await http.get(url)).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready")
+
+
+def _server_env(mode: str, port: int, upstream: str) -> dict[str, str]:
+    env = dict(os.environ)
+    for name in (
+        "MCP_HTTP_BASE_PATH",
+        "MCP_METRICS_TOKEN",
+        "MCP_PUBLIC_URL",
+        "MCP_OAUTH_ISSUER_URL",
+        "MCP_RESOURCE_METADATA_URL",
+        "MCP_ALLOWED_ORIGINS",
+        "KAITEN_SUBDOMAIN",
+        "KAITEN_DOMAIN",
+        "KAITEN_BASE_DOMAIN",
+    ):
+        env.pop(name, None)
+    env.update(
+        {
+            "MCP_HTTP_HOST": "127.0.0.1",
+            "MCP_HTTP_PORT": str(port),
+            "MCP_HTTP_AUTH_MODE": mode,
+            "KAITEN_BASE_URL": upstream,
+            "KAITEN_TOKEN": "load-token",
+        }
+    )
+    env.setdefault("LOG_LEVEL", "WARNING")
+    env.setdefault("KAITEN_RATE_LIMIT_RPS", "100000")
+    env.setdefault("KAITEN_RATE_LIMIT_BURST", "1000")
+    if mode == "shared":
+        env["MCP_AUTH_TOKEN"] = SHARED_TOKEN
+    else:
+        env.pop("MCP_AUTH_TOKEN", None)
+    if mode == "oauth":
+        del env["KAITEN_TOKEN"]  # every user brings their own
+    return env
+
+
+async def _oauth_token(http: httpx.AsyncClient, base: str, kaiten_token: str) -> str:
+    registered = await http.post(f"{base}/register", json={"redirect_uris": [REDIRECT_URI]})
+    client_id = registered.raise_for_status().json()["client_id"]
+    verifier = secrets.token_urlsafe(48)
+    challenge = base64.urlsafe_b64encode(hashlib.sha256(verifier.encode()).digest())
+    authorized = await http.post(
+        f"{base}/authorize",
+        data={
+            "client_id": client_id,
+            "redirect_uri": REDIRECT_URI,
+            "code_challenge": challenge.decode().rstrip("="),
+            "code_challenge_method": "S256",
+            "kaiten_subdomain": "load",
+            "kaiten_token": kaiten_token,
+        },
+    )
+    if authorized.status_code != 302:
+        raise RuntimeError(f"OAuth authorize failed with HTTP {authorized.status_code}")
+    code = parse_qs(urlsplit(authorized.headers["location"]).query)["code"][0]
+    issued = await http.post(
+        f"{base}/token",
+        data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "client_id": client_id,
+            "redirect_uri": REDIRECT_URI,
+            "code_verifier": verifier,
+        },
+    )
+    return str(issued.raise_for_status().json()["access_token"])
+
+
+class McpClient:
+    """Minimal JSON-RPC client for the stateless, JSON-response MCP endpoint."""
+
+    def __init__(self, http: httpx.AsyncClient, url: str, token: str | None):
+        self.http = http
+        self.url = url
+        self.headers = {
+            "Accept": "application/json, text/event-stream",
+            "Content-Type": "application/json",
+            "MCP-Protocol-Version": LATEST_PROTOCOL_VERSION,
+        }
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        self._ids = iter(range(1, sys.maxsize))
+
+    async def request(self, method: str, params: dict[str, Any]) -> Any:
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+        response = await self.http.post(self.url, json=payload, headers=self.headers)
+        if response.status_code != 200:
+            raise LoadError(f"HTTP {response.status_code}")
+        body = response.json()
+        if "error" in body:
+            raise LoadError(f"JSON-RPC {body['error'].get('code')}")
+        if body["result"].get("isError"):
+            text = body["result"]["content"][0].get("text", "")
+            raise LoadError(f"tool error: {text.split(':', 1)[0]}")
+        return body["result"]
+
+    async def initialize(self) -> None:
+        await self.request(
+            "initialize",
+            {
+                "protocolVersion": LATEST_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "kaiten-mcp-load", "version": "1"},
+            },
+        )
+        payload = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+        await self.http.post(self.url, json=payload, headers=self.headers)
+
+
+def _arguments(tool: str, rng: random.Random, card_ids: list[int]) -> dict[str, Any]:
+    if tool == "kaiten_get_card":
+        return {"card_id": rng.choice(card_ids)}
+    if tool == "kaiten_list_cards":
+        return {"limit": 20, "offset": rng.randrange(0, max(1, len(card_ids) - 20))}
+    return {}
+
+
+async def _operate(client: McpClient, operation: str, rng: random.Random, cards: list[int]):
+    if operation == "initialize":
+        await client.initialize()
+    elif operation == "list_tools":
+        await client.request("tools/list", {})
+    else:
+        arguments = _arguments(operation, rng, cards)
+        await client.request("tools/call", {"name": operation, "arguments": arguments})
+
+
+async def _virtual_client(
+    client: McpClient,
+    rng: random.Random,
+    mix: dict[str, float],
+    card_ids: list[int],
+    deadline: float,
+    recorder: Recorder,
+) -> None:
+    operations, weights = list(mix), list(mix.values())
+    operation = "initialize"
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        error = None
+        try:
+            await _operate(client, operation, rng, card_ids)
+        except LoadError as e:
+            error = e.kind
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        recorder.add(operation, time.perf_counter() - started, error)
+        operation = rng.choices(operations, weights)[0]
+
+
+def _parse_metrics(text: str) -> dict[str, Any]:
+    values: dict[str, Any] = {"lag_buckets": {}}
+    for line in text.splitlines():
+        match = _METRIC_LINE_RE.match(line)
+        if not match:
+            continue
+        name, le, value = match.groups()
+        if name == "kaiten_mcp_event_loop_lag_seconds_bucket":
+            values["lag_buckets"][float(le)] = float(value)
+        elif name in {
+            "kaiten_mcp_event_loop_lag_seconds_sum",
+            "kaiten_mcp_event_loop_lag_seconds_count",
+            "process_resident_memory_bytes",
+        }:
+            values[name] = float(value)
+    return values
+
+
+def _loop_lag(before: dict[str, Any], after: dict[str, Any]) -> dict[str, Any]:
+    """Mean and bucket-bounded p99 of the lag probes taken between two scrapes."""
+    count_key, sum_key = (
+        "kaiten_mcp_event_loop_lag_seconds_count",
+        "kaiten_mcp_event_loop_lag_seconds_sum",
+    )
+    count = after.get(count_key, 0) - before.get(count_key, 0)
+    if not count:
+        return {"probes": 0, "mean_ms": None, "p99_le_ms": None}
+    p99 = None
+    for bound, cumulative in sorted(after["lag_buckets"].items()):
+        if cumulative - before["lag_buckets"].get(bound, 0) >= 0.99 * count:
+            p99 = bound
+            break
+    return {
+        "probes": int(count),
+        "mean_ms": round((after[sum_key] - before.get(sum_key, 0)) / count * 1000, 2),
+        "p99_le_ms": p99 * 1000 if p99 is not None and p99 != float("inf") else None,
+    }
+
+
+async def run_mode(mode: str, args: argparse.Namespace, mix: dict[str, float]) -> dict[str, Any]:
+    fake_port, server_port = _free_port(), _free_port()
+    upstream = f"http://127.0.0.1:{fake_port}"
+    base = f"http://127.0.0.1:{server_port}"
+    fake_args = [f"--port={fake_port}", f"--cards={args.cards}"]
+    fake_args.append(f"--latency={args.upstream_latency}")
+    with tempfile.TemporaryFile("w+") as log:
+        processes = [
+            _spawn("kaiten_mcp.fake_kaiten:main", fake_args, dict(os.environ), log),
+            _spawn(
+                "kaiten_mcp.http_server:main", [], _server_env(mode, server_port, upstream), log
+            ),
+        ]
+        try:
+            return await _drive(mode, args, mix, base, upstream, processes)
+        except Exception:
+            log.seek(0)
+            sys.stderr.write(log.read())
+            raise
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait(timeout=10)
+
+
+async def _drive(
+    mode: str,
+    args: argparse.Namespace,
+    mix: dict[str, float],
+    base: str,
+    upstream: str,
+    processes: list[subprocess.Popen],
+) -> dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.clients + 10)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as http:
+        await _wait_ready(http, f"{upstream}/__fake__/stats", processes[0])
+        await _wait_ready(http, f"{base}/healthz", processes[1])
+        listing = await http.get(
+            f"{upstream}/api/latest/cards",
+            params={"limit": 100},
+            headers={"Authorization": "Bearer load-token"},
+        )
+        card_ids = [card["id"] for card in listing.json()]
+
+        onboarding = time.perf_counter()
+        if mode == "oauth":
+            tokens: list[str | None] = list(
+                await asyncio.gather(
+                    *(_oauth_token(http, base, f"load-user-{i}") for i in range(args.clients))
+                )
+            )
+        else:
+            tokens = [SHARED_TOKEN if mode == "shared" else None] * args.clients
+        onboarding = time.perf_counter() - onboarding
+
+        before = _parse_metrics((await http.get(f"{base}/metrics")).text)
+        peak_rss = before.get("process_resident_memory_bytes", 0.0)
+        recorder = Recorder()
+        started = time.monotonic()
+        deadline = started + args.duration
+        clients = [
+            _virtual_client(
+                McpClient(http, f"{base}/mcp/", token),
+                random.Random(args.seed + index),
+                mix,
+                card_ids,
+                deadline,
+                recorder,
+            )
+            for index, token in enumerate(tokens)
+        ]
+        load = asyncio.gather(*clients)
+        while not load.done():
+            await asyncio.wait([load], timeout=1.0)
+            sample = _parse_metrics((await http.get(f"{base}/metrics")).text)
+            peak_rss = max(peak_rss, sample.get("process_resident_memory_bytes", 0.0))
+        await load
+        elapsed = time.monotonic() - started
+        after = _parse_metrics((await http.get(f"{base}/metrics")).text)
+
+    every = [value for values in recorder.latencies.values() for value in values]
+    rss_before = before.get("process_resident_memory_bytes", 0.0)
+    rss_after = after.get("process_resident_memory_bytes", 0.0)
+    return {
+        "clients": args.clients,
+        "duration_s": round(elapsed, 2),
+        "oauth_onboarding_s": round(onboarding, 2) if mode == "oauth" else None,
+        **_summary(every, elapsed),
+        "errors": sum(recorder.errors.values()),
+        "error_kinds": dict(recorder.errors.most_common()),
+        "operations": {
+            name: _summary(values, elapsed) for name, values in sorted(recorder.latencies.items())
+        },
+        "event_loop_lag": _loop_lag(before, after),
+        "rss_mb": {
+            "before": round(rss_before / 2**20, 1),
+            "peak": round(max(peak_rss, rss_after) / 2**20, 1),
+            "after": round(rss_after / 2**20, 1),
+            "growth": round((rss_after - rss_before) / 2**20, 1),
+        },
+    }
+
+
+def _print(mode: str, result: dict[str, Any]) -> None:
+    lag, rss = result["event_loop_lag"], result["rss_mb"]
+    print(  # noqa: T201
+        f"{mode:7} {result['requests']:8} req {result['rps']:9.1f} req/s"
+        f"  p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms"
+        f"  errors {result['errors']}"
+        f"  loop lag mean {lag['mean_ms']} ms, p99 <= {lag['p99_le_ms']} ms"
+        f"  RSS {rss['before']} -> {rss['after']} MB (peak {rss['peak']}, {rss['growth']:+})",
+        flush=True,
+    )
+    for name, summary in result["operations"].items():
+        print(  # noqa: T201
+            f"    {name:24} {summary['requests']:8} {summary['rps']:9.1f} req/s"
+            f"  p50 {summary['p50_ms']}  p95 {summary['p95_ms']}  p99 {summary['p99_ms']} ms"
+        )
+    for kind, count in result["error_kinds"].items():
+        print(f"    ! {kind}: {count}")  # noqa: T201
+
+
+async def run(args: argparse.Namespace, mix: dict[str, float]) -> dict[str, Any]:
+    results: dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "mix": mix,
+        "upstream_latency_s": args.upstream_latency,
+        "modes": {},
+    }
+    for mode in args.mode or MODES:
+        result = await run_mode(mode, args, mix)
+        results["modes"][mode] = result
+        _print(mode, result)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--mode", action="append", choices=MODES, help="auth mode to test")
+    parser.add_argument("--clients", type=int, default=50, help="concurrent MCP clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per mode")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation=weight,...")
+    parser.add_argument("--cards", type=int, default=2_000, help="cards in the fake API")
+    parser.add_argument(
+        "--upstream-latency", type=float, default=0.02, help="fake API latency, seconds"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "--max-error-rate", type=float, default=0.01, help="fail above this share of errors"
+    )
+    args = parser.parse_args()
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = asyncio.run(run(args, mix))
+    args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    failed = [
+        mode
+        for mode, result in results["modes"].items()
+        if result["errors"] > args.max_error_rate * max(1, result["requests"])
+    ]
+    if failed:
+        print(f"Error rate above {args.max_error_rate:.0%} in: {', '.join(failed)}")  # noqa: T201
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""End-to-end benchmarks of the tool-call path against the fake Kaiten API.
+
+Every benchmark runs in-process: ``runtime.call_tool`` talks to
+``kaiten_mcp.fake_kaiten`` through an ASGI transport, so the numbers cover
+argument handling, the client (limiter, retries, pagination), compaction and
+serialization, but no network. The client's rate limiter is opened up and the
+response cache and result store disabled so that repeated runs measure the
+same work and full results come back. Every run checks the size of what it
+returned, so a benchmark cannot silently measure a truncated result.
+
+    python benchmarks/run.py                 # run all and compare with baseline.json
+    python benchmarks/run.py --save          # run all and rewrite baseline.json
+    python benchmarks/run.py --only 'list_all_cards.*' --repeat 3
+
+Results are written as JSON to ``--output``. A benchmark whose median time is
+more than ``--threshold`` (default 25%) above its baseline fails the run.
+Baselines are machine-specific: refresh them with ``--save`` on the machine
+that runs the comparison.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+os.environ.update(
+    {
+        "KAITEN_BASE_URL": "http://fake-kaiten.local",
+        "KAITEN_TOKEN": "benchmark-token",
+        "KAITEN_MCP_CACHE": "0",
+        "KAITEN_MCP_RESULT_STORE": "0",
+        "LOG_LEVEL": "WARNING",
+    }
+)
+for _name in ("KAITEN_MCP_OUTPUT_DIR", "KAITEN_MCP_PROFILE", "KAITEN_MCP_TRACE_FILE"):
+    os.environ.pop(_name, None)
+
+from kaiten_mcp import runtime  # noqa: E402 - configured through the environment above
+from kaiten_mcp.client import KaitenClient  # noqa: E402
+from kaiten_mcp.fake_kaiten import FakeKaitenConfig, attach, create_fake_kaiten_app  # noqa: E402
+from kaiten_mcp.ratelimit import RateLimiter  # noqa: E402
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_BASELINE = HERE / "baseline.json"
+DEFAULT_OUTPUT = HERE / "results.json"
+DEFAULT_THRESHOLD = 0.25
+FORMAT_VERSION = 1
+
+
+@dataclass
+class Benchmark:
+    name: str
+    config: FakeKaitenConfig
+    # Runs one measured unit; returns the number of items it processed
+    run: Callable[[Any], Awaitable[int]]
+    repeat: int = 5
+    description: str = ""
+
+
+def _new_client(app: Any) -> KaitenClient:
+    limiter = RateLimiter("benchmark", rate=1_000_000, burst=8, adaptive=False)
+    return attach(KaitenClient(rate_limiter=limiter), app)
+
+
+async def _call(name: str, arguments: dict[str, Any]) -> str:
+    result = await runtime.call_tool(name, arguments)
+    text = str(getattr(result.content[0], "text", ""))
+    if result.isError:
+        raise RuntimeError(f"{name} failed: {text}")
+    return text
+
+
+def _concurrent_calls(
+    name: str, arguments: Callable[[Any, int], dict[str, Any]], calls: int
+) -> Callable[[Any], Awaitable[int]]:
+    async def run(app: Any) -> int:
+        semaphore = asyncio.Semaphore(8)
+
+        async def one(index: int) -> None:
+            async with semaphore:
+                await _call(name, arguments(app, index))
+
+        await asyncio.gather(*(one(index) for index in range(calls)))
+        return calls
+
+    return run
+
+
+def _single_call(
+    name: str, arguments: Callable[[Any], dict[str, Any]], items: int
+) -> Callable[[Any], Awaitable[int]]:
+    async def run(app: Any) -> int:
+        result = json.loads(await _call(name, arguments(app)))
+        if not isinstance(result, list) or len(result) != items:
+            returned = len(result) if isinstance(result, list) else type(result).__name__
+            raise RuntimeError(f"{name} returned {returned}, expected {items} items")
+        return items
+
+    return run
+
+
+def _serialize(cards: int) -> Callable[[Any], Awaitable[int]]:
+    sizes: list[int] = []
+
+    async def run(app: Any) -> int:
+        payload = app.state.store.collections["/cards"][:cards]
+        text = runtime._serialize_result("kaiten_list_all_cards", payload)
+        size = len(text.encode())
+        if not sizes:  # the warm-up run checks the output is the full array
+            returned, _ = json.JSONDecoder().raw_decode(text)  # ignore the omitted-fields note
+            if not isinstance(returned, list) or len(returned) != cards:
+                raise RuntimeError(f"serialized output is not the {cards} cards")
+            sizes.append(size)
+        elif size != sizes[0]:
+            raise RuntimeError(f"serialized {size} bytes, the warm-up run gave {sizes[0]}")
+        return size
+
+    return run
+
+
+def _max_pages(pages: int) -> Callable[[Any], dict[str, Any]]:
+    return lambda app: {"max_pages": pages}
+
+
+def _first_id(app: Any, collection: str) -> int:
+    return int(app.state.store.collections[collection][0]["id"])
+
+
+BENCHMARKS = [
+    Benchmark(
+        "call_tool.get_card",
+        FakeKaitenConfig(cards=200),
+        _concurrent_calls(
+            "kaiten_get_card", lambda app, i: {"card_id": _first_id(app, "/cards") + i}, 200
+        ),
+        description="200 single-card calls, 8 in flight",
+    ),
+    Benchmark(
+        "call_tool.list_spaces",
+        FakeKaitenConfig(spaces=20, cards=0),
+        _concurrent_calls("kaiten_list_spaces", lambda app, i: {}, 200),
+        description="200 space listings, 8 in flight",
+    ),
+    Benchmark(
+        "call_tool.list_cards",
+        FakeKaitenConfig(cards=1_000),
+        _concurrent_calls(
+            "kaiten_list_cards", lambda app, i: {"limit": 50, "offset": i * 10}, 100
+        ),
+        description="100 card pages of 50, 8 in flight",
+    ),
+    *(
+        Benchmark(
+            f"list_all_cards.{size // 1000}k",
+            FakeKaitenConfig(spaces=2, cards=size),
+            _single_call("kaiten_list_all_cards", _max_pages(size // 100 + 1), size),
+            repeat=5 if size < 20_000 else 3,
+            description=f"kaiten_list_all_cards over {size} cards",
+        )
+        for size in (1_000, 5_000, 20_000)
+    ),
+    Benchmark(
+        "get_all_space_activity.50k",
+        FakeKaitenConfig(spaces=1, cards=0, activity_per_space=50_000),
+        _single_call(
+            "kaiten_get_all_space_activity",
+            lambda app: {"space_id": _first_id(app, "/spaces"), "max_pages": 501},
+            50_000,
+        ),
+        repeat=3,
+        description="kaiten_get_all_space_activity over 50k events",
+    ),
+    Benchmark(
+        "get_tree.documents",
+        FakeKaitenConfig(spaces=50, cards=0, documents=5_000),
+        _single_call("kaiten_get_tree", lambda app: {}, 134),
+        description="kaiten_get_tree with 5000 documents (the tool reads up to 500, 134 roots)",
+    ),
+    *(
+        Benchmark(
+            f"serialize_result.{size // 1000}k_cards",
+            FakeKaitenConfig(cards=size),
+            _serialize(size),
+            description=f"_serialize_result on {size} full cards (items = output bytes)",
+        )
+        for size in (5_000, 20_000)
+    ),
+]
+
+
+async def _measure(benchmark: Benchmark, repeat: int) -> dict[str, Any]:
+    app = create_fake_kaiten_app(benchmark.config)
+    client = _new_client(app)
+    previous, runtime._client = runtime._client, client
+    try:
+        items = await benchmark.run(app)  # warm-up, also validates the scenario
+        warmup_requests = app.state.stats["requests"]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            items = await benchmark.run(app)
+            timings.append(time.perf_counter() - started)
+    finally:
+        runtime._client = previous
+        await client.close()
+    median = statistics.median(timings)
+    return {
+        "description": benchmark.description,
+        "runs": len(timings),
+        "median_s": round(median, 6),
+        "min_s": round(min(timings), 6),
+        "max_s": round(max(timings), 6),
+        "items": items,
+        "items_per_s": round(items / median, 1) if median else None,
+        "upstream_requests": (app.state.stats["requests"] - warmup_requests) // repeat,
+    }
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[tuple[str, float, float, float]]:
+    """Return ``(name, baseline_s, current_s, change)`` for regressions beyond ``threshold``."""
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if not reference or not reference.get("median_s"):
+            continue
+        change = current["median_s"] / reference["median_s"] - 1
+        if change > threshold:
+            regressions.append((name, reference["median_s"], current["median_s"], change))
+    return regressions
+
+
+async def run(selected: list[Benchmark], repeat: int | None) -> dict[str, Any]:
+    results: dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "benchmarks": {},
+    }
+    for benchmark in selected:
+        result = await _measure(benchmark, repeat or benchmark.repeat)
+        results["benchmarks"][benchmark.name] = result
+        print(  # noqa: T201
+            f"{benchmark.name:36} {result['median_s'] * 1000:10.1f} ms"
+            f"  ({result['items']} items, {result['upstream_requests']} upstream requests)",
+            flush=True,
+        )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--only", action="append", help="glob of benchmark names to run")
+    parser.add_argument("--repeat", type=int, help="measured runs per benchmark")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save", action="store_true", help="write results as the baseline")
+    args = parser.parse_args()
+
+    selected = [
+        benchmark
+        for benchmark in BENCHMARKS
+        if not args.only or any(fnmatch.fnmatchcase(benchmark.name, p) for p in args.only)
+    ]
+    if not selected:
+        parser.error("no benchmark matches --only")
+    results = asyncio.run(run(selected, args.repeat))
+
+    args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.save:
+        kept = {}
+        if args.baseline.exists():  # --only refreshes just the selected benchmarks
+            kept = json.loads(args.baseline.read_text(encoding="utf-8")).get("benchmarks", {})
+        baseline = {**results, "benchmarks": {**kept, **results["benchmarks"]}}
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")  # noqa: T201
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save to create one")  # noqa: T201
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after, change in regressions:
+        print(  # noqa: T201
+            f"REGRESSION {name}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms (+{change:.0%})"
+        )
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")  # noqa: T201
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""Per-tenant fair-share admission of tool calls in the shared HTTP server."""
+
+import asyncio
+import contextlib
+import os
+from collections import Counter, deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_TENANT_CONCURRENCY = 4
+DEFAULT_TENANT_QUEUE = 16
+
+
+class AdmissionRejected(Exception):
+    """The tenant already has as many tool calls queued as it is allowed."""
+
+    def __init__(self, tenant: str, queued: int):
+        self.tenant = tenant
+        self.queued = queued
+        super().__init__(f"too many queued tool calls for this user ({queued}), retry later")
+
+
+@dataclass
+class _Tenant:
+    weight: float
+    running: int = 0
+    finish: float = 0.0  # virtual finish tag of the last admitted call
+    queue: deque[asyncio.Future[None]] = field(default_factory=deque)
+
+
+def parse_weights(value: str) -> dict[str, float]:
+    """Parse ``"user-1=2,user-2=0.5"`` into a weight per tenant."""
+    weights = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        tenant, sep, weight = item.partition("=")
+        try:
+            parsed = float(weight) if sep else 0.0
+        except ValueError:
+            parsed = 0.0
+        if not tenant.strip() or parsed <= 0:
+            raise ValueError(
+                "KAITEN_MCP_TENANT_WEIGHTS must look like 'user=weight,...' with positive weights"
+            )
+        weights[tenant.strip()] = parsed
+    return weights
+
+
+class AdmissionController:
+    """Weighted fair queuing of tool calls keyed by tenant.
+
+    At most ``max_concurrency`` calls run at once overall and at most
+    ``tenant_concurrency`` per tenant. When a slot frees up it goes to the
+    waiting tenant with the smallest virtual finish tag (start-time fair
+    queuing): each admitted call advances its tenant's tag by ``1 / weight``,
+    so a tenant with a deep backlog cannot starve one that sends a single
+    call. A tenant that already has ``tenant_queue`` calls waiting is rejected
+    immediately with :class:`AdmissionRejected` instead of queueing further.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        tenant_concurrency: int = DEFAULT_TENANT_CONCURRENCY,
+        tenant_queue: int = DEFAULT_TENANT_QUEUE,
+        weights: dict[str, float] | None = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.tenant_concurrency = max(1, tenant_concurrency)
+        self.tenant_queue = max(0, tenant_queue)
+        self.weights = weights or {}
+        self._tenants: dict[str, _Tenant] = {}
+        self._running = 0
+        self._virtual_time = 0.0
+        self.counters: Counter[str] = Counter()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrency=int(
+                os.environ.get("KAITEN_MCP_MAX_CONCURRENT_CALLS", DEFAULT_MAX_CONCURRENCY)
+            ),
+            tenant_concurrency=int(
+                os.environ.get("KAITEN_MCP_TENANT_MAX_CONCURRENT", DEFAULT_TENANT_CONCURRENCY)
+            ),
+            tenant_queue=int(os.environ.get("KAITEN_MCP_TENANT_MAX_QUEUE", DEFAULT_TENANT_QUEUE)),
+            weights=parse_weights(os.environ.get("KAITEN_MCP_TENANT_WEIGHTS", "")),
+        )
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def queued(self, tenant: str) -> int:
+        state = self._tenants.get(tenant)
+        return len(state.queue) if state is not None else 0
+
+    @contextlib.asynccontextmanager
+    async def admit(self, tenant: str) -> AsyncIterator[None]:
+        """Hold one execution slot for ``tenant`` for the duration of the block."""
+        await self._acquire(tenant)
+        try:
+            yield
+        finally:
+            self._release(tenant)
+
+    async def _acquire(self, tenant: str) -> None:
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = _Tenant(weight=self.weights.get(tenant, 1.0))
+            self._tenants[tenant] = state
+        if not state.queue and self._can_run(state):
+            self._start(state)
+            return
+        if len(state.queue) >= self.tenant_queue:
+            self.counters["rejected"] += 1
+            self._forget_if_idle(tenant, state)
+            raise AdmissionRejected(tenant, len(state.queue))
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        state.queue.append(waiter)
+        self.counters["queued"] += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                if waiter in state.queue:
+                    state.queue.remove(waiter)
+                self._forget_if_idle(tenant, state)
+            else:
+                # Admitted just as the caller went away: hand the slot on
+                self._release(tenant)
+            raise
+
+    def _can_run(self, state: _Tenant) -> bool:
+        return self._running < self.max_concurrency and state.running < self.tenant_concurrency
+
+    def _start(self, state: _Tenant) -> None:
+        start = max(state.finish, self._virtual_time)
+        self._virtual_time = start
+        state.finish = start + 1.0 / state.weight
+        state.running += 1
+        self._running += 1
+        self.counters["admitted"] += 1
+
+    def _release(self, tenant: str) -> None:
+        state = self._tenants[tenant]
+        state.running -= 1
+        self._running -= 1
+        self._dispatch()
+        self._forget_if_idle(tenant, state)
+
+    def _dispatch(self) -> None:
+        while self._running < self.max_concurrency:
+            eligible = [
+                state
+                for state in self._tenants.values()
+                if state.queue and state.running < self.tenant_concurrency
+            ]
+            if not eligible:
+                return
+            state = min(eligible, key=lambda candidate: max(candidate.finish, self._virtual_time))
+            waiter = state.queue.popleft()
+            if waiter.done():
+                continue  # caller was cancelled and cleans up after itself
+            self._start(state)
+            waiter.set_result(None)
+
+    def _forget_if_idle(self, tenant: str, state: _Tenant) -> None:
+        # An idle tenant restarts at the current virtual time anyway
+        if not state.running and not state.queue and self._tenants.get(tenant) is state:
+            del self._tenants[tenant]
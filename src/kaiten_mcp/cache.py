@@ -0,0 +1,250 @@
+"""TTL response cache for rarely-changing Kaiten reference data.
+
+All clients of the process share one cache (see :func:`get_response_cache`),
+so ``KAITEN_MCP_CACHE_MAX_BYTES`` bounds the cached bytes of the whole server
+however many pooled clients are alive. Clients keep their entries apart by
+prefixing cache keys with their base URL and token hash.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+# Seconds a GET response stays fresh, keyed by the resource it returns
+# (the last collection segment of the path, e.g. /boards/{id}/columns -> columns).
+CACHE_TTLS: dict[str, float] = {
+    "spaces": 60.0,
+    "boards": 60.0,
+    "columns": 120.0,
+    "subcolumns": 120.0,
+    "lanes": 120.0,
+    "card-types": 300.0,
+    "custom-properties": 300.0,
+    "tags": 300.0,
+    "users": 300.0,
+}
+
+# Families without a TTL whose responses are still kept for conditional GETs:
+# large reads that rarely change. Bulk lists such as cards and activity are left
+# out so their pages do not push reference data out of the cache.
+REVALIDATED_FAMILIES: frozenset[str] = frozenset({"documents", "document-groups"})
+
+# Mutating one family also changes responses that embed it (a board embeds its
+# columns, lanes and cards), so those families are invalidated too.
+DEPENDENT_FAMILIES: dict[str, frozenset[str]] = {
+    "cards": frozenset({"boards"}),
+    "columns": frozenset({"boards"}),
+    "subcolumns": frozenset({"columns", "boards"}),
+    "lanes": frozenset({"boards"}),
+}
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+_COLLECTION_RE = re.compile(r"^[a-z][a-z-]*$")
+# Path segments that look like collections but only namespace or identify
+_NON_COLLECTIONS = frozenset({"company", "current"})
+
+
+def path_families(path: str) -> tuple[str, ...]:
+    """Return the collection segments of ``path`` in order.
+
+    Identifiers (numbers, UUIDs, card keys) and namespaces are skipped:
+    ``/company/custom-properties/5/select-values`` ->
+    ``("custom-properties", "select-values")``.
+    """
+    return tuple(
+        segment
+        for segment in path.split("?", 1)[0].split("/")
+        if _COLLECTION_RE.match(segment) and segment not in _NON_COLLECTIONS
+    )
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    size: int
+    families: frozenset[str]
+    expires_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def has_validators(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+
+class ResponseCache:
+    """Bounded LRU cache of decoded GET responses with per-resource TTLs.
+
+    Values are shared between callers and must be treated as read-only.
+    Each family carries a version that every mutation bumps, so a GET that
+    started before a mutation cannot store its (possibly stale) result.
+
+    Responses carrying validators (``ETag``/``Last-Modified``) are kept past
+    their TTL, and for the ``revalidated`` families without a TTL, so the
+    client can revalidate them with a conditional GET instead of downloading
+    them again.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: dict[str, float] | None = None,
+        revalidated: frozenset[str] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = CACHE_TTLS if ttls is None else ttls
+        self.revalidated = REVALIDATED_FAMILIES if revalidated is None else revalidated
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._versions: Counter[str] = Counter()
+        self.counters: Counter[str] = Counter()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache | None":
+        """Build the cache from ``KAITEN_MCP_CACHE*`` variables, or ``None`` if disabled."""
+        if os.environ.get("KAITEN_MCP_CACHE", "1").strip().lower() in {"0", "false", "off"}:
+            return None
+        return cls(
+            max_entries=int(os.environ.get("KAITEN_MCP_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_bytes=int(os.environ.get("KAITEN_MCP_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def ttl_for(self, path: str) -> float | None:
+        """Return the TTL for GET ``path``, or ``None`` when it is not cacheable."""
+        families = path_families(path)
+        return self.ttls.get(families[-1]) if families else None
+
+    def revalidates(self, path: str) -> bool:
+        """Whether GET ``path`` is kept without a TTL when it carries validators."""
+        families = path_families(path)
+        return bool(families) and families[-1] in self.revalidated
+
+    def version(self, path: str) -> tuple[int, ...]:
+        """Snapshot the versions of every family ``path`` depends on."""
+        return tuple(self._versions[family] for family in path_families(path))
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Return ``(True, value)`` for a fresh entry, ``(False, None)`` otherwise."""
+        entry = self.fresh(key)
+        return (False, None) if entry is None else (True, entry.value)
+
+    def fresh(self, key: Hashable) -> CacheEntry | None:
+        """Return the entry for ``key`` if it is fresh, counting the hit or miss."""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= self._clock():
+            if entry is not None and not entry.has_validators:
+                self._drop(key)
+            self.counters["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.counters["hits"] += 1
+        return entry
+
+    def validated(self, key: Hashable) -> CacheEntry | None:
+        """Return the entry for ``key`` if it can be revalidated, fresh or not."""
+        entry = self._entries.get(key)
+        return entry if entry is not None and entry.has_validators else None
+
+    def put(
+        self,
+        key: Hashable,
+        path: str,
+        value: Any,
+        size: int,
+        version: tuple[int, ...],
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Store ``value`` unless a mutation touched ``path`` since ``version`` was taken.
+
+        Paths without a TTL are stored only when validators are given and the
+        path is in a ``revalidated`` family; such entries are always stale and
+        are only served after a 304.
+        """
+        ttl = self.ttl_for(path)
+        if ttl is None and (
+            (etag is None and last_modified is None) or not self.revalidates(path)
+        ):
+            return
+        if version != self.version(path) or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        now = self._clock()
+        self._entries[key] = CacheEntry(
+            value=value,
+            size=size,
+            families=frozenset(path_families(path)),
+            expires_at=now + ttl if ttl is not None else now,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            self._drop(next(iter(self._entries)))
+            self.counters["evictions"] += 1
+
+    def invalidate(self, path: str) -> frozenset[str]:
+        """Drop entries affected by a mutation of ``path``; return the affected families."""
+        families = set(path_families(path))
+        for family in list(families):
+            families |= DEPENDENT_FAMILIES.get(family, frozenset())
+        for family in families:
+            self._versions[family] += 1
+        for key, entry in list(self._entries.items()):
+            if entry.families & families:
+                self._drop(key)
+                self.counters["invalidations"] += 1
+        return frozenset(families)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+_cache: ResponseCache | None = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Return the process-wide response cache, configured from the environment on first use."""
+    global _cache, _cache_loaded
+    with _cache_lock:
+        if not _cache_loaded:
+            _cache = ResponseCache.from_env()
+            _cache_loaded = True
+    return _cache
+
+
+def reset_response_cache() -> None:
+    global _cache, _cache_loaded
+    with _cache_lock:
+        _cache = None
+        _cache_loaded = False
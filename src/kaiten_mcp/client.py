@@ -4,17 +4,26 @@ import asyncio
 import contextlib
 import logging
 import os
+import time
+from collections import Counter
 from typing import Any
 from urllib.parse import urlsplit, urlunsplit
 
 import httpx
 
+from kaiten_mcp import metrics, tracing
+from kaiten_mcp.cache import CacheEntry, ResponseCache, get_response_cache, path_families
+from kaiten_mcp.deadline import remaining_seconds
+from kaiten_mcp.ratelimit import DEFAULT_RATE, RateLimiter, get_rate_limiter, token_key
+from kaiten_mcp.resilience import HALF_OPEN, decorrelated_jitter, get_upstream_guard
+
 logger = logging.getLogger(__name__)
 
 API_VERSION = "latest"
 DEFAULT_BASE_DOMAIN = "kaiten.ru"
-RATE_LIMIT_DELAY = 0.22  # ~4.5 req/s to stay under 5 req/s limit
-RETRY_DELAY = 2.0
+RATE_LIMIT_DELAY = 1 / DEFAULT_RATE  # steady-state spacing once the burst is spent
+RETRY_DELAY = 1.0  # base of the decorrelated-jitter backoff
+MAX_RETRY_DELAY = 30.0
 MAX_RETRIES = 3
 
 MISSING_HOST_CONFIG_ERROR = (
@@ -33,6 +42,44 @@ class KaitenApiError(Exception):
         super().__init__(f"HTTP {status_code}: {message}")
 
 
+class CircuitOpenError(KaitenApiError):
+    """Raised without contacting Kaiten while the upstream circuit is open or probing."""
+
+    def __init__(self, retry_after: float, *, probing: bool = False):
+        self.retry_after = retry_after
+        self.probing = probing
+        if probing:
+            message = (
+                "Kaiten API was failing and a probe request is checking whether it "
+                f"recovered; retry in up to {retry_after:.0f}s (circuit breaker half-open)"
+            )
+        else:
+            message = (
+                f"Kaiten API is failing, requests are paused for {retry_after:.0f}s "
+                "(circuit breaker open)"
+            )
+        super().__init__(503, message)
+
+
+class DeadlineExceeded(KaitenApiError):
+    """Raised when the call deadline passes before Kaiten answers."""
+
+    def __init__(self) -> None:
+        super().__init__(504, "Call deadline exceeded before Kaiten answered")
+
+
+async def _until_deadline(awaitable: Any) -> Any:
+    """Await ``awaitable`` within the current call deadline, if there is one."""
+    left = remaining_seconds()
+    if left is None:
+        return await awaitable
+    try:
+        async with asyncio.timeout(left):
+            return await awaitable
+    except TimeoutError as e:
+        raise DeadlineExceeded() from e
+
+
 def _pick_value(explicit: str | None, *env_names: str) -> str:
     if explicit and explicit.strip():
         return explicit.strip()
@@ -97,8 +144,46 @@ def build_api_base_url(
     return f"https://{subdomain}.{resolved_base_domain}/api/{API_VERSION}"
 
 
+_FlightKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+def _normalize_params(params: dict[str, Any] | None) -> tuple[tuple[str, str], ...]:
+    if not params:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in params.items() if v is not None))
+
+
+def _conditional_headers(entry: CacheEntry | None) -> dict[str, str] | None:
+    if entry is None:
+        return None
+    headers = {}
+    if entry.etag is not None:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified is not None:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def _decode(response: httpx.Response) -> Any:
+    if response.status_code == 204 or not response.content:
+        return None
+    return response.json()
+
+
 class KaitenClient:
-    """Async HTTP client for Kaiten API with rate limiting."""
+    """Async HTTP client for Kaiten API with rate limiting.
+
+    Clients sharing a token share one token bucket (see ``kaiten_mcp.ratelimit``),
+    so several clients cannot exceed the per-token limit together; queued requests
+    are released by priority, interactive calls ahead of bulk pagination. Reference data
+    GETs are served from a TTL cache shared by all clients of the process and
+    scoped per token (see ``kaiten_mcp.cache``) that every POST/PATCH/DELETE sent
+    through a client invalidates. Responses with
+    ``ETag``/``Last-Modified`` validators are revalidated with conditional GETs,
+    and a 304 is answered from the stored copy. Retries use decorrelated-jitter
+    backoff within a retry budget and a circuit breaker shared per base URL (see
+    ``kaiten_mcp.resilience``).
+    """
 
     def __init__(
         self,
@@ -106,6 +191,8 @@ class KaitenClient:
         token: str | None = None,
         base_domain: str | None = None,
         base_url: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
     ):
         self.subdomain = _pick_value(domain, "KAITEN_SUBDOMAIN", "KAITEN_DOMAIN")
         self.domain = self.subdomain  # Backward-compatible alias for older tests/callers.
@@ -120,7 +207,17 @@ class KaitenClient:
         )
         self._client: httpx.AsyncClient | None = None
         self._last_request_time = 0.0
-        self._rate_lock = asyncio.Lock()
+        self._rate_limiter = rate_limiter or get_rate_limiter(self.token)
+        self._guard = get_upstream_guard(self.base_url)
+        self._inflight: dict[_FlightKey, asyncio.Future[Any]] = {}
+        self._cache = cache if cache is not None else get_response_cache()
+        self._cache_scope = (self.base_url, token_key(self.token))
+        self.counters: Counter[str] = Counter()
+
+    @property
+    def burst_capacity(self) -> int:
+        """Requests this client may send back to back without limiter waits."""
+        return int(self._rate_limiter.burst)
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
@@ -136,67 +233,226 @@ class KaitenClient:
         return self._client
 
     async def _rate_limit(self) -> None:
-        async with self._rate_lock:
-            now = asyncio.get_running_loop().time()
-            elapsed = now - self._last_request_time
-            if elapsed < RATE_LIMIT_DELAY:
-                await asyncio.sleep(RATE_LIMIT_DELAY - elapsed)
-            self._last_request_time = asyncio.get_running_loop().time()
+        with tracing.span("rate_limit.wait") as span:
+            waited = await self._rate_limiter.acquire()
+            span.set_attribute("wait_seconds", waited)
+        metrics.RATE_LIMIT_WAIT.observe(waited)
+        self._last_request_time = asyncio.get_running_loop().time()
 
-    async def _request(
+    async def _send(
         self,
         method: str,
         path: str,
         params: dict[str, Any] | None = None,
         json: dict[str, Any] | None = None,
-    ) -> Any:
-        client = await self._get_client()
-
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """Send one logical request with rate limiting and retries; raise on HTTP errors."""
         # Filter None values from params
         if params:
             params = {k: v for k, v in params.items() if v is not None}
 
+        template = metrics.path_template(path)
+        with tracing.span("kaiten.request", method=method, path=template) as span:
+            response = await self._send_with_retries(method, path, template, params, json, headers)
+            span.set_attribute("status_code", response.status_code)
+        return response
+
+    async def _send_with_retries(
+        self,
+        method: str,
+        path: str,
+        template: str,
+        params: dict[str, Any] | None,
+        json: dict[str, Any] | None,
+        headers: dict[str, str] | None,
+    ) -> httpx.Response:
+        client = await self._get_client()
+        guard = self._guard
+        guard.budget.record_request()
+        backoff = RETRY_DELAY
         for attempt in range(MAX_RETRIES):
+            if not guard.breaker.allow():
+                raise CircuitOpenError(
+                    guard.breaker.retry_after(), probing=guard.breaker.state == HALF_OPEN
+                )
             await self._rate_limit()
+            started = time.perf_counter()
             try:
-                response = await client.request(method, path, params=params, json=json)
-                if response.status_code == 429:
-                    retry_after = response.headers.get("Retry-After")
-                    if retry_after:
-                        try:
-                            delay = float(retry_after)
-                        except ValueError:
-                            delay = RETRY_DELAY * (attempt + 1)
-                    else:
-                        delay = RETRY_DELAY * (attempt + 1)
-                    logger.warning("Rate limited, retrying after %.1fs", delay)
-                    await asyncio.sleep(delay)
-                    continue
-                if response.status_code >= 400:
-                    body = None
-                    with contextlib.suppress(Exception):
-                        body = response.json()
-                    msg: str = ""
-                    if isinstance(body, dict):
-                        msg = str(body.get("message", body.get("error", "")))
-                    if not msg:
-                        msg = response.text[:500]
-                    raise KaitenApiError(response.status_code, msg, body)
-                if response.status_code == 204:
-                    return None
-                if not response.content:
-                    return None
-                return response.json()
+                with tracing.span("http.attempt", attempt=attempt) as span:
+                    response = await client.request(
+                        method, path, params=params, json=json, headers=headers
+                    )
+                    span.set_attribute("status_code", response.status_code)
             except httpx.HTTPError as e:
-                if attempt == MAX_RETRIES - 1:
+                metrics.UPSTREAM_DURATION.observe(
+                    time.perf_counter() - started, method=method, path=template, status="error"
+                )
+                guard.breaker.record_failure()
+                if attempt == MAX_RETRIES - 1 or not guard.budget.try_retry():
                     raise KaitenApiError(0, f"Connection error: {e}") from e
-                await asyncio.sleep(RETRY_DELAY)
-
-        # All retries exhausted (e.g. repeated 429)
+                metrics.UPSTREAM_RETRIES.inc(reason="connection")
+                backoff = decorrelated_jitter(backoff, RETRY_DELAY, MAX_RETRY_DELAY)
+                await asyncio.sleep(backoff)
+                continue
+            metrics.UPSTREAM_DURATION.observe(
+                time.perf_counter() - started,
+                method=method,
+                path=template,
+                status=str(response.status_code),
+            )
+            self._rate_limiter.observe(response.status_code, response.headers)
+            if response.status_code >= 500:
+                guard.breaker.record_failure()
+            else:
+                guard.breaker.record_success()  # 4xx/429 still prove Kaiten is up
+            if response.status_code == 429:
+                metrics.UPSTREAM_THROTTLED.inc()
+                if attempt == MAX_RETRIES - 1 or not guard.budget.try_retry():
+                    break
+                metrics.UPSTREAM_RETRIES.inc(reason="throttled")
+                backoff = decorrelated_jitter(backoff, RETRY_DELAY, MAX_RETRY_DELAY)
+                delay = backoff
+                retry_after = response.headers.get("Retry-After")
+                if retry_after:
+                    with contextlib.suppress(ValueError):
+                        delay = float(retry_after)
+                logger.warning("Rate limited, retrying after %.1fs", delay)
+                await asyncio.sleep(delay)
+                continue
+            if response.status_code >= 400:
+                body = None
+                with contextlib.suppress(Exception):
+                    body = response.json()
+                msg: str = ""
+                if isinstance(body, dict):
+                    msg = str(body.get("message", body.get("error", "")))
+                if not msg:
+                    msg = response.text[:500]
+                raise KaitenApiError(response.status_code, msg, body)
+            return response
+
+        # Retries exhausted or denied by the retry budget (repeated 429)
         raise KaitenApiError(429, "Rate limit retries exhausted")
 
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+    ) -> Any:
+        left = remaining_seconds()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded()
+        try:
+            response = await _until_deadline(self._send(method, path, params=params, json=json))
+        finally:
+            # A failed mutation may still have been applied upstream
+            if method != "GET":
+                self._invalidate(path)
+        return _decode(response)
+
+    async def _fetch(
+        self, key: _FlightKey, path: str, params: dict[str, Any] | None
+    ) -> tuple[Any, int]:
+        if self._cache is None:
+            response = await self._send("GET", path, params=params)
+            return _decode(response), len(response.content)
+        version = self._cache.version(path)
+        cache_key = (self._cache_scope, key)
+        stored = self._cache.validated(cache_key)
+        response = await self._send(
+            "GET", path, params=params, headers=_conditional_headers(stored)
+        )
+        if response.status_code == 304 and stored is not None:
+            # Unchanged upstream: reuse the decoded copy instead of re-parsing
+            self.counters["conditional_hits"] += 1
+            metrics.CONDITIONAL_REQUESTS.inc(result="not_modified")
+            metrics.CACHE_LOOKUPS.inc(result="not_modified")
+            data, size = stored.value, stored.size
+            etag = response.headers.get("ETag", stored.etag)
+            last_modified = response.headers.get("Last-Modified", stored.last_modified)
+        else:
+            if stored is not None:
+                self.counters["conditional_misses"] += 1
+                metrics.CONDITIONAL_REQUESTS.inc(result="modified")
+                metrics.CACHE_LOOKUPS.inc(result="modified")
+            data, size = _decode(response), len(response.content)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag is None and last_modified is None:
+                self.counters["no_validators"] += 1
+                metrics.UNVALIDATED_RESPONSES.inc()
+        self._cache.put(
+            cache_key, path, data, size, version, etag=etag, last_modified=last_modified
+        )
+        return data, size
+
+    def _invalidate(self, path: str) -> None:
+        if self._cache is None:
+            return
+        families = self._cache.invalidate(path)
+        # New readers must not join a GET that started before this mutation
+        for key in list(self._inflight):
+            if families.intersection(path_families(key[0])):
+                del self._inflight[key]
+
     async def get(self, path: str, params: dict[str, Any] | None = None) -> Any:
-        return await self._request("GET", path, params=params)
+        """GET ``path`` via the response cache, sharing identical concurrent requests.
+
+        Callers that join an in-flight request or hit the cache receive the same
+        decoded object; results must be treated as read-only. Raises
+        :class:`DeadlineExceeded` when the call deadline passes first.
+        """
+        data, _ = await self.get_sized(path, params)
+        return data
+
+    async def get_sized(self, path: str, params: dict[str, Any] | None = None) -> tuple[Any, int]:
+        """Like :meth:`get`, also returning the size in bytes of the response body."""
+        left = remaining_seconds()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded()
+        key = (path, _normalize_params(params))
+        self.counters["get_requests"] += 1
+        if self._cache is not None and self._cache.ttl_for(path) is not None:
+            entry = self._cache.fresh((self._cache_scope, key))
+            metrics.CACHE_LOOKUPS.inc(result="miss" if entry is None else "hit")
+            if entry is not None:
+                return entry.value, entry.size
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._fetch(key, path, params))
+            self._inflight[key] = flight
+            flight.add_done_callback(lambda done: self._finish_flight(key, done))
+        else:
+            self.counters["get_coalesced"] += 1
+            metrics.GET_COALESCED.inc()
+        # Shield so one cancelled or timed-out caller does not cancel the request for the others
+        data, size = await _until_deadline(asyncio.shield(flight))
+        return data, size
+
+    def _finish_flight(self, key: _FlightKey, flight: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.cancelled():
+            flight.exception()  # mark retrieved even if every caller went away
+
+    def stats(self) -> dict[str, float]:
+        """Return request and cache counters and the learned request rate.
+
+        ``get_coalesced`` counts GETs that joined an in-flight request,
+        ``conditional_hits``/``conditional_misses`` count conditional GETs
+        answered with 304/200 and ``no_validators`` counts responses that
+        carried neither ``ETag`` nor ``Last-Modified``. ``rate_limit_rps`` is
+        the current (adaptive) request rate for this client's token. The
+        ``cache_*`` counters belong to the cache shared by every client.
+        """
+        stats: dict[str, float] = dict(self.counters)
+        stats["rate_limit_rps"] = round(self._rate_limiter.rate, 3)
+        if self._cache is not None:
+            stats.update({f"cache_{name}": value for name, value in self._cache.counters.items()})
+        return stats
 
     async def post(self, path: str, json: dict[str, Any] | None = None) -> Any:
         return await self._request("POST", path, json=json)
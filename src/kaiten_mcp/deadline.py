@@ -0,0 +1,79 @@
+"""Per-call deadlines shared by the runtime, the tools and the Kaiten client.
+
+MCP clients give up on long tool calls. The runtime therefore opens a
+:func:`call_deadline` scope for every call, from ``KAITEN_MCP_CALL_DEADLINE_SECONDS``
+or a tool's ``deadline_seconds`` argument. The Kaiten client stops waiting
+for upstream when it passes, and bulk tools return what they gathered so far
+with an ``incomplete`` marker instead of failing.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "kaiten_call_deadline", default=None
+)
+
+
+def current_deadline() -> float | None:
+    """:func:`time.monotonic` timestamp by which the current call must finish, if any."""
+    return _deadline.get()
+
+
+def remaining_seconds() -> float | None:
+    """Seconds left before the current deadline (negative once passed), or ``None``."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def earliest(*deadlines: float | None) -> float | None:
+    """The earliest of ``deadlines``, ignoring ``None``."""
+    present = [deadline for deadline in deadlines if deadline is not None]
+    return min(present) if present else None
+
+
+def default_deadline_seconds() -> float | None:
+    """Server-wide deadline for one tool call from the environment; unset or 0 means none."""
+    value = os.environ.get("KAITEN_MCP_CALL_DEADLINE_SECONDS", "").strip()
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError as e:
+        raise ValueError("KAITEN_MCP_CALL_DEADLINE_SECONDS must be a number") from e
+    return seconds if seconds > 0 else None
+
+
+@contextlib.contextmanager
+def call_deadline(seconds: float | None) -> Iterator[None]:
+    """Finish the work inside the block within ``seconds``; ``None`` adds no limit.
+
+    An enclosing deadline that is earlier still applies. Tasks started inside
+    the block inherit the deadline.
+    """
+    deadline = None if seconds is None else time.monotonic() + seconds
+    token = _deadline.set(earliest(_deadline.get(), deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+async def anext_before(iterator: AsyncIterator[T], deadline: float | None) -> T:
+    """Next item of ``iterator``; raise ``TimeoutError`` if ``deadline`` passes first.
+
+    An expired deadline raises without resuming the iterator.
+    """
+    if deadline is None:
+        return await anext(iterator)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError
+    return await asyncio.wait_for(anext(iterator), remaining)
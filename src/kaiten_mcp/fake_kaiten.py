@@ -0,0 +1,467 @@
+"""Local stand-in for the Kaiten REST API for load and benchmark runs.
+
+Serves a deterministic synthetic company (spaces, boards, columns, lanes,
+cards, users, tags, activity) under ``/api/latest`` so the MCP server and the
+bulk tools can be measured without touching real Kaiten. The store is a
+generic REST model: any collection path accepts ``GET`` (with ``limit``/
+``offset`` and simple equality filters) and ``POST``, any item path accepts
+``GET``/``PATCH``/``PUT``/``DELETE``, so every endpoint used by
+``kaiten_mcp.tools`` answers with a plausible shape. Latency, per-token 429
+throttling with ``Retry-After`` and a 5xx fault rate can be injected.
+
+Run it with ``kaiten-fake-api --cards 5000`` and point the server at it with
+``KAITEN_BASE_URL=http://127.0.0.1:9000``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from kaiten_mcp.client import KaitenClient
+
+API_PREFIX = "/api/latest"
+MAX_PAGE_SIZE = 100  # Kaiten caps list endpoints at 100 items per page
+_PAGE_SIZE_OVERRIDES = {"documents": 500, "document-groups": 500}
+_EPOCH = datetime(2025, 1, 1, tzinfo=UTC)
+_ACTIONS = ("card_add", "card_change", "card_move", "comment_add", "card_archive")
+_COLUMNS = (("Queue", 1), ("In progress", 2), ("Done", 3))
+_WORDS = (
+    "api", "migration", "release", "onboarding", "invoice", "report", "dashboard",
+    "search", "export", "import", "billing", "audit", "retry", "cache", "backlog",
+    "sprint", "review", "incident", "deploy", "design",
+)  # fmt: skip
+# Query parameters that shape the response instead of filtering it
+_CONTROL_PARAMS = {"limit", "offset", "relations", "compact", "fields", "query"}
+_RANGE_PARAMS = {
+    "created_after": ("created", ">"),
+    "created_before": ("created", "<"),
+    "updated_after": ("updated", ">"),
+    "updated_before": ("updated", "<"),
+}
+
+
+@dataclass
+class FakeKaitenConfig:
+    """Size of the synthetic dataset and the faults to inject."""
+
+    spaces: int = 3
+    boards_per_space: int = 2
+    cards: int = 500
+    activity_per_space: int = 300
+    users: int = 20
+    documents: int = 3  # spread over one document group per 20 documents
+    latency: float = 0.0  # seconds added to every response
+    latency_jitter: float = 0.0  # extra uniform random latency, seconds
+    rate_limit: float = 0.0  # requests/second per token, 0 disables throttling
+    burst: int = 5
+    error_rate: float = 0.0  # share of requests answered with 503
+    seed: int = 42
+
+
+def _timestamp(minutes: float) -> str:
+    return (_EPOCH + timedelta(minutes=minutes)).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+class FakeKaitenStore:
+    """In-memory resources addressed by their API paths."""
+
+    def __init__(self, config: FakeKaitenConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._next_id = 1
+        self.collections: dict[str, list[dict[str, Any]]] = {}
+        self.items: dict[str, dict[str, Any]] = {}
+        self.singletons: dict[str, dict[str, Any]] = {}
+        self._token_users: dict[str, int] = {}
+        self._generate()
+
+    def _new_id(self) -> int:
+        value = self._next_id
+        self._next_id += 1
+        return value
+
+    def _words(self, count: int) -> str:
+        return " ".join(self._rng.choice(_WORDS) for _ in range(count))
+
+    def add(self, collection: str, item: dict[str, Any], *, kind: str | None = None) -> None:
+        """Store ``item`` in ``collection``; also address it as ``/{kind}/{id}``."""
+        self.collections.setdefault(collection, []).append(item)
+        key = item.get("id", item.get("uid"))
+        self.items[f"{collection}/{key}"] = item
+        kind = kind or collection.rsplit("/", 1)[-1]
+        self.items[f"/{kind}/{key}"] = item
+
+    def _generate(self) -> None:
+        config = self.config
+        users = []
+        for _ in range(max(1, config.users)):
+            user_id = self._new_id()
+            user = {
+                "id": user_id,
+                "uid": str(uuid.UUID(int=self._rng.getrandbits(128))),
+                "full_name": f"User {user_id}",
+                "username": f"user{user_id}",
+                "email": f"user{user_id}@example.com",
+                "avatar_type": 1,
+                "avatar_initials_url": "data:image/png;base64," + "A" * 64,
+                "activated": True,
+            }
+            users.append(user)
+            self.add("/users", user)
+        self.singletons["/companies/current"] = {"id": 1, "name": "Fake Company"}
+
+        tags = []
+        for _ in range(10):
+            tag = {"id": self._new_id(), "name": self._rng.choice(_WORDS), "color": 1}
+            tags.append(tag)
+            self.add("/tags", tag)
+        card_types = []
+        for letter in "TBF":
+            card_type = {"id": self._new_id(), "letter": letter, "name": letter, "color": 2}
+            card_types.append(card_type)
+            self.add("/card-types", card_type)
+        for name in ("Priority", "Estimate", "Customer"):
+            self.add(
+                "/company/custom-properties",
+                {"id": self._new_id(), "name": name, "type": "string"},
+                kind="company/custom-properties",
+            )
+
+        boards: list[dict[str, Any]] = []
+        for space_index in range(max(1, config.spaces)):
+            space_id = self._new_id()
+            space = {
+                "id": space_id,
+                "uid": str(uuid.UUID(int=self._rng.getrandbits(128))),
+                "title": f"Space {space_index + 1}",
+                "parent_entity_uid": None,
+                "access": "for_everyone",
+                "created": _timestamp(space_index),
+                "updated": _timestamp(space_index),
+            }
+            self.add("/spaces", space)
+            boards.extend(
+                self._generate_board(space_id, board_index)
+                for board_index in range(max(1, config.boards_per_space))
+            )
+            self._generate_activity(space_id, users)
+
+        for card_index in range(config.cards):
+            board = boards[card_index % len(boards)]
+            column = self._rng.choice(board["columns"])
+            owner = self._rng.choice(users)
+            responsible = self._rng.choice(users)
+            created = card_index * 7.0
+            card = {
+                "id": self._new_id(),
+                "title": self._words(4).capitalize(),
+                "description": self._words(40),
+                "space_id": board["space_id"],
+                "board_id": board["id"],
+                "column_id": column["id"],
+                "lane_id": board["lanes"][0]["id"],
+                "type_id": self._rng.choice(card_types)["id"],
+                "state": column["type"],
+                "condition": 1,
+                "archived": False,
+                "asap": False,
+                "owner_id": owner["id"],
+                "owner": owner,
+                "responsible_id": responsible["id"],
+                "members": [responsible],
+                "tags": self._rng.sample(tags, 2),
+                "size": self._rng.randint(1, 8),
+                "created": _timestamp(created),
+                "updated": _timestamp(created + self._rng.uniform(0, 600)),
+                "last_moved_at": _timestamp(created + 60),
+                "due_date": None,
+                "properties": {},
+                "comments_total": 0,
+                "version": 1,
+            }
+            self.add("/cards", card)
+            self.collections.setdefault(f"/cards/{card['id']}/comments", [])
+
+        groups: list[dict[str, Any]] = []
+        for index in range(max(1, self.config.documents // 20)):
+            group = {
+                "uid": str(uuid.UUID(int=self._rng.getrandbits(128))),
+                "title": f"Group {index + 1}",
+                # Nest some groups to give the sidebar tree some depth
+                "parent_entity_uid": self._rng.choice(groups)["uid"] if index % 3 else None,
+            }
+            groups.append(group)
+            self.add("/document-groups", group)
+        for index in range(self.config.documents):
+            self.add(
+                "/documents",
+                {
+                    "uid": str(uuid.UUID(int=self._rng.getrandbits(128))),
+                    "title": f"Document {index + 1}",
+                    "parent_entity_uid": self._rng.choice(groups)["uid"],
+                },
+            )
+
+    def _generate_board(self, space_id: int, index: int) -> dict[str, Any]:
+        board_id = self._new_id()
+        columns = [
+            {"id": self._new_id(), "title": title, "type": kind, "board_id": board_id}
+            for title, kind in _COLUMNS
+        ]
+        lanes = [{"id": self._new_id(), "title": "Default", "board_id": board_id}]
+        board = {
+            "id": board_id,
+            "space_id": space_id,
+            "title": f"Board {index + 1}",
+            "columns": columns,
+            "lanes": lanes,
+        }
+        self.add(f"/spaces/{space_id}/boards", board, kind="boards")
+        for column in columns:
+            self.add(f"/boards/{board_id}/columns", column, kind="columns")
+        for lane in lanes:
+            self.add(f"/boards/{board_id}/lanes", lane, kind="lanes")
+        return board
+
+    def _generate_activity(self, space_id: int, users: list[dict[str, Any]]) -> None:
+        count = self.config.activity_per_space
+        for index in range(count):
+            author = self._rng.choice(users)
+            # Kaiten returns activity newest first
+            self.add(
+                f"/spaces/{space_id}/activity",
+                {
+                    "id": self._new_id(),
+                    "action": self._rng.choice(_ACTIONS),
+                    "created": _timestamp((count - index) * 3.0),
+                    "author_id": author["id"],
+                    "author": author,
+                    "space_id": space_id,
+                    "data": {"title": self._words(3)},
+                },
+                kind="activity",
+            )
+
+    # -- request handling ---------------------------------------------------
+
+    def current_user(self, token: str) -> dict[str, Any]:
+        """Each API token acts as its own user, assigned in order of first use."""
+        index = self._token_users.setdefault(token, len(self._token_users))
+        users = self.collections["/users"]
+        return users[index % len(users)]
+
+    def get(self, path: str, params: dict[str, str]) -> tuple[int, Any]:
+        if path in self.singletons:
+            return 200, self.singletons[path]
+        if path in self.items:
+            return 200, self.items[path]
+        if path in self.collections or not _looks_like_item(path):
+            items: Iterable[dict[str, Any]] = self.collections.get(path, [])
+            if any(key not in _CONTROL_PARAMS or key == "query" for key in params):
+                items = (item for item in items if _matches(item, params))
+            return 200, _paginate(path, items, params)
+        return 404, {"message": "Not found"}
+
+    def create(self, path: str, body: dict[str, Any]) -> tuple[int, Any]:
+        item = {"id": self._new_id(), **body, "created": _timestamp(0), "updated": _timestamp(0)}
+        self.add(path, item)
+        return 200, item
+
+    def update(self, path: str, body: dict[str, Any]) -> tuple[int, Any]:
+        item = self.items.get(path) or self.singletons.get(path)
+        if item is None:
+            return 404, {"message": "Not found"}
+        item.update(body)
+        return 200, item
+
+    def delete(self, path: str) -> tuple[int, Any]:
+        item = self.items.get(path)
+        if item is None:
+            return 404, {"message": "Not found"}
+        for key in [key for key, value in self.items.items() if value is item]:
+            del self.items[key]
+        for items in self.collections.values():
+            if any(candidate is item for candidate in items):
+                items[:] = [candidate for candidate in items if candidate is not item]
+        return 200, item
+
+
+def _looks_like_item(path: str) -> bool:
+    last = path.rstrip("/").rsplit("/", 1)[-1]
+    return any(char.isdigit() for char in last)
+
+
+def _matches(item: dict[str, Any], params: dict[str, str]) -> bool:
+    for key, value in params.items():
+        if key in _CONTROL_PARAMS:
+            continue
+        if key in _RANGE_PARAMS:
+            field, op = _RANGE_PARAMS[key]
+            current = item.get(field)
+            if current is None or (current <= value if op == ">" else current >= value):
+                return False
+        elif key in item:
+            if str(item[key]).lower() != value.lower():
+                return False
+        elif key.endswith("s") and key[:-1] in item:
+            # "states=1,2" / "column_ids=3,4" filter on "state" / "column_id"
+            if str(item[key[:-1]]) not in value.split(","):
+                return False
+    query = params.get("query")
+    return not query or query.lower() in str(item.get("title", "")).lower()
+
+
+def _paginate(
+    path: str, items: Iterable[dict[str, Any]], params: dict[str, str]
+) -> list[dict[str, Any]]:
+    offset = max(0, int(params.get("offset", 0)))
+    stop = None
+    if "limit" in params:
+        cap = _PAGE_SIZE_OVERRIDES.get(path.rsplit("/", 1)[-1], MAX_PAGE_SIZE)
+        stop = offset + min(cap, max(0, int(params["limit"])))
+    if isinstance(items, list):
+        return items[offset:stop]
+    return list(itertools.islice(items, offset, stop))
+
+
+class _Throttle:
+    """Per-token token bucket deciding which requests get a 429."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def retry_after(self, token: str) -> float:
+        """Take a token for ``token``; return 0 or the seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(token, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        if tokens >= 1.0:
+            self._buckets[token] = (tokens - 1.0, now)
+            return 0.0
+        self._buckets[token] = (tokens, now)
+        return (1.0 - tokens) / self.rate
+
+
+def create_fake_kaiten_app(config: FakeKaitenConfig | None = None) -> Starlette:
+    """Build the ASGI app; ``app.state.store`` and ``app.state.stats`` expose its state."""
+    config = config or FakeKaitenConfig()
+    store = FakeKaitenStore(config)
+    stats: Counter[str] = Counter()
+    faults = random.Random(config.seed + 1)
+    throttle = _Throttle(config.rate_limit, config.burst) if config.rate_limit > 0 else None
+
+    async def api(request: Request) -> JSONResponse:
+        stats["requests"] += 1
+        auth = request.headers.get("Authorization", "")
+        if not auth.startswith("Bearer ") or not auth[7:].strip():
+            stats["unauthorized"] += 1
+            return JSONResponse({"message": "Unauthorized"}, status_code=401)
+        if throttle is not None:
+            wait = throttle.retry_after(auth[7:])
+            if wait:
+                stats["throttled"] += 1
+                return JSONResponse(
+                    {"message": "Too many requests"},
+                    status_code=429,
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+        delay = config.latency + faults.uniform(0, config.latency_jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if config.error_rate and faults.random() < config.error_rate:
+            stats["faults"] += 1
+            return JSONResponse({"message": "Injected fault"}, status_code=503)
+
+        path = "/" + request.path_params["path"].strip("/")
+        params = dict(request.query_params)
+        method = request.method
+        stats[method] += 1
+        if method == "GET" and path == "/users/current":
+            status, body = 200, store.current_user(auth[7:])
+        elif method == "GET":
+            status, body = store.get(path, params)
+        elif method == "DELETE":
+            status, body = store.delete(path)
+        else:
+            payload = await request.json() if await request.body() else {}
+            if method == "POST":
+                status, body = store.create(path, payload if isinstance(payload, dict) else {})
+            else:
+                status, body = store.update(path, payload if isinstance(payload, dict) else {})
+        return JSONResponse(body, status_code=status)
+
+    async def stats_endpoint(request: Request) -> JSONResponse:
+        return JSONResponse(dict(stats))
+
+    app = Starlette(
+        routes=[
+            Route(
+                API_PREFIX + "/{path:path}",
+                api,
+                methods=["GET", "POST", "PATCH", "PUT", "DELETE"],
+            ),
+            Route("/__fake__/stats", stats_endpoint),
+        ]
+    )
+    app.state.store = store
+    app.state.stats = stats
+    return app
+
+
+def attach(client: KaitenClient, app: Starlette) -> KaitenClient:
+    """Route ``client`` to ``app`` in-process, without a listening socket."""
+    client._client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url=client.base_url,
+        headers={"Authorization": f"Bearer {client.token}", "Accept": "application/json"},
+    )
+    return client
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Kaiten REST API for load tests.")
+    defaults = FakeKaitenConfig()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--spaces", type=int, default=defaults.spaces)
+    parser.add_argument("--boards-per-space", type=int, default=defaults.boards_per_space)
+    parser.add_argument("--cards", type=int, default=defaults.cards)
+    parser.add_argument("--activity-per-space", type=int, default=defaults.activity_per_space)
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--documents", type=int, default=defaults.documents)
+    parser.add_argument("--latency", type=float, default=defaults.latency)
+    parser.add_argument("--latency-jitter", type=float, default=defaults.latency_jitter)
+    parser.add_argument("--rate-limit", type=float, default=defaults.rate_limit)
+    parser.add_argument("--burst", type=int, default=defaults.burst)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+    uvicorn.run(create_fake_kaiten_app(FakeKaitenConfig(**args)), host=host, port=port)
+
+
+__all__ = [
+    "FakeKaitenConfig",
+    "FakeKaitenStore",
+    "attach",
+    "create_fake_kaiten_app",
+    "main",
+]
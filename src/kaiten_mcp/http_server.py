@@ -1,5 +1,6 @@
 """HTTP entrypoint for remote MCP deployment."""
 
+import asyncio
 import html
 import importlib
 import os
@@ -15,9 +16,10 @@ from pydantic.networks import AnyHttpUrl
 from starlette.applications import Starlette
 from starlette.middleware.authentication import AuthenticationMiddleware
 from starlette.requests import Request
-from starlette.responses import HTMLResponse, JSONResponse, RedirectResponse
+from starlette.responses import HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse
 from starlette.routing import Mount, Route
 
+from kaiten_mcp import metrics
 from kaiten_mcp.auth import (
     AUTH_STORE,
     DEFAULT_REQUIRED_SCOPE,
@@ -29,6 +31,7 @@ from kaiten_mcp.auth import (
     validate_redirect_uri,
 )
 from kaiten_mcp.client import KaitenApiError
+from kaiten_mcp.resilience import circuit_breaker_states
 from kaiten_mcp.runtime import app, close_client
 
 
@@ -112,7 +115,18 @@ async def healthz(_: Request) -> JSONResponse:
 
 
 async def readyz(_: Request) -> JSONResponse:
-    return JSONResponse({"status": "ready", "auth_mode": _auth_mode()})
+    breakers = circuit_breaker_states()
+    # Stay ready while Kaiten is down: restarting this server would not help
+    status = "degraded" if any(b["state"] != "closed" for b in breakers.values()) else "ready"
+    return JSONResponse(
+        {"status": status, "auth_mode": _auth_mode(), "circuit_breakers": breakers}
+    )
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    if not _is_authorized(request, os.environ.get("MCP_METRICS_TOKEN")):
+        return PlainTextResponse("Unauthorized", status_code=401)
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
 
 
 async def protected_resource_metadata(request: Request) -> JSONResponse:
@@ -343,15 +357,18 @@ def create_http_app(
 
     @asynccontextmanager
     async def lifespan(_: Starlette):
+        lag_watcher = asyncio.create_task(metrics.watch_event_loop_lag())
         async with session_manager.run():
             try:
                 yield
             finally:
+                lag_watcher.cancel()
                 await close_client()
 
     routes = [
         Route("/healthz", endpoint=healthz),
         Route("/readyz", endpoint=readyz),
+        Route("/metrics", endpoint=metrics_endpoint),
         Route("/.well-known/oauth-protected-resource", endpoint=protected_resource_metadata),
         Route(
             "/.well-known/oauth-protected-resource/{path:path}",
@@ -379,4 +396,4 @@ def main() -> None:
     uvicorn.run(create_http_app(), host=host, port=port)
 
 
-__all__ = ["create_http_app", "healthz", "main", "readyz"]
+__all__ = ["create_http_app", "healthz", "main", "metrics_endpoint", "readyz"]
@@ -0,0 +1,340 @@
+"""In-process metrics exposed in the Prometheus text format at ``/metrics``.
+
+A deliberately small registry (counters and histograms with labels) so the
+server needs no metrics library or collector to be observable.
+"""
+
+import asyncio
+import bisect
+import math
+import os
+import re
+import threading
+from collections.abc import Callable, Iterable, Sequence
+
+from kaiten_mcp.ratelimit import active_rate_limiters
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_ID_SEGMENT_RE = re.compile(r"^[a-z][a-z-]*$")
+
+_LabelValues = tuple[str, ...]
+
+
+def path_template(path: str) -> str:
+    """Collapse identifiers in an API path: ``/cards/12/tags/3`` -> ``/cards/{id}/tags/{id}``.
+
+    Keeps the label cardinality bounded by the number of endpoints.
+    """
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    return "/" + "/".join(
+        segment if _ID_SEGMENT_RE.match(segment) else "{id}" for segment in segments if segment
+    )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> _LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterable[str]:  # pragma: no cover - overridden
+        return ()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[_LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket counts (last slot is +Inf), sum
+        self._values: dict[_LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def sum(self, **labels: str) -> float:
+        entry = self._values.get(self._key(labels))
+        return entry[1][0] if entry else 0.0
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((key, (list(c), s[0])) for key, (c, s) in self._values.items())
+        names = (*self.labelnames, "le")
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                labels = _format_labels(names, (*key, _format_number(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_number(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class DerivedGauge(_Metric):
+    """A gauge computed from other metrics each time it is scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, compute: Callable[[], float]):
+        super().__init__(name, help_text)
+        self._compute = compute
+
+    def _samples(self) -> Iterable[str]:
+        yield f"{self.name} {_format_number(self._compute())}"
+
+
+class DerivedGaugeFamily(_Metric):
+    """Labelled gauges read from live objects each time they are scraped.
+
+    ``collect`` returns ``(label values, value)`` pairs for the series that
+    exist right now, so series disappear with the objects they describe.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[tuple[_LabelValues, float]]],
+    ):
+        super().__init__(name, help_text, labelnames)
+        self._collect = collect
+
+    def values(self) -> dict[_LabelValues, float]:
+        return dict(self._collect())
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in sorted(self.values().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self.register(metric)
+        return metric
+
+    def derived_gauge(
+        self, name: str, help_text: str, compute: Callable[[], float]
+    ) -> DerivedGauge:
+        metric = DerivedGauge(name, help_text, compute)
+        self.register(metric)
+        return metric
+
+    def derived_gauge_family(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[tuple[_LabelValues, float]]],
+    ) -> DerivedGaugeFamily:
+        metric = DerivedGaugeFamily(name, help_text, labelnames, collect)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_CALL_DURATION = REGISTRY.histogram(
+    "kaiten_mcp_tool_call_duration_seconds",
+    "Duration of MCP tool calls, including admission, upstream calls and serialization.",
+    ("tool", "outcome"),
+)
+TOOL_RESPONSE_BYTES = REGISTRY.histogram(
+    "kaiten_mcp_tool_response_bytes",
+    "Size of serialized tool results returned to the MCP client.",
+    ("tool",),
+    buckets=SIZE_BUCKETS,
+)
+UPSTREAM_DURATION = REGISTRY.histogram(
+    "kaiten_mcp_upstream_request_duration_seconds",
+    "Duration of single HTTP attempts to the Kaiten API by path template.",
+    ("method", "path", "status"),
+)
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "kaiten_mcp_rate_limit_wait_seconds",
+    "Time upstream requests spent waiting for the per-token rate limiter.",
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "kaiten_mcp_upstream_retries_total",
+    "Retried Kaiten API attempts by reason (throttled or connection).",
+    ("reason",),
+)
+UPSTREAM_THROTTLED = REGISTRY.counter(
+    "kaiten_mcp_upstream_throttled_total",
+    "HTTP 429 responses received from the Kaiten API.",
+)
+GET_COALESCED = REGISTRY.counter(
+    "kaiten_mcp_get_coalesced_total",
+    "GET requests that joined an identical in-flight request instead of sending their own.",
+)
+RATE_LIMIT_RATE = REGISTRY.derived_gauge_family(
+    "kaiten_mcp_rate_limit_rate",
+    "Refill rate the AIMD limiter currently allows per token, requests per second.",
+    ("limiter",),
+    lambda: [((limiter.key,), limiter.rate) for limiter in active_rate_limiters()],
+)
+RATE_LIMIT_MAX_RATE = REGISTRY.derived_gauge_family(
+    "kaiten_mcp_rate_limit_max_rate",
+    "Ceiling the AIMD limiter may probe up to per token, requests per second.",
+    ("limiter",),
+    lambda: [((limiter.key,), limiter.max_rate) for limiter in active_rate_limiters()],
+)
+CONDITIONAL_REQUESTS = REGISTRY.counter(
+    "kaiten_mcp_conditional_requests_total",
+    "Revalidated GETs by result: not_modified (304, served from the stored copy) or modified.",
+    ("result",),
+)
+UNVALIDATED_RESPONSES = REGISTRY.counter(
+    "kaiten_mcp_unvalidated_responses_total",
+    "Cacheable GET responses without ETag or Last-Modified, which cannot be revalidated.",
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "kaiten_mcp_cache_lookups_total",
+    "Response cache lookups by result: hit, miss, not_modified (304) or modified.",
+    ("result",),
+)
+
+
+def _cache_hit_ratio() -> float:
+    served = CACHE_LOOKUPS.value(result="hit") + CACHE_LOOKUPS.value(result="not_modified")
+    total = served + CACHE_LOOKUPS.value(result="miss") + CACHE_LOOKUPS.value(result="modified")
+    return served / total if total else 0.0
+
+
+CACHE_HIT_RATIO = REGISTRY.derived_gauge(
+    "kaiten_mcp_cache_hit_ratio",
+    "Share of cache lookups answered without downloading the body (hits and 304s).",
+    _cache_hit_ratio,
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "kaiten_mcp_event_loop_lag_seconds",
+    "How late the event loop woke a periodic probe; high values mean blocking work.",
+    buckets=LAG_BUCKETS,
+)
+
+
+def _resident_memory_bytes() -> float:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):  # not Linux
+        return 0.0
+    return float(pages * os.sysconf("SC_PAGE_SIZE"))
+
+
+PROCESS_RESIDENT_MEMORY = REGISTRY.derived_gauge(
+    "process_resident_memory_bytes",
+    "Resident memory size of the server process in bytes (0 where /proc is unavailable).",
+    _resident_memory_bytes,
+)
+
+
+async def watch_event_loop_lag(interval: float = 0.25) -> None:
+    """Record event loop lag into ``EVENT_LOOP_LAG`` until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - expected))
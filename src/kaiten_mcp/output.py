@@ -0,0 +1,142 @@
+"""Result files in ``KAITEN_MCP_OUTPUT_DIR`` for data too large to return inline.
+
+The runtime saves an oversized serialized result in one go; bulk tools can
+instead stream pages into a file as they arrive with
+:func:`stream_pages_to_file`, so memory stays at about one page. Both return
+the same ``saved_to`` summary to the MCP client.
+"""
+
+import contextlib
+import itertools
+import os
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any, BinaryIO
+
+from kaiten_mcp.client import DeadlineExceeded
+from kaiten_mcp.deadline import anext_before
+from kaiten_mcp.serialization import dumps, prepare, take_stripped
+
+OUTPUT_FORMATS = ("json", "ndjson")
+SAMPLE_SIZE = 3
+SAVED_TIP = "Read the saved file to process data. Use 'fields' parameter to reduce response size."
+
+_sequence = itertools.count(1)
+
+
+def output_dir() -> str | None:
+    return os.environ.get("KAITEN_MCP_OUTPUT_DIR") or None
+
+
+def new_output_path(name: str, extension: str) -> str:
+    """Return a fresh file path for tool ``name`` in the output directory, creating it."""
+    directory = output_dir()
+    if directory is None:
+        raise ValueError("Saving results to a file requires KAITEN_MCP_OUTPUT_DIR to be set")
+    os.makedirs(directory, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{name}_{ts}_{os.getpid()}_{next(_sequence)}.{extension}"
+    return os.path.join(directory, filename)
+
+
+def saved_summary(path: str, total_items: int, size_bytes: int, sample: Any) -> dict[str, Any]:
+    return {
+        "saved_to": path,
+        "total_items": total_items,
+        "size_bytes": size_bytes,
+        "sample": sample,
+        "tip": SAVED_TIP,
+    }
+
+
+class PageFileWriter:
+    """Append pages of items to a JSON array (one item per line) or an NDJSON file."""
+
+    def __init__(self, path: str, fmt: str):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"output format must be one of {', '.join(OUTPUT_FORMATS)}")
+        self.path = path
+        self.format = fmt
+        self.items = 0
+        self.size_bytes = 0
+        self.stripped = 0
+        self.sample: list[Any] = []
+        self._file: BinaryIO = open(path, "wb")  # noqa: SIM115 - closed by close()/discard()
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+        self.size_bytes += len(data)
+
+    def write_page(self, page: list[Any]) -> None:
+        """Write ``page``, stripping data URIs unless it was projected already."""
+        prepared = prepare(page, size_limit=0, pre_stripped=take_stripped(page))
+        self.stripped += prepared.stripped
+        for item in prepared.data:
+            if self.format == "json":
+                self._write(b"[\n" if self.items == 0 else b",\n")
+            self._write(dumps(item, indent=False).encode("utf-8"))
+            if self.format == "ndjson":
+                self._write(b"\n")
+            if len(self.sample) < SAMPLE_SIZE:
+                self.sample.append(item)
+            self.items += 1
+
+    def close(self) -> dict[str, Any]:
+        """Finish the file and return its ``saved_to`` summary."""
+        if self.format == "json":
+            self._write(b"\n]\n" if self.items else b"[]\n")
+        self._file.close()
+        summary = saved_summary(self.path, self.items, self.size_bytes, self.sample)
+        if self.stripped:
+            summary["omitted_base64_fields"] = self.stripped
+        return summary
+
+    def discard(self) -> None:
+        """Close and delete a partially written file."""
+        self._file.close()
+        with contextlib.suppress(OSError):
+            os.remove(self.path)
+
+
+async def stream_pages_to_file(
+    pages: AsyncIterator[list[Any]],
+    name: str,
+    fmt: str,
+    transform: Any = None,
+    *,
+    deadline: float | None = None,
+    start_offset: int = 0,
+) -> dict[str, Any]:
+    """Write every page from ``pages`` to a new ``fmt`` file and return its summary.
+
+    ``transform`` (such as ``ProjectionPlan.apply``) is applied to each page
+    before it is written. If fetching fails the partial file is removed. If
+    ``deadline`` passes first the file keeps the pages written so far and the
+    summary is marked incomplete, with the offset to resume from counted from
+    ``start_offset``.
+    """
+    writer = PageFileWriter(new_output_path(name, fmt), fmt)
+    expired = False
+    try:
+        async with contextlib.aclosing(pages):  # type: ignore[type-var]
+            while True:
+                try:
+                    page = await anext_before(pages, deadline)
+                except StopAsyncIteration:
+                    break
+                except (TimeoutError, DeadlineExceeded):
+                    expired = True
+                    break
+                writer.write_page(transform(page) if transform is not None else page)
+    except BaseException:
+        writer.discard()
+        raise
+    summary = writer.close()
+    if expired:
+        summary["incomplete"] = True
+        summary["truncated"] = {
+            "reason": "deadline",
+            "returned": writer.items,
+            "resume_offset": start_offset + writer.items,
+        }
+    return summary
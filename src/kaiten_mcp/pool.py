@@ -0,0 +1,130 @@
+"""Bounded pool of live Kaiten clients for OAuth credentials."""
+
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from kaiten_mcp.auth import KaitenCredential
+from kaiten_mcp.client import KaitenClient
+from kaiten_mcp.ratelimit import release_rate_limiter
+
+DEFAULT_POOL_SIZE = 64
+DEFAULT_IDLE_SECONDS = 300.0
+
+
+@dataclass
+class _PoolEntry:
+    client: KaitenClient
+    expires_at: float
+    last_used: float
+    in_use: int = 0
+
+
+class KaitenClientPool:
+    """LRU pool of ``KaitenClient`` instances keyed by credential id.
+
+    Reusing a client keeps its HTTP connections alive between tool calls of the
+    same user. Entries are dropped when the credential expires, after
+    ``idle_seconds`` without use, or when the pool exceeds ``max_size``. A
+    dropped client is closed as soon as no call is using it, and the rate
+    limiter state of its token is released once no other pooled client
+    shares the token.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = DEFAULT_POOL_SIZE,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_size = max(1, max_size)
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, _PoolEntry] = OrderedDict()
+        self._retired: list[_PoolEntry] = []
+
+    @classmethod
+    def from_env(cls) -> "KaitenClientPool":
+        return cls(
+            max_size=int(os.environ.get("KAITEN_MCP_CLIENT_POOL_SIZE", DEFAULT_POOL_SIZE)),
+            idle_seconds=float(
+                os.environ.get("KAITEN_MCP_CLIENT_IDLE_SECONDS", DEFAULT_IDLE_SECONDS)
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def acquire(self, credential: KaitenCredential) -> KaitenClient:
+        """Return the live client for ``credential``, creating it if needed."""
+        now = self._clock()
+        self._prune(now)
+        entry = self._entries.get(credential.id)
+        if entry is None:
+            entry = _PoolEntry(
+                client=KaitenClient(
+                    domain=credential.subdomain or None,
+                    token=credential.token,
+                    base_domain=credential.base_domain,
+                    base_url=credential.base_url,
+                ),
+                expires_at=credential.expires_at,
+                last_used=now,
+            )
+            self._entries[credential.id] = entry
+        else:
+            self._entries.move_to_end(credential.id)
+        entry.in_use += 1
+        entry.last_used = now
+        self._evict_overflow()
+        return entry.client
+
+    async def release(self, client: KaitenClient) -> None:
+        """Mark a call using ``client`` as finished and close retired clients."""
+        now = self._clock()
+        for entry in (*self._entries.values(), *self._retired):
+            if entry.client is client:
+                entry.in_use = max(0, entry.in_use - 1)
+                entry.last_used = now
+                break
+        self._prune(now)
+        await self._close_retired()
+
+    async def close(self) -> None:
+        """Close every pooled client, including ones still in use."""
+        retired = [*self._retired, *self._entries.values()]
+        self._entries.clear()
+        self._retired.clear()
+        for entry in retired:
+            await self._close_entry(entry)
+
+    def _prune(self, now: float) -> None:
+        for credential_id, entry in list(self._entries.items()):
+            expired = entry.expires_at <= now
+            idle = entry.in_use == 0 and now - entry.last_used >= self.idle_seconds
+            if expired or idle:
+                self._retired.append(self._entries.pop(credential_id))
+
+    def _evict_overflow(self) -> None:
+        for credential_id, entry in list(self._entries.items()):
+            if len(self._entries) <= self.max_size:
+                break
+            if entry.in_use == 0:
+                self._retired.append(self._entries.pop(credential_id))
+
+    async def _close_retired(self) -> None:
+        closing = [entry for entry in self._retired if not entry.in_use]
+        self._retired = [entry for entry in self._retired if entry.in_use]
+        for entry in closing:
+            await self._close_entry(entry)
+
+    async def _close_entry(self, entry: _PoolEntry) -> None:
+        await entry.client.close()
+        token = entry.client.token
+        if not any(
+            other.client.token == token for other in (*self._entries.values(), *self._retired)
+        ):
+            release_rate_limiter(token)
@@ -0,0 +1,134 @@
+"""On-demand CPU and memory profiling of tool calls.
+
+``KAITEN_MCP_PROFILE`` holds comma-separated glob patterns of tool names
+(``kaiten_list_all_*``, ``*``). Each matching call runs its handler and the
+result serialization under :mod:`cProfile` and writes the profile to
+``$KAITEN_MCP_OUTPUT_DIR/profiles``: a ``.prof`` file for ``pstats``/snakeviz
+and a ``.txt`` summary of the hottest functions. With
+``KAITEN_MCP_PROFILE_MEMORY=1`` the call is also traced with
+:mod:`tracemalloc` and its peak memory and top allocation sites are written
+to a ``.mem.txt`` file.
+
+cProfile sees the whole thread, so other coroutines that run while a
+profiled call awaits Kaiten appear in its profile too. Only one call is
+profiled at a time; matching calls that overlap it run unprofiled.
+"""
+
+import contextlib
+import cProfile
+import fnmatch
+import io
+import itertools
+import logging
+import os
+import pstats
+import re
+import tempfile
+import threading
+import tracemalloc
+from collections.abc import Iterator, Sequence
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP = 40
+_FALSE_VALUES = {"", "0", "false", "no", "off"}
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class ToolProfiler:
+    """Profile tool calls whose names match one of ``patterns``."""
+
+    def __init__(
+        self,
+        patterns: Sequence[str] = (),
+        *,
+        memory: bool = False,
+        output_dir: str | None = None,
+        top: int = DEFAULT_TOP,
+    ):
+        self.patterns = tuple(pattern for pattern in patterns if pattern)
+        self.memory = memory
+        self.output_dir = output_dir or os.path.join(tempfile.gettempdir(), "kaiten-mcp")
+        self.top = top
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self.profiled = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_env(cls) -> "ToolProfiler":
+        return cls(
+            [pattern.strip() for pattern in os.environ.get("KAITEN_MCP_PROFILE", "").split(",")],
+            memory=os.environ.get("KAITEN_MCP_PROFILE_MEMORY", "").strip().lower()
+            not in _FALSE_VALUES,
+            output_dir=os.environ.get("KAITEN_MCP_OUTPUT_DIR") or None,
+        )
+
+    def matches(self, name: str) -> bool:
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.patterns)
+
+    @contextlib.contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """Profile the block if ``name`` matches and no other call is being profiled."""
+        if not self.patterns or not self.matches(name):
+            yield
+            return
+        if not self._lock.acquire(blocking=False):
+            self.skipped += 1
+            yield
+            return
+        try:
+            started_tracemalloc = False
+            if self.memory:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    started_tracemalloc = True
+                tracemalloc.reset_peak()
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                snapshot, peak = None, 0
+                if self.memory:
+                    _, peak = tracemalloc.get_traced_memory()
+                    snapshot = tracemalloc.take_snapshot()
+                    if started_tracemalloc:
+                        tracemalloc.stop()
+                self.profiled += 1
+                base = self._base_path(name)
+                try:
+                    self._write(base, profiler, snapshot, peak)
+                except OSError:
+                    logger.warning("Could not write profile %s", base, exc_info=True)
+        finally:
+            self._lock.release()
+
+    def _base_path(self, name: str) -> str:
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = (
+            f"{_UNSAFE_FILENAME_RE.sub('_', name)}_{ts}_{os.getpid()}_{next(self._sequence)}"
+        )
+        return os.path.join(self.output_dir, "profiles", filename)
+
+    def _write(
+        self,
+        base: str,
+        profiler: cProfile.Profile,
+        snapshot: tracemalloc.Snapshot | None,
+        peak: int,
+    ) -> None:
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        profiler.dump_stats(f"{base}.prof")
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(self.top)
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        if snapshot is not None:
+            with open(f"{base}.mem.txt", "w", encoding="utf-8") as f:
+                f.write(f"peak_bytes: {peak}\n\n")
+                for stat in snapshot.statistics("lineno")[: self.top]:
+                    f.write(f"{stat}\n")
+        logger.info("Wrote tool call profile %s.prof", base)
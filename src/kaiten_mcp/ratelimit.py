@@ -0,0 +1,463 @@
+"""Token-bucket rate limiting shared by Kaiten clients.
+
+Kaiten enforces its request limit per API token, so every client that uses the
+same token must draw from one bucket. Buckets are keyed by a hash of the token
+and live in a pluggable backend:
+
+- ``memory`` (default): shared by all clients in the current process.
+- ``file``: a tiny ``flock``-protected state file per token, shared by every
+  process on the host that points at the same directory (put it on tmpfs,
+  e.g. ``/dev/shm``, to keep it in memory).
+
+Requests that have to wait for a token are granted in priority order:
+interactive calls (single-entity reads and writes) go ahead of bulk
+pagination pages, see :func:`request_priority`.
+
+The refill rate adapts to upstream feedback (AIMD): it is halved on HTTP 429,
+creeps back up while requests succeed, honours ``Retry-After`` and adopts the
+ceiling advertised by ``RateLimit-Policy``-style headers. The ceiling defaults
+to the configured rate, which already sits just under Kaiten's documented
+limit, so out of the box AIMD only backs off and recovers; it probes above the
+configured rate only when ``KAITEN_RATE_LIMIT_MAX_RPS`` or an advertised
+policy sets a higher ceiling.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import enum
+import hashlib
+import logging
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+from typing import Any, Protocol
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+DEFAULT_RATE = 4.5  # tokens per second, stays under Kaiten's 5 req/s limit
+DEFAULT_BURST = 5.0  # Kaiten allows short bursts up to the per-second limit
+
+# Interactive grants in a row while bulk requests wait before one bulk request goes
+DEFAULT_INTERACTIVE_STREAK = 4
+
+# AIMD rate control
+MIN_RATE = 0.5  # never throttle below this many requests per second
+RATE_INCREASE_PER_SECOND = 0.25  # additive increase per second of successful traffic
+RATE_DECREASE_FACTOR = 0.5  # multiplicative decrease on HTTP 429
+ADVERTISED_LIMIT_HEADROOM = 0.9  # stay this far under a limit announced in headers
+
+logger = logging.getLogger(__name__)
+
+_STATE_FORMAT = "<dd"  # tokens, updated_at
+_STATE_SIZE = struct.calcsize(_STATE_FORMAT)
+
+
+class Priority(enum.IntEnum):
+    """Scheduling class of an upstream request; lower values go first."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "kaiten_request_priority", default=Priority.INTERACTIVE
+)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Send the requests made inside the block with ``priority``.
+
+    Tasks started inside the block inherit it, so a coalesced or cached GET
+    fetched on behalf of a bulk scan keeps the bulk priority.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class BucketBackend(Protocol):
+    """Storage for token-bucket state keyed by token hash.
+
+    A backend whose ``blocking`` is true may wait on locks or disk in
+    :meth:`reserve`; the limiter then calls it from a worker thread.
+    """
+
+    blocking: bool
+
+    def reserve(self, key: str, rate: float, burst: float) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+
+    def forget(self, key: str) -> None:
+        """Drop the state this process keeps for ``key``."""
+
+
+def _take_token(
+    tokens: float, updated_at: float, now: float, rate: float, burst: float
+) -> tuple[float, float]:
+    """Refill the bucket up to ``now``, take one token and return ``(tokens, delay)``.
+
+    Tokens may go negative: a negative balance is a queue of reservations that
+    become valid as the bucket refills, so concurrent callers are spaced out
+    without holding a lock while they sleep.
+    """
+    elapsed = max(0.0, now - updated_at)
+    tokens = min(burst, tokens + elapsed * rate) - 1.0
+    delay = 0.0 if tokens >= 0 else -tokens / rate
+    return tokens, delay
+
+
+class InProcessBucketBackend:
+    """Buckets shared by all clients in the current process."""
+
+    blocking = False
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state: dict[str, tuple[float, float]] = {}
+
+    def reserve(self, key: str, rate: float, burst: float) -> float:
+        with self._lock:
+            now = self._clock()
+            tokens, updated_at = self._state.get(key, (burst, now))
+            tokens, delay = _take_token(tokens, updated_at, now, rate, burst)
+            self._state[key] = (tokens, now)
+        return delay
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            self._state.pop(key, None)
+
+
+class FileLockBucketBackend:
+    """Buckets stored in ``flock``-protected files shared across processes."""
+
+    blocking = True
+
+    def __init__(self, directory: str):
+        if fcntl is None:  # pragma: no cover - non-POSIX platforms
+            raise ValueError("file rate-limit backend requires fcntl (POSIX only)")
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.bucket")
+
+    def reserve(self, key: str, rate: float, burst: float) -> float:
+        fd = os.open(self._path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()  # wall clock: comparable across processes
+            raw = os.pread(fd, _STATE_SIZE, 0)
+            if len(raw) == _STATE_SIZE:
+                tokens, updated_at = struct.unpack(_STATE_FORMAT, raw)
+            else:
+                tokens, updated_at = burst, now
+            tokens, delay = _take_token(tokens, updated_at, now, rate, burst)
+            os.pwrite(fd, struct.pack(_STATE_FORMAT, tokens, now), 0)
+        finally:
+            os.close(fd)  # also releases the flock
+        return delay
+
+    def forget(self, key: str) -> None:
+        """Keep the file: other processes may still share the bucket."""
+
+
+def parse_seconds(value: str | None) -> float | None:
+    """Parse a delta-seconds header value; epoch timestamps are converted to a delta."""
+    if value is None:
+        return None
+    try:
+        seconds = float(value.strip())
+    except ValueError:
+        return None
+    if seconds > 1_000_000_000:  # absolute epoch time, as some servers send
+        seconds -= time.time()
+    return max(0.0, seconds)
+
+
+_QUOTA_RE = re.compile(r"(?:^\s*|;\s*q=)(\d+(?:\.\d+)?)")
+_WINDOW_RE = re.compile(r";\s*w=(\d+(?:\.\d+)?)")
+
+
+def parse_rate_policy(value: str) -> float | None:
+    """Return requests per second from a rate-limit policy header.
+
+    Accepts ``"5;w=1"`` and ``"default";q=5;w=1`` items (the strictest one
+    wins). Only policies that state their window are trusted; a bare limit
+    could be per second, minute or hour.
+    """
+    rates = []
+    for item in value.split(","):
+        quota, window = _QUOTA_RE.search(item), _WINDOW_RE.search(item)
+        if quota and window and float(window.group(1)) > 0:
+            rates.append(float(quota.group(1)) / float(window.group(1)))
+    return min(rates) if rates else None
+
+
+def token_key(token: str) -> str:
+    """Return a stable, non-reversible bucket key for an API token."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+class RateLimiter:
+    """Token-bucket limiter for one Kaiten API token.
+
+    A caller that cannot be sent right away reserves a future slot in the
+    bucket, but slots are handed out by priority rather than by arrival: when
+    a slot comes due it goes to the oldest waiting interactive request, unless
+    bulk requests have been passed over ``interactive_streak`` times in a row,
+    in which case the oldest bulk request gets it so bulk jobs keep moving.
+
+    With ``adaptive`` enabled, :meth:`observe` adjusts ``rate`` between
+    ``MIN_RATE`` and ``max_rate``. ``max_rate`` defaults to ``rate``: the
+    limiter then only backs off on throttling and recovers to ``rate``, and
+    never probes above it unless a higher ``max_rate`` is given or advertised.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        backend: BucketBackend | None = None,
+        interactive_streak: int = DEFAULT_INTERACTIVE_STREAK,
+        adaptive: bool = True,
+        max_rate: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate limit must be positive")
+        self.key = key
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.backend = backend if backend is not None else InProcessBucketBackend()
+        self.interactive_streak = max(1, interactive_streak)
+        self.adaptive = adaptive
+        self.max_rate = max(rate, max_rate or rate)
+        self.min_rate = min(rate, MIN_RATE)
+        self._clock = clock
+        self._sleep = sleep
+        self._timers: set[asyncio.Task[None]] = set()
+        self._waiters: dict[Priority, deque[asyncio.Future[None]]] = {
+            priority: deque() for priority in Priority
+        }
+        self._streak = 0
+        self._paused_until = 0.0
+        self._decrease_hold_until = 0.0
+        self.counters: Counter[str] = Counter()
+
+    def reserve(self) -> float:
+        return self.backend.reserve(self.key, self.rate, self.burst)
+
+    async def _reserve_async(self) -> float:
+        # Waiting on another process's flock must not stall the event loop
+        if getattr(self.backend, "blocking", False):
+            return await asyncio.to_thread(self.reserve)
+        return self.reserve()
+
+    async def acquire(self, priority: Priority | None = None) -> float:
+        """Wait until a request may be sent; return the time spent waiting.
+
+        ``priority`` defaults to the one set by :func:`request_priority`.
+        """
+        started = self._clock()
+        pause = self._paused_until - started
+        if pause > 0:
+            await self._sleep(pause)
+        delay = await self._reserve_async()
+        if delay > 0:
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self._waiters[current_priority() if priority is None else priority].append(waiter)
+            # Every reserved slot grants exactly one waiter, not necessarily this one
+            timer = asyncio.ensure_future(self._grant_after(delay))
+            self._timers.add(timer)
+            timer.add_done_callback(self._timers.discard)
+            # Cancelling the caller cancels ``waiter`` too, so a later slot skips it
+            await waiter
+        elif pause <= 0:
+            return 0.0
+        # Sleeps overshoot, and the bucket refills meanwhile: report what really passed
+        return self._clock() - started
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Adapt the rate to one upstream response (no-op unless ``adaptive``)."""
+        if not self.adaptive:
+            return
+        now = self._clock()
+        self._apply_rate_headers(headers, now)
+        if status_code == 429:
+            self.counters["throttled"] += 1
+            retry_after = parse_seconds(headers.get("Retry-After"))
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            # Concurrent requests see the same throttling: decrease once per hold
+            if now >= self._decrease_hold_until:
+                self._set_rate(self.rate * RATE_DECREASE_FACTOR)
+                self._decrease_hold_until = now + max(1.0, retry_after or 0.0)
+                self.counters["decreases"] += 1
+                logger.info("Kaiten throttled requests, rate lowered to %.2f req/s", self.rate)
+        elif status_code < 400 and self.rate < self.max_rate:
+            # About ``rate`` successes per second -> +RATE_INCREASE_PER_SECOND per second
+            self._set_rate(self.rate + RATE_INCREASE_PER_SECOND / self.rate)
+
+    def _apply_rate_headers(self, headers: Mapping[str, str], now: float) -> None:
+        policy = headers.get("RateLimit-Policy") or headers.get("X-RateLimit-Policy")
+        advertised = parse_rate_policy(policy) if policy else None
+        if advertised is not None:
+            self.max_rate = max(self.min_rate, advertised * ADVERTISED_LIMIT_HEADROOM)
+            self._set_rate(self.rate)
+        remaining = headers.get("RateLimit-Remaining") or headers.get("X-RateLimit-Remaining")
+        if remaining is not None and remaining.strip() == "0":
+            reset = parse_seconds(
+                headers.get("RateLimit-Reset") or headers.get("X-RateLimit-Reset")
+            )
+            if reset is not None:
+                self._paused_until = max(self._paused_until, now + reset)
+
+    def _set_rate(self, rate: float) -> None:
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+
+    def stats(self) -> dict[str, Any]:
+        """Return the learned rate and adaptation counters."""
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": round(self.max_rate, 3),
+            "adaptive": self.adaptive,
+            **self.counters,
+        }
+
+    async def _grant_after(self, delay: float) -> None:
+        await self._sleep(delay)
+        self._grant()
+
+    def _grant(self) -> None:
+        interactive = self._pending(Priority.INTERACTIVE)
+        bulk = self._pending(Priority.BULK)
+        if bulk and (not interactive or self._streak >= self.interactive_streak):
+            self._streak = 0
+            bulk.popleft().set_result(None)
+        elif interactive:
+            if bulk:
+                self._streak += 1
+            interactive.popleft().set_result(None)
+
+    def _pending(self, priority: Priority) -> "deque[asyncio.Future[None]]":
+        waiters = self._waiters[priority]
+        while waiters and waiters[0].done():
+            waiters.popleft()
+        return waiters
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be a number") from e
+
+
+def _default_directory() -> str:
+    return os.environ.get("KAITEN_RATE_LIMIT_DIR", "").strip() or os.path.join(
+        tempfile.gettempdir(), "kaiten-mcp-ratelimit"
+    )
+
+
+_backends: dict[tuple[str, str], BucketBackend] = {}
+_limiters: dict[tuple[str, str, str, float, float, float, bool], RateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def _configured_backend() -> tuple[tuple[str, str], BucketBackend]:
+    kind = os.environ.get("KAITEN_RATE_LIMIT_BACKEND", "memory").strip().lower() or "memory"
+    if kind not in {"memory", "file"}:
+        raise ValueError("KAITEN_RATE_LIMIT_BACKEND must be 'memory' or 'file'")
+    backend_id = (kind, _default_directory() if kind == "file" else "")
+    backend = _backends.get(backend_id)
+    if backend is None:
+        backend = (
+            FileLockBucketBackend(backend_id[1]) if kind == "file" else InProcessBucketBackend()
+        )
+        _backends[backend_id] = backend
+    return backend_id, backend
+
+
+def get_rate_limiter(token: str) -> RateLimiter:
+    """Return the shared limiter for ``token`` using the configured backend.
+
+    Configuration is read from ``KAITEN_RATE_LIMIT_BACKEND``,
+    ``KAITEN_RATE_LIMIT_DIR``, ``KAITEN_RATE_LIMIT_RPS``,
+    ``KAITEN_RATE_LIMIT_BURST``, ``KAITEN_RATE_LIMIT_MAX_RPS`` and
+    ``KAITEN_RATE_LIMIT_ADAPTIVE``.
+    """
+    rate = _env_float("KAITEN_RATE_LIMIT_RPS", DEFAULT_RATE)
+    burst = _env_float("KAITEN_RATE_LIMIT_BURST", DEFAULT_BURST)
+    max_rate = _env_float("KAITEN_RATE_LIMIT_MAX_RPS", rate)
+    adaptive = os.environ.get("KAITEN_RATE_LIMIT_ADAPTIVE", "1").strip().lower() not in {
+        "0",
+        "false",
+        "off",
+    }
+    key = token_key(token)
+    with _registry_lock:
+        backend_id, backend = _configured_backend()
+        limiter_key = (key, *backend_id, rate, burst, max_rate, adaptive)
+        limiter = _limiters.get(limiter_key)
+        if limiter is None:
+            limiter = RateLimiter(
+                key,
+                rate=rate,
+                burst=burst,
+                backend=backend,
+                adaptive=adaptive,
+                max_rate=max_rate,
+            )
+            _limiters[limiter_key] = limiter
+    return limiter
+
+
+def active_rate_limiters() -> list[RateLimiter]:
+    """Return the live limiters, one per token (the newest if its settings changed)."""
+    with _registry_lock:
+        return list({limiter.key: limiter for limiter in _limiters.values()}.values())
+
+
+def release_rate_limiter(token: str) -> None:
+    """Forget the limiters and in-process bucket of ``token`` once no client uses it.
+
+    Called when a pooled client is dropped, so per-credential state does not
+    pile up on a long-running multi-user server.
+    """
+    key = token_key(token)
+    with _registry_lock:
+        for limiter_key in [limiter_key for limiter_key in _limiters if limiter_key[0] == key]:
+            del _limiters[limiter_key]
+        for backend in _backends.values():
+            backend.forget(key)
+
+
+def reset_rate_limiters() -> None:
+    """Forget all in-process limiters and buckets (file buckets are left on disk)."""
+    with _registry_lock:
+        _limiters.clear()
+        _backends.clear()
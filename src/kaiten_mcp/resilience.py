@@ -0,0 +1,219 @@
+"""Retry backoff, retry budget and circuit breaker for upstream Kaiten calls.
+
+Both the budget and the breaker are shared by every client that talks to the
+same API base URL, so concurrent requests back off together during a Kaiten
+brownout instead of retrying in lockstep.
+"""
+
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_RETRY_BUDGET_RATIO = 0.2  # retries allowed per request sent
+DEFAULT_RETRY_BUDGET_RESERVE = 10.0  # retries available before any request was sent
+DEFAULT_FAILURE_THRESHOLD = 5  # consecutive 5xx/connection failures that open the circuit
+DEFAULT_COOLDOWN_SECONDS = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def decorrelated_jitter(
+    previous: float,
+    base: float,
+    cap: float,
+    rng: Callable[[float, float], float] = random.uniform,
+) -> float:
+    """Return the next backoff delay: ``min(cap, uniform(base, previous * 3))``.
+
+    Delays grow roughly exponentially but are spread out, so callers that
+    failed together do not retry together.
+    """
+    return min(cap, rng(base, max(base, previous * 3)))
+
+
+class RetryBudget:
+    """Caps retries at a fraction of the requests sent.
+
+    Every request deposits ``ratio`` tokens (up to ``reserve``), every retry
+    withdraws one. When the balance runs out, failures are returned to the
+    caller instead of being retried.
+    """
+
+    def __init__(
+        self,
+        ratio: float = DEFAULT_RETRY_BUDGET_RATIO,
+        reserve: float = DEFAULT_RETRY_BUDGET_RESERVE,
+    ):
+        self.ratio = ratio
+        self.reserve = max(1.0, reserve)
+        self._balance = self.reserve
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    @property
+    def balance(self) -> float:
+        return self._balance
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def try_retry(self) -> bool:
+        with self._lock:
+            if self._balance < 1.0:
+                self.exhausted += 1
+                return False
+            self._balance -= 1.0
+            return True
+
+
+class CircuitBreaker:
+    """Fails fast after sustained upstream failures.
+
+    ``failure_threshold`` consecutive failures open the circuit for
+    ``cooldown`` seconds; then a single probe request is let through
+    (half-open). Its success closes the circuit, its failure reopens it.
+    A probe that never reports back is replaced after another cool-down.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+                return HALF_OPEN
+            return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through (0 when closed).
+
+        While half-open this is the time left before the probe in flight is
+        given up and replaced.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return 0.0
+            started = self._opened_at if self._state == OPEN else self._probe_started_at
+            return max(0.0, self.cooldown - (self._clock() - started))
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent now."""
+        with self._lock:
+            now = self._clock()
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if now - self._opened_at < self.cooldown:
+                    return False
+                self._state = HALF_OPEN
+                self._probe_started_at = now
+                return True
+            if now - self._probe_started_at >= self.cooldown:
+                self._probe_started_at = now  # the previous probe went missing
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.trips += 1
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_after": round(self.retry_after(), 3),
+            "trips": self.trips,
+        }
+
+
+@dataclass
+class UpstreamGuard:
+    """Retry budget and circuit breaker of one upstream base URL."""
+
+    budget: RetryBudget
+    breaker: CircuitBreaker
+
+
+def _env_number(name: str, default: float) -> float:
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be a number") from e
+
+
+_guards: dict[str, UpstreamGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_upstream_guard(base_url: str) -> UpstreamGuard:
+    """Return the shared guard for ``base_url``.
+
+    Configuration is read from ``KAITEN_RETRY_BUDGET_RATIO``,
+    ``KAITEN_CIRCUIT_BREAKER_THRESHOLD`` and ``KAITEN_CIRCUIT_BREAKER_COOLDOWN``
+    when the guard is first created.
+    """
+    with _guards_lock:
+        guard = _guards.get(base_url)
+        if guard is None:
+            guard = UpstreamGuard(
+                budget=RetryBudget(
+                    ratio=_env_number("KAITEN_RETRY_BUDGET_RATIO", DEFAULT_RETRY_BUDGET_RATIO)
+                ),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(
+                        _env_number("KAITEN_CIRCUIT_BREAKER_THRESHOLD", DEFAULT_FAILURE_THRESHOLD)
+                    ),
+                    cooldown=_env_number(
+                        "KAITEN_CIRCUIT_BREAKER_COOLDOWN", DEFAULT_COOLDOWN_SECONDS
+                    ),
+                ),
+            )
+            _guards[base_url] = guard
+    return guard
+
+
+def circuit_breaker_states() -> dict[str, dict[str, Any]]:
+    """Return a snapshot of every upstream circuit breaker, keyed by base URL."""
+    with _guards_lock:
+        guards = dict(_guards)
+    return {base_url: guard.breaker.snapshot() for base_url, guard in guards.items()}
+
+
+def reset_upstream_guards() -> None:
+    with _guards_lock:
+        _guards.clear()
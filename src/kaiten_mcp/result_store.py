@@ -0,0 +1,195 @@
+"""Bounded store of large tool results, addressed by content and kept for a while.
+
+Instead of sending an oversized result in full, the runtime keeps it here and
+returns a ``result_id``. The ``kaiten_result_*`` tools then page, filter and
+re-project it without new upstream requests. Bulk fetches are kept as
+fetched, before their ``fields``/``compact`` projection, so a later
+projection can bring back fields the original call left out. Results are scoped to the
+credential that produced them, so on the multi-tenant HTTP server one user
+cannot read another user's data by guessing a handle.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from kaiten_mcp.auth import current_kaiten_credential
+
+DEFAULT_MAX_ENTRIES = 32
+# Measured as serialized JSON; the decoded objects take several times more
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 900.0
+
+STORED_TIP = (
+    "The full result is stored under result_id: page, filter or re-project it with "
+    "kaiten_result_slice, kaiten_result_filter or kaiten_result_project."
+)
+
+
+@dataclass(frozen=True)
+class Unprojected:
+    """Items of a bulk fetch as fetched, with the projection the tool returned them with."""
+
+    items: list[Any]
+    view: Callable[[Any], Any]
+
+
+# (projected result, its unprojected items) for the last bulk result produced
+_unprojected: ContextVar[tuple[Any, Unprojected] | None] = ContextVar(
+    "kaiten_mcp_unprojected", default=None
+)
+
+
+def mark_unprojected(data: Any, items: list[Any], view: Callable[[Any], Any]) -> None:
+    """Record that ``data`` is ``view(items)``, so the runtime can store ``items`` instead."""
+    _unprojected.set((data, Unprojected(items, view)))
+
+
+def take_unprojected(data: Any) -> Unprojected | None:
+    """Return what :func:`mark_unprojected` recorded for ``data``, clearing the mark."""
+    marked = _unprojected.get()
+    if marked is None:
+        return None
+    _unprojected.set(None)
+    return marked[1] if marked[0] is data else None
+
+
+@dataclass
+class StoredResult:
+    data: Any
+    size: int
+    owner: str | None
+    expires_at: float
+
+
+class ResultStore:
+    """LRU store of decoded results with a TTL, bounded by count and serialized size.
+
+    Values are shared between calls and must be treated as read-only. Storing
+    the same result again for the same owner returns the same handle and
+    refreshes its TTL.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, StoredResult] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters: Counter[str] = Counter()
+
+    @classmethod
+    def from_env(cls) -> "ResultStore | None":
+        """Build the store from ``KAITEN_MCP_RESULT_STORE*`` variables, or ``None`` if disabled."""
+        if os.environ.get("KAITEN_MCP_RESULT_STORE", "1").strip().lower() in {"0", "false", "off"}:
+            return None
+        return cls(
+            max_entries=int(
+                os.environ.get("KAITEN_MCP_RESULT_STORE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+            ),
+            max_bytes=int(os.environ.get("KAITEN_MCP_RESULT_STORE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            ttl=float(os.environ.get("KAITEN_MCP_RESULT_STORE_TTL", DEFAULT_TTL_SECONDS)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    @staticmethod
+    def handle_for(text: str, owner: str | None) -> str:
+        """Content address of serialized result ``text`` for ``owner``."""
+        digest = hashlib.blake2b(digest_size=12)
+        digest.update((owner or "").encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return "res_" + digest.hexdigest()
+
+    def put(self, data: Any, text: str, owner: str | None = None) -> str | None:
+        """Store ``data`` serialized as ``text``; return its handle, or ``None`` if too large."""
+        size = len(text)
+        if size > self.max_bytes:
+            return None
+        handle = self.handle_for(text, owner)
+        with self._lock:
+            if handle in self._entries:
+                self._drop(handle)
+            self._entries[handle] = StoredResult(data, size, owner, self._clock() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.counters["evictions"] += 1
+        return handle
+
+    def get(self, handle: str, owner: str | None = None) -> Any:
+        """Return the data stored under ``handle`` for ``owner``.
+
+        Raises ``KeyError`` when the handle is unknown, expired or belongs to
+        someone else; the three cases are indistinguishable on purpose.
+        """
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is not None and entry.expires_at <= self._clock():
+                self._drop(handle)
+                self.counters["expirations"] += 1
+                entry = None
+            if entry is None or entry.owner != owner:
+                self.counters["misses"] += 1
+                raise KeyError(handle)
+            self._entries.move_to_end(handle)
+            self.counters["hits"] += 1
+            return entry.data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, handle: str) -> None:
+        entry = self._entries.pop(handle)
+        self._bytes -= entry.size
+
+
+def current_owner() -> str | None:
+    """Owner of results stored in this call: the Kaiten credential, if any."""
+    credential = current_kaiten_credential()
+    return credential.id if credential is not None else None
+
+
+_store: ResultStore | None = None
+_store_loaded = False
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore | None:
+    """Return the shared result store, configured from the environment on first use."""
+    global _store, _store_loaded
+    with _store_lock:
+        if not _store_loaded:
+            _store = ResultStore.from_env()
+            _store_loaded = True
+    return _store
+
+
+def reset_result_store() -> None:
+    global _store, _store_loaded
+    with _store_lock:
+        _store = None
+        _store_loaded = False
@@ -1,16 +1,30 @@
 """Shared MCP runtime used by stdio and HTTP transports."""
 
-import json
 import logging
 import os
-from datetime import datetime
+import time
+from dataclasses import replace
 
 from dotenv import load_dotenv
 from mcp.server import Server
 from mcp.types import CallToolResult, TextContent, Tool
 
+from kaiten_mcp import metrics, tracing
+from kaiten_mcp.admission import AdmissionController, AdmissionRejected
 from kaiten_mcp.auth import current_kaiten_credential
 from kaiten_mcp.client import KaitenApiError, KaitenClient
+from kaiten_mcp.deadline import call_deadline, default_deadline_seconds
+from kaiten_mcp.output import new_output_path, output_dir, saved_summary
+from kaiten_mcp.pool import KaitenClientPool
+from kaiten_mcp.profiling import ToolProfiler
+from kaiten_mcp.result_store import (
+    STORED_TIP,
+    Unprojected,
+    current_owner,
+    get_result_store,
+    take_unprojected,
+)
+from kaiten_mcp.serialization import dumps, prepare, take_stripped
 from kaiten_mcp.tools import (
     audit_and_analytics,
     automations,
@@ -30,6 +44,7 @@ from kaiten_mcp.tools import (
     lanes,
     members,
     projects,
+    results,
     roles_and_groups,
     service_desk,
     spaces,
@@ -40,7 +55,8 @@ from kaiten_mcp.tools import (
     utilities,
     webhooks,
 )
-from kaiten_mcp.tools.compact import strip_base64
+from kaiten_mcp.tools.compact import FormattedText, is_columns, is_incomplete, summarize
+from kaiten_mcp.tools.pagination import get_cursor_registry
 
 load_dotenv()
 
@@ -69,6 +85,7 @@ TOOL_MODULES = [
     lanes,
     members,
     projects,
+    results,
     roles_and_groups,
     service_desk,
     spaces,
@@ -81,19 +98,15 @@ TOOL_MODULES = [
 ]
 
 _client: KaitenClient | None = None
+_client_pool = KaitenClientPool.from_env()
+_admission = AdmissionController.from_env()
+_profiler = ToolProfiler.from_env()
 
 
 def get_client() -> KaitenClient:
     credential = current_kaiten_credential()
     if credential is not None:
-        client = KaitenClient(
-            domain=credential.subdomain or None,
-            token=credential.token,
-            base_domain=credential.base_domain,
-            base_url=credential.base_url,
-        )
-        client._mcp_request_scoped = True  # type: ignore[attr-defined]
-        return client
+        return _client_pool.acquire(credential)
 
     global _client
     if _client is None:
@@ -106,11 +119,12 @@ async def close_client() -> None:
     if _client is not None:
         await _client.close()
         _client = None
+    await _client_pool.close()
+    await get_cursor_registry().close()
 
 
 async def close_request_client(client: KaitenClient) -> None:
-    if getattr(client, "_mcp_request_scoped", False):
-        await client.close()
+    await _client_pool.release(client)
 
 
 def _collect_tools() -> dict[str, dict]:
@@ -126,39 +140,69 @@ def _collect_tools() -> dict[str, dict]:
 ALL_TOOLS = _collect_tools()
 
 
+def _offload(
+    name: str, result: object, text: str, extension: str, unprojected: Unprojected | None = None
+) -> str | None:
+    """Save an oversized result to a file and/or the result store; return its summary.
+
+    Returns ``None`` when neither is available and the text goes out in full.
+    A partial bulk result keeps its ``incomplete``/``truncated`` marker in the
+    summary, and only its items are stored. A bulk fetch marked ``unprojected``
+    is stored as fetched, unless only its projection fits the store.
+    """
+    count, sample = summarize(result)
+    summary: dict | None = None
+    if output_dir():
+        file_path = new_output_path(name, extension)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        summary = saved_summary(file_path, count, len(text), sample)
+    store = get_result_store()
+    stored = result["items"] if is_incomplete(result) else result
+    # Columns and text layouts are left out: the result tools work on rows
+    if store is not None and extension == "json" and not isinstance(stored, str):
+        result_id = None
+        if unprojected is not None:
+            items = prepare(unprojected.items, size_limit=0).data
+            fetched = replace(unprojected, items=items)
+            result_id = store.put(fetched, dumps(items, indent=False), current_owner())
+        if result_id is None and not is_columns(stored):
+            result_id = store.put(stored, text, current_owner())
+        if result_id is not None:
+            if summary is None:
+                summary = {"total_items": count, "size_bytes": len(text), "sample": sample}
+            summary["result_id"] = result_id
+            summary["tip"] = STORED_TIP
+    if summary is None:
+        return None
+    if is_incomplete(result):
+        # The marker plus anything needed to resume, such as a cursor page's next_cursor
+        summary.update((key, value) for key, value in result.items() if key != "items")
+    return dumps(summary, indent=False)
+
+
 def _serialize_result(name: str, result: object) -> str:
-    if isinstance(result, (dict, list)):
-        result, stripped = strip_base64(result)
-        text = json.dumps(result, ensure_ascii=False, indent=2, default=str)
-        if len(text) > COMPACT_JSON_THRESHOLD:
-            text = json.dumps(result, ensure_ascii=False, separators=(",", ":"), default=str)
-
-        output_dir = os.environ.get("KAITEN_MCP_OUTPUT_DIR")
-        if len(text) > FILE_OUTPUT_THRESHOLD and output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_path = os.path.join(output_dir, f"{name}_{ts}.json")
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(text)
-            count = len(result) if isinstance(result, list) else 1
-            sample = result[:3] if isinstance(result, list) else result
-            text = json.dumps(
-                {
-                    "saved_to": file_path,
-                    "total_items": count,
-                    "size_bytes": len(text),
-                    "sample": sample,
-                    "tip": "Read the saved file to process data. Use 'fields' parameter to reduce response size.",
-                },
-                ensure_ascii=False,
-                separators=(",", ":"),
-                default=str,
-            )
-        if stripped:
-            text += f"\n\n[Omitted {stripped} base64-encoded field(s). Data available via Kaiten web UI.]"
-        return text
-
-    return str(result) if result is not None else "OK"
+    unprojected = take_unprojected(result["items"] if is_incomplete(result) else result)
+    if isinstance(result, FormattedText):
+        text, extension, stripped = result.text, result.format, result.stripped
+    elif isinstance(result, (dict, list)):
+        prepared = prepare(
+            result, size_limit=COMPACT_JSON_THRESHOLD, pre_stripped=take_stripped(result)
+        )
+        result = prepared.data
+        # Pretty-print small results only; decided before encoding so it happens once
+        text = dumps(result, indent=prepared.estimated_size <= COMPACT_JSON_THRESHOLD)
+        extension, stripped = "json", prepared.stripped
+    else:
+        return str(result) if result is not None else "OK"
+
+    if len(text) > FILE_OUTPUT_THRESHOLD:
+        text = _offload(name, result, text, extension, unprojected) or text
+    if stripped:
+        text += (
+            f"\n\n[Omitted {stripped} base64-encoded field(s). Data available via Kaiten web UI.]"
+        )
+    return text
 
 
 app = Server("kaiten-mcp")
@@ -176,20 +220,58 @@ async def list_tools() -> list[Tool]:
     ]
 
 
+async def _run_tool(name: str, arguments: dict) -> CallToolResult:
+    handler = ALL_TOOLS[name]["handler"]
+    client = get_client()
+    with _profiler.profile(name):
+        try:
+            # The server default bounds every call; bulk tools may ask for less
+            with (
+                call_deadline(default_deadline_seconds()),
+                call_deadline(arguments.get("deadline_seconds") or None),
+            ):
+                result = await handler(client, arguments)
+        finally:
+            await close_request_client(client)
+        with tracing.span("serialize", tool=name) as span:
+            text = _serialize_result(name, result)
+            size = len(text.encode("utf-8"))
+            span.set_attribute("bytes", size)
+    metrics.TOOL_RESPONSE_BYTES.observe(size, tool=name)
+    return CallToolResult(content=[TextContent(type="text", text=text)])
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: dict) -> CallToolResult:
+    started = time.perf_counter()
+    with tracing.span("call_tool", tool=name) as span:
+        result = await _call_tool(name, arguments)
+        if result.isError:
+            span.set_error(getattr(result.content[0], "text", ""))
+    if name in ALL_TOOLS:  # unknown names would make the tool label unbounded
+        outcome = "error" if result.isError else "ok"
+        metrics.TOOL_CALL_DURATION.observe(
+            time.perf_counter() - started, tool=name, outcome=outcome
+        )
+    return result
+
+
+async def _call_tool(name: str, arguments: dict) -> CallToolResult:
     try:
         if name not in ALL_TOOLS:
             return CallToolResult(content=[TextContent(type="text", text=f"Unknown tool: {name}")])
 
-        handler = ALL_TOOLS[name]["handler"]
-        client = get_client()
-        try:
-            result = await handler(client, arguments)
-        finally:
-            await close_request_client(client)
-        text = _serialize_result(name, result)
-        return CallToolResult(content=[TextContent(type="text", text=text)])
+        credential = current_kaiten_credential()
+        if credential is None:
+            return await _run_tool(name, arguments)
+        # Multi-tenant server: share execution slots fairly between users
+        async with _admission.admit(credential.user_id or credential.id):
+            return await _run_tool(name, arguments)
+    except AdmissionRejected as e:
+        return CallToolResult(
+            content=[TextContent(type="text", text=f"Server overloaded: {e}")],
+            isError=True,
+        )
     except KaitenApiError as e:
         return CallToolResult(
             content=[
@@ -0,0 +1,227 @@
+"""Single-pass JSON encoding of tool results.
+
+:func:`prepare` walks a result once: it replaces base64 data URIs held in
+object fields with a size placeholder, copying only the containers that hold
+one, and estimates the
+length of the indented JSON text until it passes a limit. :func:`dumps` then
+encodes the result once, indented or compact as the caller chose from that
+estimate, with
+:mod:`orjson` when it is installed (``pip install 'kaiten-mcp[fast]'``) and
+the standard library otherwise. ``KAITEN_MCP_JSON_BACKEND=stdlib`` forces the
+standard library.
+
+Producers that already stripped the exact object a tool handler returns
+(``compact.ProjectionPlan``) say so with :func:`mark_stripped`; the runtime
+then only estimates the size of that object instead of walking all of it.
+"""
+
+import json
+import math
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the optional "fast" extra
+    orjson = None  # type: ignore[assignment]
+
+INDENT = 2
+
+if orjson is not None:
+    # Leave datetimes and dataclasses to default=str, as json.dumps does
+    _ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+# (object, stripped count) for the last result produced already stripped
+_pre_stripped: ContextVar[tuple[Any, int] | None] = ContextVar(
+    "kaiten_mcp_pre_stripped", default=None
+)
+
+
+@dataclass
+class Prepared:
+    data: Any
+    stripped: int = 0
+    # Length of json.dumps(data, indent=2), not counting string escapes; stops
+    # growing soon after it passes size_limit
+    estimated_size: int = 0
+    size_limit: float = math.inf
+    # Set when the data URIs are known to be stripped already
+    clean: bool = False
+
+
+def data_uri_placeholder(value: str) -> str:
+    """Replace data URI with size placeholder."""
+    size_kb = len(value) // 1024
+    return f"[base64 ~{size_kb}KB, omitted]"
+
+
+def mark_stripped(data: Any, stripped: int) -> None:
+    """Record that ``data`` has no data URIs left after ``stripped`` were replaced."""
+    _pre_stripped.set((data, stripped))
+
+
+def take_stripped(data: Any) -> int | None:
+    """Return the count :func:`mark_stripped` recorded for ``data``, clearing the mark."""
+    marked = _pre_stripped.get()
+    if marked is None:
+        return None
+    _pre_stripped.set(None)
+    return marked[1] if marked[0] is data else None
+
+
+def prepare(
+    data: Any, size_limit: float = math.inf, *, pre_stripped: int | None = None
+) -> Prepared:
+    """Strip data URIs from ``data`` and estimate its indented JSON size in one walk.
+
+    Once the estimate passes ``size_limit`` the rest of the walk only strips,
+    which is what large results need, or stops when ``pre_stripped`` says the
+    data is clean already. Containers without data URIs are returned as is,
+    not copied. Only object field values are stripped: strings directly in a
+    list, and primitives at the top level, are left alone.
+    """
+    prepared = Prepared(data, size_limit=size_limit)
+    if pre_stripped is not None:
+        prepared.stripped, prepared.clean = pre_stripped, True
+    if isinstance(data, (dict, list)):
+        prepared.data = _walk(data, 0, prepared)
+    return prepared
+
+
+def _walk(value: Any, depth: int, state: Prepared) -> Any:
+    if isinstance(value, str):
+        if value.startswith("data:"):
+            value = data_uri_placeholder(value)
+            state.stripped += 1
+        state.estimated_size += len(value) + 2
+        return value
+    if state.estimated_size > state.size_limit and isinstance(value, (dict, list)):
+        return value if state.clean else strip_data_uris(value, state)
+    if isinstance(value, dict):
+        if not value:
+            state.estimated_size += 2
+            return value
+        # "{", then per item a newline, the indent, '"key": ' and "," between items
+        pad = 1 + (depth + 1) * INDENT + 4
+        state.estimated_size += 1 + len(value) * (pad + 1) + depth * INDENT + 1
+        copy = None
+        for key, item in value.items():
+            state.estimated_size += len(key) if isinstance(key, str) else len(str(key))
+            new = _walk(item, depth + 1, state)
+            if new is not item:
+                if copy is None:
+                    copy = dict(value)
+                copy[key] = new
+        return value if copy is None else copy
+    if isinstance(value, list):
+        if not value:
+            state.estimated_size += 2
+            return value
+        pad = 1 + (depth + 1) * INDENT
+        state.estimated_size += 1 + len(value) * (pad + 1) + depth * INDENT + 1
+        items = None
+        for index, item in enumerate(value):
+            if isinstance(item, str):
+                state.estimated_size += len(item) + 2
+                continue
+            new = _walk(item, depth + 1, state)
+            if new is not item:
+                if items is None:
+                    items = list(value)
+                items[index] = new
+        return value if items is None else items
+    if value is None or value is True:
+        state.estimated_size += 4
+    elif value is False:
+        state.estimated_size += 5
+    elif isinstance(value, (int, float)):
+        state.estimated_size += len(repr(value))
+    else:  # encoded through default=str
+        state.estimated_size += len(str(value)) + 2
+    return value
+
+
+def strip_data_uris(value: dict[Any, Any] | list[Any], state: Prepared) -> Any:
+    """Strip-only walk of a container, counting into ``state.stripped``.
+
+    Scalars are handled inline; this is the hot path for the bulk of large results.
+    """
+    if isinstance(value, dict):
+        return _strip_dict(value, state)
+    return _strip_list(value, state)
+
+
+def _strip_dict(value: dict[Any, Any], state: Prepared) -> dict[Any, Any]:
+    copy = None
+    new: Any
+    for key, item in value.items():
+        if isinstance(item, str):
+            if not item.startswith("data:"):
+                continue
+            new = data_uri_placeholder(item)
+            state.stripped += 1
+        elif isinstance(item, dict):
+            new = _strip_dict(item, state)
+            if new is item:
+                continue
+        elif isinstance(item, list):
+            new = _strip_list(item, state)
+            if new is item:
+                continue
+        else:
+            continue
+        if copy is None:
+            copy = dict(value)
+        copy[key] = new
+    return value if copy is None else copy
+
+
+def _strip_list(value: list[Any], state: Prepared) -> list[Any]:
+    items = None
+    new: Any
+    for index, item in enumerate(value):
+        if isinstance(item, dict):
+            new = _strip_dict(item, state)
+            if new is item:
+                continue
+        elif isinstance(item, list):
+            new = _strip_list(item, state)
+            if new is item:
+                continue
+        else:
+            continue
+        if items is None:
+            items = list(value)
+        items[index] = new
+    return value if items is None else items
+
+
+def backend() -> str:
+    """Name of the JSON encoder :func:`dumps` uses: ``orjson`` or ``stdlib``."""
+    if orjson is None or os.environ.get("KAITEN_MCP_JSON_BACKEND", "").strip() == "stdlib":
+        return "stdlib"
+    return "orjson"
+
+
+def dumps(data: Any, *, indent: bool) -> str:
+    """Encode ``data`` like ``json.dumps(ensure_ascii=False, default=str)``.
+
+    ``indent`` selects two-space indentation, otherwise the output has no
+    whitespace between tokens.
+    """
+    if backend() == "orjson":
+        options = _ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else _ORJSON_OPTIONS
+        try:
+            return orjson.dumps(data, default=str, option=options).decode("utf-8")
+        except TypeError:  # e.g. integers beyond 64 bits; the stdlib handles them
+            pass
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=INDENT, default=str)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
@@ -2,7 +2,23 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT, compact_response, select_fields
+from kaiten_mcp.output import OUTPUT_FORMATS, stream_pages_to_file
+from kaiten_mcp.tools.compact import (
+    DEFAULT_LIMIT,
+    FORMAT_PROPERTY,
+    ProjectionPlan,
+    format_result,
+    formatted,
+    project,
+    project_fetched,
+)
+from kaiten_mcp.tools.pagination import PageBudget, cursor_page, fetch_pages, iter_pages
+from kaiten_mcp.tools.windows import (
+    DEFAULT_SPLIT_PAGES,
+    DEFAULT_WINDOWS,
+    SCAN_MODES,
+    scan_windows,
+)
 
 TOOLS: dict[str, dict] = {}
 
@@ -71,9 +87,10 @@ _tool(
                 "type": "integer",
                 "description": "Pagination offset.",
             },
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_audit_logs,
+    formatted(_list_audit_logs),
 )
 
 
@@ -114,8 +131,8 @@ async def _get_space_activity(client, args: dict) -> Any:
             params[key] = args[key]
     params["limit"] = args.get("limit", DEFAULT_LIMIT)
     result = await client.get(f"/spaces/{args['space_id']}/activity", params=params)
-    result = compact_response(result, args.get("compact", False))
-    return select_fields(result, args.get("fields"))
+    data = project(result, compact=args.get("compact", False), fields=args.get("fields"))
+    return format_result(data, args.get("format"))
 
 
 _tool(
@@ -161,6 +178,7 @@ _tool(
                 "type": "string",
                 "description": "Comma-separated field names to keep. Strips everything else.",
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["space_id"],
     },
@@ -178,8 +196,8 @@ async def _get_company_activity(client, args: dict) -> Any:
             params[key] = args[key]
     params["limit"] = args.get("limit", DEFAULT_LIMIT)
     result = await client.get("/company/activity", params=params)
-    result = compact_response(result, args.get("compact", False))
-    return select_fields(result, args.get("fields"))
+    data = project(result, compact=args.get("compact", False), fields=args.get("fields"))
+    return format_result(data, args.get("format"))
 
 
 _tool(
@@ -229,6 +247,7 @@ _tool(
                 "type": "string",
                 "description": "Comma-separated field names to keep. Strips everything else.",
             },
+            "format": FORMAT_PROPERTY,
         },
     },
     _get_company_activity,
@@ -270,22 +289,57 @@ async def _get_all_space_activity(client, args: dict) -> Any:
         if args.get(key) is not None:
             params[key] = args[key]
 
-    all_activity: list = []
-    for page in range(max_pages):
-        params["limit"] = page_size
-        params["offset"] = page * page_size
-        result = await client.get(
-            f"/spaces/{args['space_id']}/activity",
-            params=params,
+    path = f"/spaces/{args['space_id']}/activity"
+    if args.get("cursor") or args.get("batch_size"):
+        return await cursor_page(
+            client, args, path, params, page_size=page_size, max_pages=max_pages, compact=compact
+        )
+    start_offset = args.get("offset", 0)
+    if args.get("output_file"):
+        pages = iter_pages(
+            client,
+            path,
+            params,
+            page_size=page_size,
+            max_pages=max_pages,
+            start_offset=start_offset,
+        )
+        plan = ProjectionPlan(args.get("fields"), compact)
+        return await stream_pages_to_file(
+            pages,
+            "kaiten_get_all_space_activity",
+            args["output_file"],
+            plan.apply,
+            deadline=PageBudget.from_args(args).deadline,
+            start_offset=start_offset,
+        )
+
+    if args.get("scan_mode") == "windows":
+        scanned = await scan_windows(
+            client,
+            path,
+            params,
+            page_size=page_size,
+            max_pages=max_pages,
+            windows=args.get("windows", DEFAULT_WINDOWS),
+            split_pages=args.get("window_split_pages", DEFAULT_SPLIT_PAGES),
+            budget=PageBudget.from_args(args),
         )
-        if not result:
-            break
-        all_activity.extend(result)
-        if len(result) < page_size:
-            break
+        data = project_fetched(scanned.items, compact=compact, fields=args.get("fields"))
+        return scanned.wrap(format_result(data, args.get("format")))
 
-    result = compact_response(all_activity, compact)
-    return select_fields(result, args.get("fields"))
+    fetched = await fetch_pages(
+        client,
+        path,
+        params,
+        page_size=page_size,
+        max_pages=max_pages,
+        budget=PageBudget.from_args(args),
+        start_offset=start_offset,
+    )
+
+    data = project_fetched(fetched.items, compact=compact, fields=args.get("fields"))
+    return fetched.wrap(format_result(data, args.get("format")))
 
 
 _tool(
@@ -296,6 +350,10 @@ _tool(
         "For complete card flow history: actions='card_add,card_move,card_archive,"
         "card_join_board,card_revive'. "
         "Safety limit: 50 pages (5000 events). "
+        "If max_items, max_bytes or the deadline (deadline_seconds or the server's call "
+        "deadline) stops the fetch early, the result is "
+        "{items, incomplete: true, truncated: {reason, returned, resume_offset}}; "
+        "pass offset=resume_offset to continue. "
         "This is the EFFICIENT way to get location history for all cards in a space — "
         "one paginated endpoint instead of hundreds of individual card requests."
     ),
@@ -338,6 +396,77 @@ _tool(
                 "type": "string",
                 "description": "Comma-separated field names to keep. Strips everything else.",
             },
+            "format": FORMAT_PROPERTY,
+            "offset": {
+                "type": "integer",
+                "description": "Offset to start from, e.g. resume_offset of a truncated result",
+            },
+            "max_items": {
+                "type": "integer",
+                "description": "Stop after this many items",
+            },
+            "max_bytes": {
+                "type": "integer",
+                "description": (
+                    "Stop before the Kaiten responses exceed this many bytes (server default 32 MB)"
+                ),
+            },
+            "deadline_seconds": {
+                "type": "number",
+                "description": (
+                    "Stop fetching after this many seconds and return what was fetched, "
+                    "marked incomplete"
+                ),
+            },
+            "scan_mode": {
+                "type": "string",
+                "enum": list(SCAN_MODES),
+                "description": (
+                    "'offset' (default) pages through one result set. 'windows' splits the "
+                    "created_after..created_before range into time windows, scans them "
+                    "concurrently from offset 0, narrows windows that fill "
+                    "window_split_pages pages without refetching them and merges them "
+                    "de-duplicated by id: faster and consistent for long histories. Needs "
+                    "created_after; offset and cursors do not apply. max_pages counts the "
+                    "pages of all windows together. If max_pages, max_items, max_bytes or "
+                    "the deadline stops the scan, truncated.resume_windows lists the date "
+                    "bounds of the windows still to scan."
+                ),
+            },
+            "windows": {
+                "type": "integer",
+                "description": "Initial number of time windows for scan_mode='windows' (default 8)",
+            },
+            "window_split_pages": {
+                "type": "integer",
+                "description": (
+                    "Move past or split a window once it fills this many pages (default 10)"
+                ),
+            },
+            "batch_size": {
+                "type": "integer",
+                "description": (
+                    "Return only the first batch_size items and a next_cursor instead of "
+                    "fetching everything; pages are fetched as batches are consumed. A batch "
+                    "cut short by the deadline is marked incomplete and keeps its next_cursor"
+                ),
+            },
+            "cursor": {
+                "type": "string",
+                "description": (
+                    "next_cursor from a previous call: continues that scan with its filters, "
+                    "fields, format and batch_size. Cursors are single-use and expire when idle."
+                ),
+            },
+            "output_file": {
+                "type": "string",
+                "enum": list(OUTPUT_FORMATS),
+                "description": (
+                    "Stream pages straight into a file in KAITEN_MCP_OUTPUT_DIR as they arrive "
+                    "(json array or ndjson, one item per line) and return only its path, "
+                    "item count and a sample. Use for scans too large to hold in one response."
+                ),
+            },
         },
         "required": ["space_id"],
     },
@@ -364,9 +493,10 @@ _tool(
         "properties": {
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_saved_filters,
+    formatted(_list_saved_filters),
 )
 
 
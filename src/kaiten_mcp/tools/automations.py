@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT
+from kaiten_mcp.tools.compact import DEFAULT_LIMIT, FORMAT_PROPERTY, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -27,10 +27,11 @@ _tool(
         "type": "object",
         "properties": {
             "space_id": {"type": "integer", "description": "Space ID"},
+            "format": FORMAT_PROPERTY,
         },
         "required": ["space_id"],
     },
-    _list_automations,
+    formatted(_list_automations),
 )
 
 
@@ -259,9 +260,10 @@ _tool(
         "properties": {
             "limit": {"type": "integer", "description": "Maximum number of results"},
             "offset": {"type": "integer", "description": "Offset for pagination"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_workflows,
+    formatted(_list_workflows),
 )
 
 
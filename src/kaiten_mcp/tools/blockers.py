@@ -2,6 +2,8 @@
 
 from typing import Any
 
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, formatted
+
 TOOLS: dict[str, dict] = {}
 
 
@@ -33,10 +35,11 @@ _tool(
                 "type": "integer",
                 "description": "ID of the card whose blockers to list.",
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id"],
     },
-    handler=_list_card_blockers,
+    handler=formatted(_list_card_blockers),
 )
 
 
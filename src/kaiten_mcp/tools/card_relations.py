@@ -2,6 +2,8 @@
 
 from typing import Any
 
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, formatted
+
 TOOLS: dict[str, dict] = {}
 
 
@@ -33,10 +35,11 @@ _tool(
                 "type": "integer",
                 "description": "ID of the parent card.",
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id"],
     },
-    handler=_list_card_children,
+    handler=formatted(_list_card_children),
 )
 
 
@@ -124,10 +127,11 @@ _tool(
                 "type": "integer",
                 "description": "ID of the child card.",
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id"],
     },
-    handler=_list_card_parents,
+    handler=formatted(_list_card_parents),
 )
 
 
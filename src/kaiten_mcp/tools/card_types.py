@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT
+from kaiten_mcp.tools.compact import DEFAULT_LIMIT, FORMAT_PROPERTY, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -29,9 +29,10 @@ _tool(
             "query": {"type": "string", "description": "Search filter"},
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_card_types,
+    formatted(_list_card_types),
 )
 
 
@@ -2,7 +2,22 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT, compact_response, select_fields
+from kaiten_mcp.output import OUTPUT_FORMATS, stream_pages_to_file
+from kaiten_mcp.tools.compact import (
+    DEFAULT_LIMIT,
+    FORMAT_PROPERTY,
+    ProjectionPlan,
+    format_result,
+    project,
+    project_fetched,
+)
+from kaiten_mcp.tools.pagination import PageBudget, cursor_page, fetch_pages, iter_pages
+from kaiten_mcp.tools.windows import (
+    DEFAULT_SPLIT_PAGES,
+    DEFAULT_WINDOWS,
+    SCAN_MODES,
+    scan_windows,
+)
 
 TOOLS: dict[str, dict] = {}
 
@@ -54,8 +69,8 @@ async def _list_cards(client, args: dict) -> Any:
     params["limit"] = args.get("limit", DEFAULT_LIMIT)
     compact = args.get("compact", False)
     result = await client.get("/cards", params=params or None)
-    result = compact_response(result, compact)
-    return select_fields(result, args.get("fields"))
+    data = project(result, compact=compact, fields=args.get("fields"))
+    return format_result(data, args.get("format"))
 
 
 _tool(
@@ -108,6 +123,7 @@ _tool(
                 "type": "string",
                 "description": "Comma-separated field names to return per card. Strips everything else. Example: 'id,title,created,last_moved_to_done_at'",
             },
+            "format": FORMAT_PROPERTY,
         },
     },
     _list_cards,
@@ -480,19 +496,62 @@ async def _list_all_cards(client, args: dict) -> Any:
         if args.get(key) is not None:
             params[key] = args[key]
 
-    all_cards: list = []
-    for page in range(max_pages):
-        params["limit"] = page_size
-        params["offset"] = page * page_size
-        result = await client.get("/cards", params=params)
-        if not result:
-            break
-        all_cards.extend(result)
-        if len(result) < page_size:
-            break
-
-    result = compact_response(all_cards, compact)
-    return select_fields(result, args.get("fields"))
+    if args.get("cursor") or args.get("batch_size"):
+        return await cursor_page(
+            client,
+            args,
+            "/cards",
+            params,
+            page_size=page_size,
+            max_pages=max_pages,
+            compact=compact,
+        )
+    start_offset = args.get("offset", 0)
+    if args.get("output_file"):
+        pages = iter_pages(
+            client,
+            "/cards",
+            params,
+            page_size=page_size,
+            max_pages=max_pages,
+            start_offset=start_offset,
+        )
+        plan = ProjectionPlan(args.get("fields"), compact)
+        return await stream_pages_to_file(
+            pages,
+            "kaiten_list_all_cards",
+            args["output_file"],
+            plan.apply,
+            deadline=PageBudget.from_args(args).deadline,
+            start_offset=start_offset,
+        )
+
+    if args.get("scan_mode") == "windows":
+        scanned = await scan_windows(
+            client,
+            "/cards",
+            params,
+            page_size=page_size,
+            max_pages=max_pages,
+            windows=args.get("windows", DEFAULT_WINDOWS),
+            split_pages=args.get("window_split_pages", DEFAULT_SPLIT_PAGES),
+            budget=PageBudget.from_args(args),
+        )
+        data = project_fetched(scanned.items, compact=compact, fields=args.get("fields"))
+        return scanned.wrap(format_result(data, args.get("format")))
+
+    fetched = await fetch_pages(
+        client,
+        "/cards",
+        params,
+        page_size=page_size,
+        max_pages=max_pages,
+        budget=PageBudget.from_args(args),
+        start_offset=start_offset,
+    )
+
+    data = project_fetched(fetched.items, compact=compact, fields=args.get("fields"))
+    return fetched.wrap(format_result(data, args.get("format")))
 
 
 _tool(
@@ -500,6 +559,10 @@ _tool(
     (
         "Fetch ALL cards matching filters with automatic pagination. "
         "Returns combined results from all pages. Default safety limit: 50 pages (5000 cards). "
+        "If max_items, max_bytes or the deadline (deadline_seconds or the server's call "
+        "deadline) stops the fetch early, the result is "
+        "{items, incomplete: true, truncated: {reason, returned, resume_offset}}; "
+        "pass offset=resume_offset to continue. "
         "For basic Kanban metrics, the returned cards already contain timing fields: "
         "created, first_moved_to_in_progress_at, last_moved_to_done_at, "
         "time_spent_sum, time_blocked_sum — no need to call "
@@ -569,6 +632,78 @@ _tool(
                 "type": "string",
                 "description": "Comma-separated field names to return per card. For metrics: 'id,title,type_id,created,first_moved_to_in_progress_at,last_moved_to_done_at,time_spent_sum,time_blocked_sum,state,condition,due_date,column_id,lane_id,board_id'. For audit: 'id,title,state,board_id,column_id,last_moved_at,column_changed_at,comment_last_added_at,updated_at,created,due_date,owner_id,responsible_id,public,share_id,goals_total,goals_done,comments_total'",
             },
+            "format": FORMAT_PROPERTY,
+            "offset": {
+                "type": "integer",
+                "description": "Offset to start from, e.g. resume_offset of a truncated result",
+            },
+            "max_items": {
+                "type": "integer",
+                "description": "Stop after this many items",
+            },
+            "max_bytes": {
+                "type": "integer",
+                "description": (
+                    "Stop before the Kaiten responses exceed this many bytes (server default 32 MB)"
+                ),
+            },
+            "deadline_seconds": {
+                "type": "number",
+                "description": (
+                    "Stop fetching after this many seconds and return what was fetched, "
+                    "marked incomplete"
+                ),
+            },
+            "scan_mode": {
+                "type": "string",
+                "enum": list(SCAN_MODES),
+                "description": (
+                    "'offset' (default) pages through one result set. 'windows' splits the "
+                    "created_after..created_before range (or updated_*) into time windows, "
+                    "scans them concurrently from offset 0, narrows windows that fill "
+                    "window_split_pages pages without refetching them and merges them "
+                    "de-duplicated by id: "
+                    "faster and consistent for long histories. Needs created_after or "
+                    "updated_after; offset and cursors do not apply. max_pages counts the "
+                    "pages of all windows together. If max_pages, max_items, max_bytes or "
+                    "the deadline stops the scan, truncated.resume_windows lists the date "
+                    "bounds of the windows still to scan."
+                ),
+            },
+            "windows": {
+                "type": "integer",
+                "description": "Initial number of time windows for scan_mode='windows' (default 8)",
+            },
+            "window_split_pages": {
+                "type": "integer",
+                "description": (
+                    "Move past or split a window once it fills this many pages (default 10)"
+                ),
+            },
+            "batch_size": {
+                "type": "integer",
+                "description": (
+                    "Return only the first batch_size items and a next_cursor instead of "
+                    "fetching everything; pages are fetched as batches are consumed. A batch "
+                    "cut short by the deadline is marked incomplete and keeps its next_cursor"
+                ),
+            },
+            "cursor": {
+                "type": "string",
+                "description": (
+                    "next_cursor from a previous call: continues that scan with its filters, "
+                    "fields, format and batch_size. Cursors are single-use and expire when idle."
+                ),
+            },
+            "output_file": {
+                "type": "string",
+                "enum": list(OUTPUT_FORMATS),
+                "description": (
+                    "Stream pages straight into a file in KAITEN_MCP_OUTPUT_DIR as they arrive "
+                    "(json array or ndjson, one item per line) and return only its path, "
+                    "item count and a sample. Use for scans too large to hold in one response."
+                ),
+            },
         },
     },
     _list_all_cards,
@@ -2,6 +2,8 @@
 
 from typing import Any
 
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, formatted
+
 TOOLS: dict[str, dict] = {}
 
 
@@ -23,10 +25,11 @@ _tool(
         "type": "object",
         "properties": {
             "card_id": {"type": "integer", "description": "Card ID"},
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id"],
     },
-    _list_checklists,
+    formatted(_list_checklists),
 )
 
 
@@ -115,10 +118,11 @@ _tool(
         "properties": {
             "card_id": {"type": "integer", "description": "Card ID"},
             "checklist_id": {"type": "integer", "description": "Checklist ID"},
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id", "checklist_id"],
     },
-    _list_checklist_items,
+    formatted(_list_checklist_items),
 )
 
 
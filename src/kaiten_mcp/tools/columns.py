@@ -2,6 +2,8 @@
 
 from typing import Any
 
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, formatted
+
 TOOLS: dict[str, dict] = {}
 
 
@@ -22,10 +24,11 @@ _tool(
         "type": "object",
         "properties": {
             "board_id": {"type": "integer", "description": "Board ID"},
+            "format": FORMAT_PROPERTY,
         },
         "required": ["board_id"],
     },
-    _list_columns,
+    formatted(_list_columns),
 )
 
 
@@ -131,10 +134,11 @@ _tool(
         "type": "object",
         "properties": {
             "column_id": {"type": "integer", "description": "Column ID"},
+            "format": FORMAT_PROPERTY,
         },
         "required": ["column_id"],
     },
-    _list_subcolumns,
+    formatted(_list_subcolumns),
 )
 
 
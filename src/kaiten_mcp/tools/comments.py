@@ -1,6 +1,6 @@
 from typing import Any
 
-from kaiten_mcp.tools.compact import compact_response
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, compact_response, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -40,10 +40,11 @@ _tool(
                 "description": "Return compact response without heavy fields (avatars, nested user objects).",
                 "default": False,
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id"],
     },
-    handler=_list_comments,
+    handler=formatted(_list_comments),
 )
 
 
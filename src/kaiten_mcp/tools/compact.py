@@ -1,6 +1,24 @@
 """Compact response utilities for reducing payload size."""
 
-from typing import Any
+import csv
+import functools
+import io
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeGuard
+
+from kaiten_mcp.output import SAMPLE_SIZE
+from kaiten_mcp.result_store import mark_unprojected
+from kaiten_mcp.serialization import (
+    Prepared,
+    data_uri_placeholder,
+    dumps,
+    mark_stripped,
+    prepare,
+    strip_data_uris,
+    take_stripped,
+)
+from kaiten_mcp.tracing import traced
 
 # Default limit for list operations
 DEFAULT_LIMIT = 50
@@ -14,6 +32,22 @@ SIMPLIFY_LIST_FIELDS = {"members", "responsibles", "owners", "subscribers", "par
 # Fields to strip entirely in compact mode (heavy text blobs)
 STRIP_FIELDS = {"description"}
 
+ToolHandler = Callable[[Any, dict[str, Any]], Awaitable[Any]]
+
+# Layouts for list results; "rows" is the plain array of objects
+RESULT_FORMATS = ("rows", "columns", "ndjson", "csv")
+
+FORMAT_PROPERTY = {
+    "type": "string",
+    "enum": list(RESULT_FORMATS),
+    "description": (
+        "Result layout: 'rows' (default, array of objects), 'columns' (field names once "
+        "and one value array per field), 'ndjson' (one JSON object per line) or 'csv' "
+        "(header row, nested values as JSON). 'columns' and 'csv' do not repeat every "
+        "key on every item, which saves a lot on large lists."
+    ),
+}
+
 
 def _is_base64_avatar(value: Any) -> bool:
     """Check if a value is a base64 data URI (heavy avatar)."""
@@ -81,6 +115,7 @@ def _compact_list(data: list[Any]) -> list[Any]:
     return result
 
 
+@traced("compact_response")
 def compact_response(data: Any, compact: bool = False) -> Any:
     """
     Apply compact transformation to API response data.
@@ -108,46 +143,13 @@ def compact_response(data: Any, compact: bool = False) -> Any:
         return data
 
 
-def _strip_b64_value(value: str) -> str:
-    """Replace data URI with size placeholder."""
-    size_kb = len(value) // 1024
-    return f"[base64 ~{size_kb}KB, omitted]"
-
-
-def _strip_b64_dict(data: dict[str, Any], counter: list[int]) -> dict[str, Any]:
-    """Strip base64 data URIs from a dictionary."""
-    result: dict[str, Any] = {}
-    for key, value in data.items():
-        if isinstance(value, str) and value.startswith("data:"):
-            result[key] = _strip_b64_value(value)
-            counter[0] += 1
-        elif isinstance(value, dict):
-            result[key] = _strip_b64_dict(value, counter)
-        elif isinstance(value, list):
-            result[key] = _strip_b64_list(value, counter)
-        else:
-            result[key] = value
-    return result
-
-
-def _strip_b64_list(data: list[Any], counter: list[int]) -> list[Any]:
-    """Strip base64 data URIs from a list."""
-    result: list[Any] = []
-    for item in data:
-        if isinstance(item, dict):
-            result.append(_strip_b64_dict(item, counter))
-        elif isinstance(item, list):
-            result.append(_strip_b64_list(item, counter))
-        else:
-            result.append(item)
-    return result
-
-
+@traced("strip_base64")
 def strip_base64(data: Any) -> tuple[Any, int]:
     """Strip base64 data URIs from any field in API response.
 
     Always applied to all tool responses — unlike compact_response which is opt-in.
     Replaces data: URIs with a size placeholder like "[base64 ~5KB, omitted]".
+    Only the containers that hold a data URI are copied.
 
     Args:
         data: API response data (dict, list, or primitive)
@@ -155,14 +157,11 @@ def strip_base64(data: Any) -> tuple[Any, int]:
     Returns:
         Tuple of (sanitized_data, count_of_stripped_fields)
     """
-    counter = [0]
-    if isinstance(data, dict):
-        return _strip_b64_dict(data, counter), counter[0]
-    elif isinstance(data, list):
-        return _strip_b64_list(data, counter), counter[0]
-    return data, 0
+    prepared = prepare(data)
+    return prepared.data, prepared.stripped
 
 
+@traced("select_fields")
 def select_fields(data: Any, fields_str: str | None) -> Any:
     """Keep only specified fields from each item in a list.
 
@@ -185,3 +184,215 @@ def select_fields(data: Any, fields_str: str | None) -> Any:
     elif isinstance(data, dict):
         return {k: v for k, v in data.items() if k in keys}
     return data
+
+
+class ProjectionPlan:
+    """Field whitelist, compaction and base64 stripping compiled for one call.
+
+    ``apply`` returns the same data as ``select_fields(compact_response(data,
+    compact), fields)`` followed by ``strip_base64``, in one traversal that
+    builds only the output: fields are filtered first, compaction runs on the
+    surviving keys, and data URIs are replaced on the way. The result is
+    marked as stripped so the runtime does not walk it again.
+    """
+
+    def __init__(self, fields: str | None = None, compact: bool = False) -> None:
+        self.keys = frozenset(f.strip() for f in fields.split(",")) if fields else None
+        self.compact = compact
+        self._state = Prepared(None)
+
+    @traced("project")
+    def apply(self, data: Any) -> Any:
+        if self.keys is None and not self.compact:
+            return data
+        self._state = Prepared(None)
+        result: Any
+        if isinstance(data, list):
+            if self.keys is not None:
+                result = [self._dict(item, self.keys) for item in data if isinstance(item, dict)]
+            else:
+                result = self._list(data)
+        elif isinstance(data, dict):
+            result = self._dict(data, self.keys)
+        else:
+            return data
+        mark_stripped(result, self._state.stripped)
+        return result
+
+    def _dict(self, data: dict[str, Any], keys: frozenset[str] | None = None) -> dict[str, Any]:
+        result: dict[str, Any] = {}
+        for key, value in data.items():
+            if keys is not None and key not in keys:
+                continue
+            if not self.compact:
+                result[key] = self._strip(value)
+            elif key in STRIP_FIELDS or (
+                key in ("avatar_url", "avatar") and _is_base64_avatar(value)
+            ):
+                continue
+            elif key in SIMPLIFY_FIELDS and isinstance(value, dict):
+                result[key] = self._strip(_simplify_user(value))
+            elif key in SIMPLIFY_LIST_FIELDS and isinstance(value, list):
+                result[key] = self._strip(
+                    [_simplify_user(item) if isinstance(item, dict) else item for item in value]
+                )
+            elif isinstance(value, dict):
+                result[key] = self._dict(value)
+            elif isinstance(value, list):
+                result[key] = self._list(value)
+            else:
+                result[key] = self._strip(value)
+        return result
+
+    def _list(self, data: list[Any]) -> list[Any]:
+        result: list[Any] = []
+        for item in data:
+            if isinstance(item, dict):
+                result.append(self._dict(item))
+            elif isinstance(item, list):
+                result.append(self._list(item))
+            else:
+                result.append(item)
+        return result
+
+    def _strip(self, value: Any) -> Any:
+        if isinstance(value, str):
+            if not value.startswith("data:"):
+                return value
+            self._state.stripped += 1
+            return data_uri_placeholder(value)
+        if isinstance(value, (dict, list)):
+            return strip_data_uris(value, self._state)
+        return value
+
+
+def project(data: Any, *, compact: bool = False, fields: str | None = None) -> Any:
+    """Apply a one-off :class:`ProjectionPlan` for ``fields`` and ``compact`` to ``data``."""
+    return ProjectionPlan(fields, compact).apply(data)
+
+
+def project_fetched(items: list[Any], *, compact: bool = False, fields: str | None = None) -> Any:
+    """:func:`project` the items of a bulk fetch, remembering them as fetched.
+
+    If the result is too large to send and goes to the result store, the
+    store keeps ``items`` themselves, so ``kaiten_result_project`` can bring
+    back fields this projection left out.
+    """
+    data = project(items, compact=compact, fields=fields)
+    mark_unprojected(data, items, functools.partial(project, compact=compact, fields=fields))
+    return data
+
+
+@dataclass
+class FormattedText:
+    """A list result encoded as ``ndjson`` or ``csv`` text by :func:`format_result`."""
+
+    text: str
+    format: str
+    total_items: int
+    sample: list[Any] = field(default_factory=list)
+    stripped: int = 0
+
+
+def _field_names(rows: list[dict[str, Any]]) -> list[str]:
+    """Union of the keys of ``rows`` in first-seen order."""
+    names: dict[str, None] = {}
+    for row in rows:
+        names.update(dict.fromkeys(row))
+    return list(names)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (bool, dict, list)):
+        return dumps(value, indent=False)
+    return value
+
+
+@traced("format_result")
+def format_result(data: Any, fmt: str | None) -> Any:
+    """Lay out a list of objects as ``rows``, ``columns``, ``ndjson`` or ``csv``.
+
+    ``rows`` (or no format) returns ``data`` unchanged; so does any format
+    for data that is not a list of objects. ``columns`` returns a dict with
+    one value array per field, missing fields as ``None``; ``ndjson`` and
+    ``csv`` return a :class:`FormattedText` that the runtime sends as is or
+    saves with the matching file extension. Data URIs are stripped first.
+    """
+    if not fmt or fmt == "rows":
+        return data
+    if fmt not in RESULT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(RESULT_FORMATS)}")
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        return data
+
+    prepared = prepare(data, size_limit=0, pre_stripped=take_stripped(data))
+    rows: list[dict[str, Any]] = prepared.data
+    if fmt == "columns":
+        names = _field_names(rows)
+        result = {
+            "format": "columns",
+            "total_items": len(rows),
+            "columns": {name: [row.get(name) for row in rows] for name in names},
+        }
+        mark_stripped(result, prepared.stripped)
+        return result
+
+    if fmt == "ndjson":
+        text = "\n".join(dumps(row, indent=False) for row in rows)
+    else:
+        names = _field_names(rows)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(names)
+        writer.writerows([_csv_value(row.get(name)) for name in names] for row in rows)
+        text = buffer.getvalue()
+    return FormattedText(text, fmt, len(rows), rows[:SAMPLE_SIZE], prepared.stripped)
+
+
+def formatted(handler: ToolHandler) -> ToolHandler:
+    """Wrap a list tool's handler so its result honours the ``format`` argument.
+
+    For list tools whose handler has no layout step of its own; pair it with
+    ``FORMAT_PROPERTY`` in the tool's input schema.
+    """
+
+    @functools.wraps(handler)
+    async def run(client: Any, args: dict[str, Any]) -> Any:
+        return format_result(await handler(client, args), args.get("format"))
+
+    return run
+
+
+def is_columns(data: Any) -> bool:
+    """Whether ``data`` is a ``columns`` layout built by :func:`format_result`."""
+    return isinstance(data, dict) and data.get("format") == "columns"
+
+
+def is_incomplete(data: Any) -> TypeGuard[dict[str, Any]]:
+    """Whether ``data`` is a partial bulk result: ``{items, incomplete, truncated}``."""
+    return isinstance(data, dict) and data.get("incomplete") is True and "items" in data
+
+
+def summarize(data: Any) -> tuple[int, Any]:
+    """Item count and a short sample of a tool result, for saved-file summaries.
+
+    A partial bulk result is summarized by its ``items``; text layouts inside
+    it are sampled by line.
+    """
+    if is_incomplete(data):
+        items = data["items"]
+        if isinstance(items, str):
+            return data["truncated"]["returned"], items.splitlines()[:SAMPLE_SIZE]
+        return summarize(items)
+    if isinstance(data, FormattedText):
+        return data.total_items, data.sample
+    if isinstance(data, list):
+        return len(data), data[:SAMPLE_SIZE]
+    if is_columns(data):
+        columns = data["columns"]
+        return data["total_items"], {
+            name: values[:SAMPLE_SIZE] for name, values in columns.items()
+        }
+    return 1, data
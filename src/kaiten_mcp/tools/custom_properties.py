@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT
+from kaiten_mcp.tools.compact import DEFAULT_LIMIT, FORMAT_PROPERTY, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -58,9 +58,10 @@ _tool(
             },
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_custom_properties,
+    formatted(_list_custom_properties),
 )
 
 
@@ -292,10 +293,11 @@ _tool(
             },
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
         "required": ["property_id"],
     },
-    _list_select_values,
+    formatted(_list_select_values),
 )
 
 
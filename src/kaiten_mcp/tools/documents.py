@@ -4,7 +4,7 @@ import re
 import time
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT
+from kaiten_mcp.tools.compact import DEFAULT_LIMIT, FORMAT_PROPERTY, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -199,9 +199,10 @@ _tool(
             "query": {"type": "string", "description": "Search filter"},
             "limit": {"type": "integer", "description": "Max results (default: 50)"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_documents,
+    formatted(_list_documents),
 )
 
 
@@ -354,9 +355,10 @@ _tool(
             "query": {"type": "string", "description": "Search filter"},
             "limit": {"type": "integer", "description": "Max results (default: 50)"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_document_groups,
+    formatted(_list_document_groups),
 )
 
 
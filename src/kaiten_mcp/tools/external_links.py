@@ -2,6 +2,8 @@
 
 from typing import Any
 
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, formatted
+
 TOOLS: dict[str, dict] = {}
 
 
@@ -23,10 +25,11 @@ _tool(
         "type": "object",
         "properties": {
             "card_id": {"type": "integer", "description": "Card ID"},
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id"],
     },
-    _list_external_links,
+    formatted(_list_external_links),
 )
 
 
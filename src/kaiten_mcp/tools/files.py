@@ -2,6 +2,8 @@
 
 from typing import Any
 
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, formatted
+
 TOOLS: dict[str, dict] = {}
 
 
@@ -28,10 +30,11 @@ _tool(
                 "type": "integer",
                 "description": "Card ID.",
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id"],
     },
-    _list_card_files,
+    formatted(_list_card_files),
 )
 
 
@@ -2,6 +2,8 @@
 
 from typing import Any
 
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, formatted
+
 TOOLS: dict[str, dict] = {}
 
 
@@ -20,10 +22,11 @@ _tool(
         "type": "object",
         "properties": {
             "board_id": {"type": "integer", "description": "Board ID"},
+            "format": FORMAT_PROPERTY,
         },
         "required": ["board_id"],
     },
-    _list_lanes,
+    formatted(_list_lanes),
 )
 
 
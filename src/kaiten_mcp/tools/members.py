@@ -1,6 +1,6 @@
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT, compact_response
+from kaiten_mcp.tools.compact import DEFAULT_LIMIT, FORMAT_PROPERTY, compact_response, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -40,10 +40,11 @@ _tool(
                 "description": "Return compact response without heavy fields (avatars, etc.).",
                 "default": False,
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id"],
     },
-    handler=_list_card_members,
+    handler=formatted(_list_card_members),
 )
 
 
@@ -164,9 +165,10 @@ _tool(
                 "description": "Return compact response without heavy fields (avatars, etc.).",
                 "default": False,
             },
+            "format": FORMAT_PROPERTY,
         },
     },
-    handler=_list_users,
+    handler=formatted(_list_users),
 )
 
 
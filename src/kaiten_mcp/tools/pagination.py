@@ -0,0 +1,565 @@
+"""Pipelined limit/offset pagination shared by auto-paginating tools.
+
+Besides fetching everything at once, bulk tools can hand out a cursor: the
+scan is suspended between calls in a :class:`CursorRegistry` and each call
+pulls only the next batch from Kaiten.
+"""
+
+import asyncio
+import contextlib
+import os
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from kaiten_mcp import tracing
+from kaiten_mcp.client import DeadlineExceeded
+from kaiten_mcp.deadline import anext_before, current_deadline, earliest
+from kaiten_mcp.ratelimit import Priority, request_priority
+from kaiten_mcp.result_store import current_owner
+from kaiten_mcp.serialization import dumps
+from kaiten_mcp.tools.compact import FormattedText, format_result, project
+
+# Upper bound on page requests in flight; the client's rate-limit burst may lower it
+DEFAULT_PAGE_CONCURRENCY = 4
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_SCANS = 64
+DEFAULT_SCAN_IDLE_SECONDS = 300.0
+# Server-wide cap on the raw JSON one bulk call may hold; KAITEN_MCP_BULK_MAX_BYTES=0 lifts it
+DEFAULT_BULK_MAX_BYTES = 32 * 1024 * 1024
+
+
+def page_concurrency(client: Any, requested: int | None = None) -> int:
+    """Return how many page requests to keep in flight for ``client``.
+
+    Defaults to the client's rate-limit burst (capped by
+    ``DEFAULT_PAGE_CONCURRENCY``): more requests in flight than the limiter
+    would let through at once only adds waiters.
+    """
+    if requested is not None:
+        return max(1, requested)
+    burst = getattr(client, "burst_capacity", 1)
+    if not isinstance(burst, int):
+        burst = 1
+    return max(1, min(DEFAULT_PAGE_CONCURRENCY, burst))
+
+
+async def _get_sized(client: Any, path: str, params: dict[str, Any]) -> tuple[Any, int | None]:
+    """GET a page and its body size in bytes, or ``None`` if the client cannot tell."""
+    # Looked up on the type so mocks do not grow the method on attribute access
+    if hasattr(type(client), "get_sized"):
+        page, size = await client.get_sized(path, params=params)
+        return page, size
+    return await client.get(path, params=params), None
+
+
+async def iter_pages(
+    client: Any,
+    path: str,
+    params: dict[str, Any] | None = None,
+    *,
+    page_size: int,
+    max_pages: int,
+    start_offset: int = 0,
+    concurrency: int | None = None,
+) -> AsyncIterator[list[Any]]:
+    """Yield pages of ``path`` like :func:`iter_sized_pages`, without their sizes."""
+    pages = iter_sized_pages(
+        client,
+        path,
+        params,
+        page_size=page_size,
+        max_pages=max_pages,
+        start_offset=start_offset,
+        concurrency=concurrency,
+    )
+    async with contextlib.aclosing(pages):  # type: ignore[type-var]
+        async for page, _ in pages:
+            yield page
+
+
+async def iter_sized_pages(
+    client: Any,
+    path: str,
+    params: dict[str, Any] | None = None,
+    *,
+    page_size: int,
+    max_pages: int,
+    start_offset: int = 0,
+    concurrency: int | None = None,
+) -> AsyncIterator[tuple[list[Any], int | None]]:
+    """Yield ``(page, body_bytes)`` for pages of ``path`` in offset order, several in flight.
+
+    The first page is fetched alone so small results cost a single request.
+    After that up to ``concurrency`` consecutive offsets are requested ahead
+    of the consumer. As soon as any page comes back short, no offsets past it
+    are issued; speculative requests beyond the end are cancelled when the
+    iterator finishes or is closed. Page requests are sent with bulk priority
+    so interactive calls sharing the token are not stuck behind a long scan.
+    ``body_bytes`` is ``None`` for clients without ``get_sized``.
+    """
+    base_params = dict(params or {})
+    window = page_concurrency(client, concurrency)
+    stop_at = max_pages  # index of the last page that can hold data, exclusive bound
+    pending: dict[int, asyncio.Task[Any]] = {}
+
+    async def fetch(index: int) -> Any:
+        nonlocal stop_at
+        page_params = {
+            **base_params,
+            "limit": page_size,
+            "offset": start_offset + index * page_size,
+        }
+        with (
+            request_priority(Priority.BULK),
+            tracing.span("page", offset=page_params["offset"], limit=page_size) as span,
+        ):
+            result, size = await _get_sized(client, path, page_params)
+            span.set_attribute("items", len(result) if result else 0)
+        if not result or len(result) < page_size:
+            stop_at = min(stop_at, index + 1)
+        return result, size
+
+    next_index = 0
+    in_flight = 1  # slow start: learn whether there is a second page at all
+    try:
+        for current in range(max_pages):
+            while next_index < stop_at and len(pending) < in_flight:
+                pending[next_index] = asyncio.ensure_future(fetch(next_index))
+                next_index += 1
+            page, size = await pending.pop(current)
+            in_flight = window
+            if not page:
+                break
+            yield page, size
+            if len(page) < page_size:
+                break
+    finally:
+        for task in pending.values():
+            task.cancel()
+        for task in pending.values():
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
+
+
+async def fetch_all_pages(
+    client: Any,
+    path: str,
+    params: dict[str, Any] | None = None,
+    *,
+    page_size: int,
+    max_pages: int,
+    start_offset: int = 0,
+    concurrency: int | None = None,
+) -> list[Any]:
+    """Collect every page from :func:`iter_pages` into one list."""
+    items: list[Any] = []
+    async for page in iter_pages(
+        client,
+        path,
+        params,
+        page_size=page_size,
+        max_pages=max_pages,
+        start_offset=start_offset,
+        concurrency=concurrency,
+    ):
+        items.extend(page)
+    return items
+
+
+@dataclass
+class PageBudget:
+    """Limits on one bulk fetch, each ``None`` when unlimited.
+
+    ``max_bytes`` counts the bytes of the Kaiten response bodies, which is
+    roughly what the server holds in memory, spread evenly over the items of
+    each page; ``deadline`` is a :func:`time.monotonic` timestamp.
+    """
+
+    max_items: int | None = None
+    max_bytes: int | None = None
+    deadline: float | None = None
+
+    @classmethod
+    def from_args(cls, args: dict) -> "PageBudget":
+        """Budget from tool arguments, with ``KAITEN_MCP_BULK_MAX_BYTES`` as the byte default.
+
+        The deadline is the earlier of ``deadline_seconds`` and the call deadline.
+        """
+        max_bytes = args.get("max_bytes")
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("KAITEN_MCP_BULK_MAX_BYTES", DEFAULT_BULK_MAX_BYTES))
+        deadline_seconds = args.get("deadline_seconds")
+        return cls(
+            max_items=args.get("max_items"),
+            max_bytes=max_bytes or None,
+            deadline=earliest(
+                time.monotonic() + deadline_seconds if deadline_seconds else None,
+                current_deadline(),
+            ),
+        )
+
+
+class BudgetMeter:
+    """Charges fetched pages against the item and byte limits of a :class:`PageBudget`."""
+
+    def __init__(self, budget: PageBudget):
+        self.budget = budget
+        self.items = 0
+        self.bytes = 0
+
+    def take(self, page: list[Any], page_bytes: int | None) -> tuple[int, str | None]:
+        """How many leading items of ``page`` fit, and the limit that cut it short, if any.
+
+        ``page_bytes`` is the size of the response body; without it the page
+        is serialized to estimate one.
+        """
+        fit, reason = len(page), None
+        if self.budget.max_items is not None:
+            room = max(self.budget.max_items - self.items, 0)
+            if fit > room:
+                fit, reason = room, "max_items"
+        if self.budget.max_bytes is not None and page:
+            if page_bytes is None:
+                page_bytes = len(dumps(page, indent=False).encode())
+            per_item = page_bytes / len(page)
+            room_bytes = self.budget.max_bytes - self.bytes
+            affordable = max(int(room_bytes // per_item), 0) if per_item else len(page)
+            if fit > affordable:
+                fit, reason = affordable, "max_bytes"
+            self.bytes += round(per_item * fit)
+        self.items += fit
+        return fit, reason
+
+
+@dataclass
+class FetchedPages:
+    items: list[Any]
+    # Budget that stopped the fetch early: max_items, max_bytes or deadline
+    truncated_by: str | None = None
+    resume_offset: int | None = None
+
+    def wrap(self, data: Any) -> Any:
+        """Return ``data`` as is, or marked incomplete when the fetch stopped early."""
+        if self.truncated_by is None:
+            return data
+        return {
+            "items": data.text if isinstance(data, FormattedText) else data,
+            "incomplete": True,
+            "truncated": {
+                "reason": self.truncated_by,
+                "returned": len(self.items),
+                "resume_offset": self.resume_offset,
+            },
+        }
+
+
+async def fetch_pages(
+    client: Any,
+    path: str,
+    params: dict[str, Any] | None = None,
+    *,
+    page_size: int,
+    max_pages: int,
+    budget: PageBudget,
+    start_offset: int = 0,
+    concurrency: int | None = None,
+) -> FetchedPages:
+    """Collect pages like :func:`fetch_all_pages` until the data ends or ``budget`` runs out.
+
+    The items and byte budgets stop at the item that would exceed them, with
+    each item charged an even share of its page's response body; the deadline
+    cancels the page requests in flight. The result then says which budget
+    was hit and the offset to resume from.
+    """
+    fetched = FetchedPages([])
+    meter = BudgetMeter(budget)
+    last_page_full = False
+
+    def truncate(reason: str) -> FetchedPages:
+        fetched.truncated_by = reason
+        fetched.resume_offset = start_offset + len(fetched.items)
+        return fetched
+
+    pages = iter_sized_pages(
+        client,
+        path,
+        params,
+        page_size=page_size,
+        max_pages=max_pages,
+        start_offset=start_offset,
+        concurrency=concurrency,
+    )
+    async with contextlib.aclosing(pages):  # type: ignore[type-var]
+        while True:
+            if budget.max_items is not None and len(fetched.items) >= budget.max_items:
+                return truncate("max_items") if last_page_full else fetched
+            try:
+                page, page_bytes = await anext_before(pages, budget.deadline)
+            except StopAsyncIteration:
+                return fetched
+            except (TimeoutError, DeadlineExceeded):
+                return truncate("deadline")
+            # After a short page the iterator ends without another request
+            last_page_full = len(page) >= page_size
+            fit, reason = meter.take(page, page_bytes)
+            fetched.items.extend(page[:fit])
+            if reason is not None:
+                return truncate(reason)
+
+
+class _CallClient:
+    """Forwards page requests to the client of the call currently pulling a scan.
+
+    A suspended scan outlives the call that started it, and pooled clients
+    can be closed in between, so every call rebinds the scan to its own client.
+    """
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def get_sized(self, path: str, params: dict[str, Any]) -> tuple[Any, int | None]:
+        return await _get_sized(self.client, path, params)
+
+
+class CursorScan:
+    """A suspended :func:`iter_sized_pages` scan plus items fetched but not yet returned.
+
+    Pages are requested one at a time, so nothing is fetched ahead of what
+    the next batch needs. ``options`` keeps the projection arguments of the
+    call that started the scan. ``interrupted`` tells whether the last batch
+    was cut short by the call deadline; the scan then resumes at the page
+    that was being fetched.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        params: dict[str, Any] | None,
+        *,
+        page_size: int,
+        max_pages: int,
+        options: dict[str, Any] | None = None,
+    ):
+        self.path = path
+        self.params = params
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.options = options or {}
+        self.returned = 0
+        self.interrupted = False
+        self._client = _CallClient(None)
+        self._pages_read = 0
+        self._pages = self._open()
+        self._buffer: list[Any] = []
+        self._exhausted = False
+
+    def _open(self) -> AsyncIterator[tuple[list[Any], int | None]]:
+        """Page iterator starting at the first page not read yet."""
+        return iter_sized_pages(
+            self._client,
+            self.path,
+            self.params,
+            page_size=self.page_size,
+            max_pages=self.max_pages - self._pages_read,
+            start_offset=self._pages_read * self.page_size,
+            concurrency=1,
+        )
+
+    @property
+    def done(self) -> bool:
+        return self._exhausted and not self._buffer
+
+    async def next_batch(self, client: Any, size: int) -> list[Any]:
+        """Return up to ``size`` more items, fetching only the pages they need.
+
+        If the call deadline passes first, the items already buffered are
+        returned and :attr:`interrupted` is set.
+        """
+        self._client.client = client
+        self.interrupted = False
+        while len(self._buffer) < size and not self._exhausted:
+            try:
+                page, _ = await anext_before(self._pages, current_deadline())
+            except StopAsyncIteration:
+                self._exhausted = True
+                break
+            except (TimeoutError, DeadlineExceeded):
+                # Restart the page iterator at the page that was cut off
+                await self.aclose()
+                self._pages = self._open()
+                self.interrupted = True
+                break
+            self._pages_read += 1
+            self._buffer.extend(page)
+            # A short page or the page limit ends the scan without another request
+            if len(page) < self.page_size or self._pages_read >= self.max_pages:
+                self._exhausted = True
+        batch, self._buffer = self._buffer[:size], self._buffer[size:]
+        self.returned += len(batch)
+        return batch
+
+    async def aclose(self) -> None:
+        await self._pages.aclose()  # type: ignore[attr-defined]
+
+
+@dataclass
+class _CursorEntry:
+    scan: CursorScan
+    owner: str | None
+    last_used: float
+
+
+class CursorRegistry:
+    """Suspended scans by single-use cursor token, bounded by count and idle time.
+
+    Each batch is handed out under a fresh token, so a cursor cannot be
+    resumed twice or by two calls at once. Scans are scoped to the Kaiten
+    credential that started them. Evicted scans are closed, cancelling their
+    page requests.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_scans: int = DEFAULT_MAX_SCANS,
+        idle_seconds: float = DEFAULT_SCAN_IDLE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_scans = max(1, max_scans)
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, _CursorEntry] = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "CursorRegistry":
+        return cls(
+            max_scans=int(os.environ.get("KAITEN_MCP_CURSOR_MAX_SCANS", DEFAULT_MAX_SCANS)),
+            idle_seconds=float(
+                os.environ.get("KAITEN_MCP_CURSOR_IDLE_SECONDS", DEFAULT_SCAN_IDLE_SECONDS)
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def put(self, scan: CursorScan, owner: str | None = None) -> str:
+        """Suspend ``scan`` and return the cursor that resumes it."""
+        token = "cur_" + secrets.token_urlsafe(16)
+        now = self._clock()
+        self._entries[token] = _CursorEntry(scan, owner, now)
+        evicted = self._expired(now)
+        while len(self._entries) > self.max_scans:
+            evicted.append(self._entries.popitem(last=False)[1].scan)
+        await self._close(evicted)
+        return token
+
+    async def take(self, token: str, owner: str | None = None) -> CursorScan:
+        """Remove and return the scan for ``token``; ``KeyError`` if unknown, idle or foreign."""
+        await self._close(self._expired(self._clock()))
+        entry = self._entries.get(token)
+        if entry is None or entry.owner != owner:
+            raise KeyError(token)
+        del self._entries[token]
+        return entry.scan
+
+    async def close(self) -> None:
+        scans = [entry.scan for entry in self._entries.values()]
+        self._entries.clear()
+        await self._close(scans)
+
+    def _expired(self, now: float) -> list[CursorScan]:
+        stale = [
+            token
+            for token, entry in self._entries.items()
+            if now - entry.last_used >= self.idle_seconds
+        ]
+        return [self._entries.pop(token).scan for token in stale]
+
+    @staticmethod
+    async def _close(scans: list[CursorScan]) -> None:
+        for scan in scans:
+            with contextlib.suppress(Exception):
+                await scan.aclose()
+
+
+_registry: CursorRegistry | None = None
+
+
+def get_cursor_registry() -> CursorRegistry:
+    """Return the shared cursor registry, configured from the environment on first use."""
+    global _registry
+    if _registry is None:
+        _registry = CursorRegistry.from_env()
+    return _registry
+
+
+def reset_cursor_registry() -> None:
+    global _registry
+    _registry = None
+
+
+async def cursor_page(
+    client: Any,
+    args: dict,
+    path: str,
+    params: dict[str, Any] | None,
+    *,
+    page_size: int,
+    max_pages: int,
+    compact: bool,
+) -> dict[str, Any]:
+    """Start a cursor scan of ``path`` or continue ``args["cursor"]``; return one batch.
+
+    A continued scan keeps the filters, ``fields``, ``compact``, ``format``
+    and ``batch_size`` of the call that started it. A batch cut short by the
+    call deadline is marked incomplete and still carries a ``next_cursor``.
+    """
+    registry = get_cursor_registry()
+    owner = current_owner()
+    if args.get("cursor"):
+        try:
+            scan = await registry.take(args["cursor"], owner)
+        except KeyError:
+            raise ValueError("Unknown or expired cursor; start again without 'cursor'") from None
+    else:
+        scan = CursorScan(
+            path,
+            params,
+            page_size=page_size,
+            max_pages=max_pages,
+            options={
+                "fields": args.get("fields"),
+                "compact": compact,
+                "format": args.get("format"),
+                "batch_size": max(1, args.get("batch_size", DEFAULT_BATCH_SIZE)),
+            },
+        )
+    options = scan.options
+    try:
+        batch = await scan.next_batch(client, options["batch_size"])
+    except BaseException:
+        await scan.aclose()
+        raise
+    if scan.done:
+        await scan.aclose()
+        next_cursor = None
+    else:
+        next_cursor = await registry.put(scan, owner)
+
+    items = format_result(
+        project(batch, compact=options["compact"], fields=options["fields"]), options["format"]
+    )
+    page = {
+        "items": items.text if isinstance(items, FormattedText) else items,
+        "returned_total": scan.returned,
+        "next_cursor": next_cursor,
+    }
+    if scan.interrupted:
+        page["incomplete"] = True
+        page["truncated"] = {"reason": "deadline", "returned": len(batch)}
+    return page
@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT, compact_response
+from kaiten_mcp.tools.compact import DEFAULT_LIMIT, FORMAT_PROPERTY, compact_response, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -23,9 +23,9 @@ _tool(
     "List all Kaiten projects in the company.",
     {
         "type": "object",
-        "properties": {},
+        "properties": {"format": FORMAT_PROPERTY},
     },
-    _list_projects,
+    formatted(_list_projects),
 )
 
 
@@ -178,10 +178,11 @@ _tool(
                 "description": "Return compact response without heavy fields (avatars, nested user objects).",
                 "default": False,
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["project_id"],
     },
-    _list_project_cards,
+    formatted(_list_project_cards),
 )
 
 
@@ -246,9 +247,10 @@ _tool(
             "active": {"type": "boolean", "description": "Filter by active/inactive"},
             "limit": {"type": "integer", "description": "Max results (max 100)"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_sprints,
+    formatted(_list_sprints),
 )
 
 
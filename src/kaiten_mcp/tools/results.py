@@ -0,0 +1,198 @@
+"""Kaiten MCP tools for large results kept in the result store."""
+
+from collections.abc import Callable
+from typing import Any
+
+from kaiten_mcp.result_store import Unprojected, current_owner, get_result_store
+from kaiten_mcp.tools.compact import DEFAULT_LIMIT, FORMAT_PROPERTY, format_result, project
+
+TOOLS: dict[str, dict] = {}
+
+_MISSING = object()
+
+
+def _tool(name: str, description: str, schema: dict, handler):
+    TOOLS[name] = {"description": description, "inputSchema": schema, "handler": handler}
+
+
+def _unchanged(data: Any) -> Any:
+    return data
+
+
+def _stored(result_id: str) -> tuple[Any, Callable[[Any], Any]]:
+    """Stored data and the projection the original call returned it with."""
+    store = get_result_store()
+    if store is None:
+        raise ValueError("Result store is disabled (KAITEN_MCP_RESULT_STORE=0)")
+    try:
+        data = store.get(result_id, current_owner())
+    except KeyError:
+        raise ValueError(
+            f"Unknown or expired result_id {result_id!r}; run the original tool again"
+        ) from None
+    if isinstance(data, Unprojected):
+        return data.items, data.view
+    return data, _unchanged
+
+
+def _stored_list(result_id: str) -> tuple[list[Any], Callable[[Any], Any]]:
+    data, view = _stored(result_id)
+    if not isinstance(data, list):
+        raise ValueError(f"Result {result_id!r} is not a list; use kaiten_result_project")
+    return data, view
+
+
+def _lookup(item: Any, path: str) -> Any:
+    """Value at dotted ``path`` (``owner.id``) in ``item``, or ``_MISSING``."""
+    for key in path.split("."):
+        if not isinstance(item, dict) or key not in item:
+            return _MISSING
+        item = item[key]
+    return item
+
+
+def _matches(item: Any, where: dict[str, Any]) -> bool:
+    for path, expected in where.items():
+        value = _lookup(item, path)
+        if isinstance(expected, list):
+            if value is _MISSING or not any(value == option for option in expected):
+                return False
+        elif value is _MISSING or value != expected:
+            return False
+    return True
+
+
+def _page(
+    result_id: str,
+    items: list[Any],
+    view: Callable[[Any], Any],
+    total_key: str,
+    total: int,
+    args: dict,
+) -> dict[str, Any]:
+    offset = max(args.get("offset", 0), 0)
+    limit = max(args.get("limit", DEFAULT_LIMIT), 0)
+    page = items[offset : offset + limit]
+    page = project(page, fields=args["fields"]) if args.get("fields") else view(page)
+    next_offset = offset + limit
+    return {
+        "result_id": result_id,
+        total_key: total,
+        "offset": offset,
+        "next_offset": next_offset if next_offset < total else None,
+        "items": page,
+    }
+
+
+# --- Stored results ---
+
+_PAGE_PROPERTIES = {
+    "offset": {"type": "integer", "description": "Index of the first item (default 0)"},
+    "limit": {"type": "integer", "description": "Items to return (default 50)"},
+    "fields": {
+        "type": "string",
+        "description": (
+            "Comma-separated field names to keep per item. By default items keep the "
+            "fields the original call returned."
+        ),
+    },
+}
+
+
+async def _result_slice(client, args: dict) -> Any:
+    items, view = _stored_list(args["result_id"])
+    return _page(args["result_id"], items, view, "total_items", len(items), args)
+
+
+_tool(
+    "kaiten_result_slice",
+    (
+        "Page through a large result stored by an earlier tool call, without new Kaiten "
+        "requests. Tools return a result_id instead of the full data when the response "
+        "is too large; stored results expire after a while (15 minutes by default)."
+    ),
+    {
+        "type": "object",
+        "properties": {
+            "result_id": {"type": "string", "description": "Handle returned by the original tool"},
+            **_PAGE_PROPERTIES,
+        },
+        "required": ["result_id"],
+    },
+    _result_slice,
+)
+
+
+async def _result_filter(client, args: dict) -> Any:
+    where = args["where"]
+    if not isinstance(where, dict) or not where:
+        raise ValueError("where must be a non-empty object of field: value")
+    items, view = _stored_list(args["result_id"])
+    matches = [item for item in items if _matches(item, where)]
+    return _page(args["result_id"], matches, view, "total_matches", len(matches), args)
+
+
+_tool(
+    "kaiten_result_filter",
+    (
+        "Filter a stored result (see kaiten_result_slice) by field values and page "
+        "through the matches. Example where: "
+        '{"state": 3, "board_id": [10, 11], "owner.id": 42}.'
+    ),
+    {
+        "type": "object",
+        "properties": {
+            "result_id": {"type": "string", "description": "Handle returned by the original tool"},
+            "where": {
+                "type": "object",
+                "description": (
+                    "Field conditions, all of which must hold. Keys may be dotted paths "
+                    "into nested objects; a list value matches any of its elements."
+                ),
+            },
+            **_PAGE_PROPERTIES,
+        },
+        "required": ["result_id", "where"],
+    },
+    _result_filter,
+)
+
+
+async def _result_project(client, args: dict) -> Any:
+    data, view = _stored(args["result_id"])
+    if args.get("fields") or args.get("compact") is not None:
+        data = project(data, compact=args.get("compact", False), fields=args.get("fields"))
+    else:
+        data = view(data)
+    return format_result(data, args.get("format"))
+
+
+_tool(
+    "kaiten_result_project",
+    (
+        "Re-project a whole stored result (see kaiten_result_slice): keep other fields, "
+        "compact it or change its format, without fetching it from Kaiten again. "
+        "Results of bulk tools (kaiten_list_all_cards, kaiten_get_all_space_activity) "
+        "are stored as fetched, so fields or compact=false bring back fields the "
+        "original call left out. Without fields or compact, the result keeps the "
+        "original call's fields. "
+        "A result that is still too large comes back as a new result_id."
+    ),
+    {
+        "type": "object",
+        "properties": {
+            "result_id": {"type": "string", "description": "Handle returned by the original tool"},
+            "fields": {
+                "type": "string",
+                "description": "Comma-separated field names to keep. Strips everything else.",
+            },
+            "compact": {
+                "type": "boolean",
+                "description": "Strip heavy fields (avatars, user details, descriptions).",
+            },
+            "format": FORMAT_PROPERTY,
+        },
+        "required": ["result_id"],
+    },
+    _result_project,
+)
@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT, compact_response
+from kaiten_mcp.tools.compact import DEFAULT_LIMIT, FORMAT_PROPERTY, compact_response, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -34,10 +34,11 @@ _tool(
                 "description": "Return compact response without heavy fields (avatars, nested user objects).",
                 "default": False,
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["space_id"],
     },
-    _list_space_users,
+    formatted(_list_space_users),
 )
 
 
@@ -130,9 +131,10 @@ _tool(
             "query": {"type": "string", "description": "Search query"},
             "limit": {"type": "integer", "description": "Max results to return"},
             "offset": {"type": "integer", "description": "Offset for pagination"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_company_groups,
+    formatted(_list_company_groups),
 )
 
 
@@ -231,10 +233,11 @@ _tool(
                 "description": "Return compact response without heavy fields (avatars, nested user objects).",
                 "default": False,
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["group_uid"],
     },
-    _list_group_users,
+    formatted(_list_group_users),
 )
 
 
@@ -301,9 +304,10 @@ _tool(
             "query": {"type": "string", "description": "Search query"},
             "limit": {"type": "integer", "description": "Max results to return"},
             "offset": {"type": "integer", "description": "Offset for pagination"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_roles,
+    formatted(_list_roles),
 )
 
 
@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT
+from kaiten_mcp.tools.compact import DEFAULT_LIMIT, FORMAT_PROPERTY, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -32,9 +32,10 @@ _tool(
             "query": {"type": "string", "description": "Search filter"},
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_sd_requests,
+    formatted(_list_sd_requests),
 )
 
 
@@ -148,9 +149,10 @@ _tool(
             "include_archived": {"type": "boolean", "description": "Include archived services"},
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_sd_services,
+    formatted(_list_sd_services),
 )
 
 
@@ -379,9 +381,10 @@ _tool(
             },
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_sd_organizations,
+    formatted(_list_sd_organizations),
 )
 
 
@@ -492,9 +495,10 @@ _tool(
         "properties": {
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_sd_sla,
+    formatted(_list_sd_sla),
 )
 
 
@@ -615,9 +619,9 @@ _tool(
     "List Service Desk template answers.",
     {
         "type": "object",
-        "properties": {},
+        "properties": {"format": FORMAT_PROPERTY},
     },
-    _list_sd_template_answers,
+    formatted(_list_sd_template_answers),
 )
 
 
@@ -874,9 +878,10 @@ _tool(
                 "type": "boolean",
                 "description": "Include all SD users regardless of status",
             },
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_sd_users,
+    formatted(_list_sd_users),
 )
 
 
@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import compact_response
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, compact_response, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -32,9 +32,10 @@ _tool(
                 "description": "Return compact response without heavy fields (avatars, nested user objects)",
                 "default": False,
             },
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_spaces,
+    formatted(_list_spaces),
 )
 
 
@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import compact_response
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, compact_response, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -34,10 +34,11 @@ _tool(
                 "description": "Return compact response without heavy fields (avatars, nested user objects).",
                 "default": False,
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id"],
     },
-    _list_card_subscribers,
+    formatted(_list_card_subscribers),
 )
 
 
@@ -104,10 +105,11 @@ _tool(
                 "description": "Return compact response without heavy fields (avatars, nested user objects).",
                 "default": False,
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["column_id"],
     },
-    _list_column_subscribers,
+    formatted(_list_column_subscribers),
 )
 
 
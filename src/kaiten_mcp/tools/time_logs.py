@@ -1,5 +1,7 @@
 from typing import Any
 
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, formatted
+
 TOOLS: dict[str, dict] = {}
 
 
@@ -46,10 +48,11 @@ _tool(
                 "type": "boolean",
                 "description": "Return only the current user's time logs.",
             },
+            "format": FORMAT_PROPERTY,
         },
         "required": ["card_id"],
     },
-    handler=_list_card_time_logs,
+    handler=formatted(_list_card_time_logs),
 )
 
 
@@ -3,6 +3,8 @@
 import asyncio
 from typing import Any
 
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, formatted
+
 TOOLS: dict[str, dict] = {}
 
 
@@ -96,9 +98,10 @@ _tool(
                 "type": "string",
                 "description": "Parent entity UID. Omit to list root-level entities.",
             },
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_children,
+    formatted(_list_children),
 )
 
 
@@ -2,7 +2,7 @@
 
 from typing import Any
 
-from kaiten_mcp.tools.compact import DEFAULT_LIMIT
+from kaiten_mcp.tools.compact import DEFAULT_LIMIT, FORMAT_PROPERTY, formatted
 
 TOOLS: dict[str, dict] = {}
 
@@ -21,8 +21,8 @@ async def _list_api_keys(client, args: dict) -> Any:
 _tool(
     "kaiten_list_api_keys",
     "List all API keys for the current user.",
-    {"type": "object", "properties": {}},
-    _list_api_keys,
+    {"type": "object", "properties": {"format": FORMAT_PROPERTY}},
+    formatted(_list_api_keys),
 )
 
 
@@ -72,8 +72,8 @@ async def _list_user_timers(client, args: dict) -> Any:
 _tool(
     "kaiten_list_user_timers",
     "List all user timers.",
-    {"type": "object", "properties": {}},
-    _list_user_timers,
+    {"type": "object", "properties": {"format": FORMAT_PROPERTY}},
+    formatted(_list_user_timers),
 )
 
 
@@ -172,9 +172,10 @@ _tool(
         "properties": {
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_removed_cards,
+    formatted(_list_removed_cards),
 )
 
 
@@ -194,9 +195,10 @@ _tool(
         "properties": {
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_removed_boards,
+    formatted(_list_removed_boards),
 )
 
 
@@ -219,9 +221,10 @@ _tool(
         "properties": {
             "limit": {"type": "integer", "description": "Max results"},
             "offset": {"type": "integer", "description": "Pagination offset"},
+            "format": FORMAT_PROPERTY,
         },
     },
-    _list_calendars,
+    formatted(_list_calendars),
 )
 
 
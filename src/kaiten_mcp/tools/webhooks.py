@@ -2,6 +2,8 @@
 
 from typing import Any
 
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY, formatted
+
 TOOLS: dict[str, dict] = {}
 
 
@@ -23,10 +25,11 @@ _tool(
         "type": "object",
         "properties": {
             "space_id": {"type": "integer", "description": "Space ID"},
+            "format": FORMAT_PROPERTY,
         },
         "required": ["space_id"],
     },
-    _list_webhooks,
+    formatted(_list_webhooks),
 )
 
 
@@ -138,10 +141,11 @@ _tool(
         "type": "object",
         "properties": {
             "space_id": {"type": "integer", "description": "Space ID"},
+            "format": FORMAT_PROPERTY,
         },
         "required": ["space_id"],
     },
-    _list_incoming_webhooks,
+    formatted(_list_incoming_webhooks),
 )
 
 
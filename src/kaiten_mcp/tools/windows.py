@@ -0,0 +1,280 @@
+"""Time-window partitioned scans for bulk tools.
+
+Deep offsets are slow upstream and drift when items are inserted during a
+long scan. :func:`scan_windows` instead splits a ``created``/``updated``
+date range into windows and pages through each one from offset 0, several
+windows at a time. A window that fills ``split_pages`` pages keeps what it
+fetched: if the items come sorted by the window's timestamp, only the part
+of the window after the last one is scanned next, otherwise the window is
+split at their median timestamp. The results are merged in window order and
+de-duplicated by ``id``. One :class:`PageBudget` and page limit are shared by all windows;
+when either runs out, what was fetched is returned together with the ranges
+still to scan.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import time
+from collections.abc import Awaitable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from kaiten_mcp.client import DeadlineExceeded
+from kaiten_mcp.tools.compact import FormattedText
+from kaiten_mcp.tools.pagination import (
+    BudgetMeter,
+    PageBudget,
+    iter_sized_pages,
+    page_concurrency,
+)
+
+SCAN_MODES = ("offset", "windows")
+DEFAULT_WINDOWS = 8
+DEFAULT_SPLIT_PAGES = 10
+# Windows shorter than this are paged by offset instead of being halved again
+MIN_WINDOW = timedelta(seconds=1)
+# Kaiten's *_after/*_before bounds are exclusive, so inner window edges overlap
+# by this much and the duplicates at the edges are dropped by id
+_EDGE_OVERLAP = timedelta(milliseconds=1)
+
+# A ``[start, end)`` range of the window field
+Window = tuple[datetime, datetime]
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 date or datetime; naive values are taken as UTC."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f"Invalid ISO 8601 datetime: {value!r}") from e
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=UTC)
+
+
+def format_timestamp(value: datetime) -> str:
+    """Format like Kaiten timestamps: UTC with milliseconds, ``2025-01-01T00:00:00.000Z``."""
+    return value.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def window_field(params: dict[str, Any]) -> str:
+    """Timestamp field whose range the scan partitions: ``created`` or ``updated``."""
+    for kind in ("created", "updated"):
+        if params.get(f"{kind}_after"):
+            return kind
+    raise ValueError("scan_mode='windows' needs created_after (or updated_after) to split")
+
+
+def item_timestamps(items: list[Any], kind: str) -> list[datetime] | None:
+    """The ``kind`` timestamp of every item, or ``None`` if any is missing or invalid."""
+    stamps = []
+    for item in items:
+        value = item.get(kind) if isinstance(item, dict) else None
+        if not isinstance(value, str):
+            return None
+        try:
+            stamps.append(parse_timestamp(value))
+        except ValueError:
+            return None
+    return stamps
+
+
+def split_full_window(
+    lo: datetime, hi: datetime, stamps: list[datetime] | None
+) -> tuple[Window, list[Window]] | None:
+    """Plan the rest of ``[lo, hi)`` after it filled its pages with items stamped ``stamps``.
+
+    Returns the range the fetched items cover and the windows still to scan,
+    or ``None`` when the window cannot be narrowed and must be paged by offset.
+    """
+    if stamps and stamps[0] != stamps[-1]:
+        last = stamps[-1]
+        pairs = list(itertools.pairwise(stamps))
+        if lo < last and all(a <= b for a, b in pairs):
+            last = min(last, hi)
+            return (lo, last), split_range(last, hi, 2 if hi - last >= 2 * MIN_WINDOW else 1)
+        if last < hi and all(a >= b for a, b in pairs):
+            last = max(last, lo)
+            return (last, hi), split_range(lo, last, 2 if last - lo >= 2 * MIN_WINDOW else 1)
+    if hi - lo < 2 * MIN_WINDOW:
+        return None
+    middle = lo + (hi - lo) / 2
+    if stamps:
+        median = sorted(stamps)[len(stamps) // 2]
+        if lo + MIN_WINDOW <= median <= hi - MIN_WINDOW:
+            middle = median
+    return (lo, hi), [(lo, middle), (middle, hi)]
+
+
+def split_range(start: datetime, end: datetime, count: int) -> list[Window]:
+    """Split ``[start, end)`` into ``count`` equal windows."""
+    count = max(1, count)
+    step = (end - start) / count
+    edges = [start + step * index for index in range(count)] + [end]
+    return list(itertools.pairwise(edges))
+
+
+@dataclass
+class WindowScan:
+    items: list[Any]
+    # Query bounds of the windows left unfinished when the scan stopped early
+    pending: list[dict[str, str]] = field(default_factory=list)
+    # Limit that stopped the scan: max_pages, max_items, max_bytes or deadline
+    truncated_by: str = "deadline"
+
+    def wrap(self, data: Any) -> Any:
+        """Return ``data`` as is, or marked incomplete with the windows left to scan."""
+        if not self.pending:
+            return data
+        return {
+            "items": data.text if isinstance(data, FormattedText) else data,
+            "incomplete": True,
+            "truncated": {
+                "reason": self.truncated_by,
+                "returned": len(self.items),
+                "resume_windows": self.pending,
+            },
+        }
+
+
+class _BudgetSpent(Exception):
+    """Stops every window once the budget shared by the scan runs out."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+async def _gather(awaitables: list[Awaitable[Any]]) -> None:
+    """Await all of ``awaitables``; on the first error cancel the rest and re-raise."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def scan_windows(
+    client: Any,
+    path: str,
+    params: dict[str, Any],
+    *,
+    page_size: int,
+    max_pages: int,
+    windows: int = DEFAULT_WINDOWS,
+    split_pages: int = DEFAULT_SPLIT_PAGES,
+    concurrency: int | None = None,
+    budget: PageBudget | None = None,
+) -> WindowScan:
+    """Fetch every item of ``path`` in the date range of ``params`` window by window.
+
+    The range comes from ``created_after``/``created_before`` (or the
+    ``updated_*`` pair); a missing upper bound means now. At most
+    ``concurrency`` windows (by default the client's rate-limit burst) are
+    fetched at once, one page at a time each. A window that cannot be halved
+    any more falls back to offset paging.
+
+    ``max_pages`` and ``budget`` apply to the scan as a whole. When one runs
+    out, the windows in progress are cancelled and reported as pending; the
+    items they had already fetched are still returned, so resuming those
+    windows may repeat a few of them.
+    """
+    budget = budget or PageBudget()
+    kind = window_field(params)
+    after_key, before_key = f"{kind}_after", f"{kind}_before"
+    start = parse_timestamp(params[after_key])
+    end = parse_timestamp(params[before_key]) if params.get(before_key) else datetime.now(UTC)
+    if end <= start:
+        return WindowScan([])
+    split_pages = max(1, split_pages)
+    slots = asyncio.Semaphore(page_concurrency(client, concurrency))
+    initial = split_range(start, end, windows)
+    pending = set(initial)
+    scanned: dict[Window, list[Any]] = {}
+    meter = BudgetMeter(budget)
+    pages_requested = 0
+
+    def bounds(lo: datetime, hi: datetime) -> dict[str, str]:
+        # The outer edges keep the caller's values
+        edges = {after_key: params[after_key]}
+        if lo > start:
+            edges[after_key] = format_timestamp(lo - _EDGE_OVERLAP)
+        if hi < end:
+            edges[before_key] = format_timestamp(hi + _EDGE_OVERLAP)
+        else:
+            edges[before_key] = params.get(before_key) or format_timestamp(hi)
+        return edges
+
+    async def fetch(window_params: dict[str, Any], items: list[Any], limit: int) -> bool:
+        """Page a window into ``items``; return whether it filled ``limit`` pages."""
+        nonlocal pages_requested
+        pages = iter_sized_pages(
+            client,
+            path,
+            window_params,
+            page_size=page_size,
+            max_pages=max_pages,
+            start_offset=len(items),
+            concurrency=1,
+        )
+        async with contextlib.aclosing(pages):  # type: ignore[type-var]
+            for _ in range(limit):
+                if pages_requested >= max_pages:
+                    raise _BudgetSpent("max_pages")
+                if budget.max_items is not None and meter.items >= budget.max_items:
+                    raise _BudgetSpent("max_items")
+                pages_requested += 1
+                try:
+                    page, page_bytes = await anext(pages)
+                except StopAsyncIteration:
+                    return False
+                fit, reason = meter.take(page, page_bytes)
+                items.extend(page[:fit])
+                if reason is not None:
+                    raise _BudgetSpent(reason)
+                if len(page) < page_size:
+                    return False
+        return True
+
+    async def scan(lo: datetime, hi: datetime) -> None:
+        window_params = {**params, **bounds(lo, hi)}
+        items = scanned[(lo, hi)] = []
+        async with slots:
+            full = await fetch(window_params, items, split_pages)
+        plan = split_full_window(lo, hi, item_timestamps(items, kind)) if full else None
+        if plan is not None:
+            covered, rest = plan
+            scanned[covered] = scanned.pop((lo, hi))
+            pending.discard((lo, hi))
+            pending.update(rest)
+            await _gather([scan(*window) for window in rest])
+            return
+        if full:
+            async with slots:
+                await fetch(window_params, items, max_pages)
+        pending.discard((lo, hi))
+
+    truncated_by = "deadline"
+    deadline = budget.deadline
+    try:
+        async with asyncio.timeout(None if deadline is None else deadline - time.monotonic()):
+            await _gather([scan(lo, hi) for lo, hi in initial])
+    except (TimeoutError, DeadlineExceeded):
+        pass  # what is still pending goes back to the caller
+    except _BudgetSpent as spent:
+        truncated_by = spent.reason
+
+    merged: list[Any] = []
+    seen: set[Any] = set()
+    for _, items in sorted(scanned.items()):
+        for item in items:
+            item_id = item.get("id") if isinstance(item, dict) else None
+            if item_id is not None:
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+            merged.append(item)
+    return WindowScan(merged, [bounds(lo, hi) for lo, hi in sorted(pending)], truncated_by)
@@ -0,0 +1,236 @@
+"""Optional per-call tracing spans written to a rotating local JSONL file.
+
+Tracing is enabled by pointing ``KAITEN_MCP_TRACE_FILE`` at a file. Every
+finished span is appended as one line in the OTLP/JSON ``resourceSpans``
+shape, so the file can be replayed into any OpenTelemetry collector (for
+example with the ``otlpjsonfile`` receiver). When tracing is disabled,
+:func:`span` returns a shared no-op object and costs one global lookup.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from types import TracebackType
+from typing import Any, TypeVar
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+SERVICE_NAME = "kaiten-mcp"
+
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def _attribute_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # int64 is a string in OTLP/JSON
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """A timed operation; use via :func:`span`."""
+
+    __slots__ = (
+        "_token",
+        "attributes",
+        "end_ns",
+        "name",
+        "parent_id",
+        "span_id",
+        "start_ns",
+        "status",
+        "status_message",
+        "trace_id",
+    )
+
+    def __init__(self, name: str, attributes: dict[str, Any]):
+        parent = _current_span.get()
+        self.name = name
+        self.attributes = attributes
+        self.span_id: str = f"{random.getrandbits(64):016x}"
+        if parent is None:
+            self.trace_id: str = f"{random.getrandbits(128):032x}"
+            self.parent_id = ""
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+        self.start_ns = 0
+        self.end_ns = 0
+        self.status = _STATUS_OK
+        self.status_message = ""
+        self._token: contextvars.Token[Span | None] | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = _STATUS_ERROR
+        self.status_message = message
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.end_ns = time.time_ns()
+        if self._token is not None:
+            _current_span.reset(self._token)
+        if exc_type is not None:
+            self.status = _STATUS_ERROR
+            self.status_message = f"{exc_type.__name__}: {exc}"
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(self)
+
+    def to_otlp(self) -> dict[str, Any]:
+        span: dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _attribute_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+                        ]
+                    },
+                    "scopeSpans": [{"scope": {"name": "kaiten_mcp"}, "spans": [span]}],
+                }
+            ]
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class FileSpanExporter:
+    """Append spans as JSON lines to ``path``, rotating it by size."""
+
+    def __init__(
+        self, path: str, *, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_otlp(), ensure_ascii=False, separators=(",", ":"), default=str)
+        self._handler.emit(logging.makeLogRecord({"msg": line}))
+
+    def close(self) -> None:
+        self._handler.close()
+
+
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "kaiten_current_span", default=None
+)
+_exporter: FileSpanExporter | None = None
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure(
+    path: str | None,
+    *,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backups: int = DEFAULT_BACKUPS,
+) -> None:
+    """Write spans to ``path`` (``None`` disables tracing), replacing any previous setup."""
+    global _exporter, _configured
+    with _configure_lock:
+        if _exporter is not None:
+            _exporter.close()
+        _exporter = FileSpanExporter(path, max_bytes=max_bytes, backups=backups) if path else None
+        _configured = True
+
+
+def configure_from_env() -> None:
+    """Configure from ``KAITEN_MCP_TRACE_FILE``, ``_MAX_BYTES`` and ``_BACKUPS``."""
+    configure(
+        os.environ.get("KAITEN_MCP_TRACE_FILE", "").strip() or None,
+        max_bytes=int(os.environ.get("KAITEN_MCP_TRACE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        backups=int(os.environ.get("KAITEN_MCP_TRACE_BACKUPS", DEFAULT_BACKUPS)),
+    )
+
+
+def enabled() -> bool:
+    if not _configured:
+        configure_from_env()
+    return _exporter is not None
+
+
+def span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    """Return a context manager timing ``name`` as a child of the current span."""
+    if not enabled():
+        return _NOOP_SPAN
+    return Span(name, attributes)
+
+
+def traced(name: str) -> Callable[[_F], _F]:
+    """Decorate a synchronous function so each call is recorded as span ``name``."""
+
+    def decorator(func: _F) -> _F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not enabled():
+                return func(*args, **kwargs)
+            with Span(name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
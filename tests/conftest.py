@@ -1,13 +1,57 @@
 """Root conftest — environment setup and shared fixtures."""
 
+import asyncio
 import os
 
 import pytest
 
+from kaiten_mcp.cache import reset_response_cache
+from kaiten_mcp.ratelimit import reset_rate_limiters
+from kaiten_mcp.resilience import reset_upstream_guards
+from kaiten_mcp.result_store import reset_result_store
+from kaiten_mcp.tools.pagination import reset_cursor_registry
+
 os.environ.setdefault("KAITEN_SUBDOMAIN", "test-company")
 os.environ.setdefault("KAITEN_TOKEN", "test-token-12345")
 
 
+class FakeClock:
+    """Monotonic clock for injecting into limiters, caches and pools; tests move ``now``."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        """Move ``now`` forward instead of waiting, then let other tasks run."""
+        self.now += max(0.0, seconds)
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_process_state():
+    """Give every test full token buckets, retry budgets, closed circuits, an empty
+    response cache and no stored results or scans."""
+    reset_rate_limiters()
+    reset_upstream_guards()
+    reset_response_cache()
+    reset_result_store()
+    reset_cursor_registry()
+    yield
+    reset_rate_limiters()
+    reset_upstream_guards()
+    reset_response_cache()
+    reset_result_store()
+    reset_cursor_registry()
+
+
 @pytest.fixture(scope="session")
 def all_tool_modules():
     from kaiten_mcp.server import TOOL_MODULES
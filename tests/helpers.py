@@ -13,3 +13,16 @@ def get_request_json(request: Request) -> dict:
 def get_request_params(request: Request) -> dict[str, str]:
     """Extract query parameters as a dict."""
     return dict(request.url.params)
+
+
+def paged_responder(items: list):
+    """Return a respx side effect serving ``items`` by the request's limit/offset."""
+    from httpx import Response
+
+    def respond(request: Request) -> Response:
+        params = request.url.params
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 100))
+        return Response(200, json=items[offset : offset + limit])
+
+    return respond
@@ -0,0 +1,176 @@
+"""Tests for per-tenant fair-share admission."""
+
+import asyncio
+
+import pytest
+
+from kaiten_mcp.admission import AdmissionController, AdmissionRejected, parse_weights
+
+
+async def _hold(controller, tenant, release, log):
+    async with controller.admit(tenant):
+        log.append(tenant)
+        await release.wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAdmission:
+    async def test_runs_immediately_under_caps(self):
+        controller = AdmissionController(max_concurrency=2)
+        async with controller.admit("a"), controller.admit("b"):
+            assert controller.running == 2
+        assert controller.running == 0
+        assert controller.counters == {"admitted": 2}
+
+    async def test_per_tenant_cap_queues_extra_calls(self):
+        controller = AdmissionController(max_concurrency=10, tenant_concurrency=2)
+        release, log = asyncio.Event(), []
+        tasks = [asyncio.ensure_future(_hold(controller, "a", release, log)) for _ in range(3)]
+        await _settle()
+        assert (controller.running, controller.queued("a")) == (2, 1)
+        # Another tenant is not affected by a's cap
+        async with controller.admit("b"):
+            assert controller.running == 3
+        release.set()
+        await asyncio.gather(*tasks)
+        assert log == ["a", "a", "a"]
+        assert controller.queued("a") == 0
+
+    async def test_slots_alternate_between_backlogged_tenants(self):
+        controller = AdmissionController(max_concurrency=1, tenant_concurrency=1)
+        order = []
+        gate = asyncio.Event()
+
+        async def call(tenant):
+            async with controller.admit(tenant):
+                order.append(tenant)
+                await gate.wait()
+
+        first = asyncio.ensure_future(call("bulk"))
+        await _settle()
+        tasks = [asyncio.ensure_future(call("bulk")) for _ in range(3)]
+        await _settle()
+        tasks.append(asyncio.ensure_future(call("light")))
+        await _settle()
+        gate.set()
+        await asyncio.gather(first, *tasks)
+        # The light tenant does not wait behind bulk's whole backlog
+        assert order == ["bulk", "light", "bulk", "bulk", "bulk"]
+
+    async def test_weights_share_slots_proportionally(self):
+        controller = AdmissionController(
+            max_concurrency=1, tenant_concurrency=1, weights={"heavy": 3.0}
+        )
+        order = []
+        blocker_release = asyncio.Event()
+
+        async def call(tenant):
+            async with controller.admit(tenant):
+                order.append(tenant)
+                await asyncio.sleep(0)
+
+        async def blocker():
+            async with controller.admit("blocker"):
+                await blocker_release.wait()
+
+        held = asyncio.ensure_future(blocker())
+        await _settle()
+        tasks = [asyncio.ensure_future(call(t)) for t in ["heavy"] * 6 + ["light"] * 6]
+        await _settle()
+        blocker_release.set()
+        await asyncio.gather(held, *tasks)
+        assert order[:8].count("heavy") == 6
+        assert order[:8].count("light") == 2
+
+    async def test_saturated_queue_is_rejected_fast(self):
+        controller = AdmissionController(tenant_concurrency=1, tenant_queue=1)
+        release, log = asyncio.Event(), []
+        tasks = [asyncio.ensure_future(_hold(controller, "a", release, log)) for _ in range(2)]
+        await _settle()
+        with pytest.raises(AdmissionRejected, match="too many queued") as exc_info:
+            async with controller.admit("a"):
+                pass  # pragma: no cover - never admitted
+        assert exc_info.value.tenant == "a"
+        assert controller.counters["rejected"] == 1
+        release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_rejection_of_new_tenant_leaves_no_state(self):
+        controller = AdmissionController(max_concurrency=1, tenant_queue=0)
+        async with controller.admit("a"):
+            with pytest.raises(AdmissionRejected):
+                async with controller.admit("b"):
+                    pass  # pragma: no cover - never admitted
+            assert controller.queued("b") == 0
+        assert controller._tenants == {}
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        controller = AdmissionController(max_concurrency=1)
+        release, log = asyncio.Event(), []
+        holder = asyncio.ensure_future(_hold(controller, "a", release, log))
+        waiting = asyncio.ensure_future(_hold(controller, "b", release, log))
+        await _settle()
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert controller.queued("b") == 0
+        release.set()
+        await holder
+        assert log == ["a"]
+        assert controller.running == 0
+
+    async def test_cancelled_waiter_skipped_by_dispatch(self):
+        controller = AdmissionController(max_concurrency=1)
+        release, log = asyncio.Event(), []
+        release.set()
+        async with controller.admit("a"):
+            waiting = asyncio.ensure_future(_hold(controller, "b", release, log))
+            after = asyncio.ensure_future(_hold(controller, "c", release, log))
+            await _settle()
+            # Free the slot before the cancelled task gets to clean up
+            waiting.cancel()
+        await asyncio.gather(waiting, after, return_exceptions=True)
+        assert log == ["c"]
+        assert controller.running == 0
+        assert controller._tenants == {}
+
+    async def test_slot_granted_to_cancelled_caller_is_handed_on(self):
+        controller = AdmissionController(max_concurrency=1)
+        release, log = asyncio.Event(), []
+        release.set()
+        async with controller.admit("a"):
+            waiting = asyncio.ensure_future(_hold(controller, "b", release, log))
+            after = asyncio.ensure_future(_hold(controller, "c", release, log))
+            await _settle()
+        # Leaving the block granted b's slot, but b has not resumed yet
+        waiting.cancel()
+        await asyncio.gather(waiting, after, return_exceptions=True)
+        assert log == ["c"]
+        assert controller.running == 0
+
+
+class TestConfiguration:
+    def test_parse_weights(self):
+        assert parse_weights("") == {}
+        assert parse_weights(" 42=2, 7=0.5 ,") == {"42": 2.0, "7": 0.5}
+
+    @pytest.mark.parametrize("value", ["42", "42=0", "=1", "42=abc"])
+    def test_parse_weights_rejects_invalid(self, value):
+        with pytest.raises(ValueError, match="KAITEN_MCP_TENANT_WEIGHTS"):
+            parse_weights(value)
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_MCP_MAX_CONCURRENT_CALLS", "8")
+        monkeypatch.setenv("KAITEN_MCP_TENANT_MAX_CONCURRENT", "2")
+        monkeypatch.setenv("KAITEN_MCP_TENANT_MAX_QUEUE", "3")
+        monkeypatch.setenv("KAITEN_MCP_TENANT_WEIGHTS", "42=2")
+        controller = AdmissionController.from_env()
+        assert (
+            controller.max_concurrency,
+            controller.tenant_concurrency,
+            controller.tenant_queue,
+            controller.weights,
+        ) == (8, 2, 3, {"42": 2.0})
@@ -0,0 +1,192 @@
+"""Tests for the reference-data response cache."""
+
+import pytest
+
+from kaiten_mcp.cache import (
+    ResponseCache,
+    get_response_cache,
+    path_families,
+    reset_response_cache,
+)
+
+
+def _put(cache, path, value="v", size=10):
+    key = (path, ())
+    cache.put(key, path, value, size, cache.version(path))
+    return key
+
+
+class TestPathFamilies:
+    @pytest.mark.parametrize(
+        ("path", "expected"),
+        [
+            ("/spaces", ("spaces",)),
+            ("/spaces/12/boards", ("spaces", "boards")),
+            ("/boards/5/columns/7", ("boards", "columns")),
+            ("/company/custom-properties/5/select-values", ("custom-properties", "select-values")),
+            ("/users/current", ("users",)),
+            ("/cards/PROJ-12/tags/3", ("cards", "tags")),
+            ("/documents/8f14e45f-ceea-467f-a0e6-0c0b6a0a6f3c", ("documents",)),
+            ("/spaces?x=1", ("spaces",)),
+        ],
+    )
+    def test_extracts_collections(self, path, expected):
+        assert path_families(path) == expected
+
+
+class TestTtlAndLookup:
+    def test_only_reference_resources_are_cacheable(self):
+        cache = ResponseCache()
+        assert cache.ttl_for("/spaces") == 60.0
+        assert cache.ttl_for("/boards/1/columns") == 120.0
+        assert cache.ttl_for("/company/custom-properties") == 300.0
+        assert cache.ttl_for("/cards") is None
+        assert cache.ttl_for("/spaces/1/activity") is None
+        assert cache.ttl_for("/") is None
+
+    def test_hit_then_expiry(self, clock):
+        cache = ResponseCache(clock=clock)
+        key = _put(cache, "/spaces", [1])
+        assert cache.get(key) == (True, [1])
+        clock.now = 61
+        assert cache.get(key) == (False, None)
+        assert len(cache) == 0
+        assert cache.counters == {"hits": 1, "misses": 1}
+
+    def test_uncacheable_path_is_not_stored(self):
+        cache = ResponseCache()
+        key = _put(cache, "/cards")
+        assert cache.get(key) == (False, None)
+
+    def test_replacing_entry_keeps_byte_count(self):
+        cache = ResponseCache()
+        _put(cache, "/spaces", size=10)
+        _put(cache, "/spaces", size=30)
+        assert (len(cache), cache.size_bytes) == (1, 30)
+
+
+class TestBounds:
+    def test_lru_entry_limit(self):
+        cache = ResponseCache(max_entries=2)
+        first = _put(cache, "/spaces")
+        second = _put(cache, "/tags")
+        cache.get(first)  # refresh LRU position
+        _put(cache, "/users")
+        assert cache.get(first)[0] is True
+        assert cache.get(second)[0] is False
+        assert cache.counters["evictions"] == 1
+
+    def test_byte_limit(self):
+        cache = ResponseCache(max_bytes=25)
+        first = _put(cache, "/spaces", size=10)
+        _put(cache, "/tags", size=10)
+        _put(cache, "/users", size=10)
+        assert cache.get(first)[0] is False
+        assert cache.size_bytes == 20
+
+    def test_oversized_value_is_not_stored(self):
+        cache = ResponseCache(max_bytes=5)
+        key = _put(cache, "/spaces", size=6)
+        assert cache.get(key)[0] is False
+
+    def test_clear(self):
+        cache = ResponseCache()
+        _put(cache, "/spaces")
+        cache.clear()
+        assert (len(cache), cache.size_bytes) == (0, 0)
+
+
+class TestInvalidation:
+    def test_mutation_drops_same_family(self):
+        cache = ResponseCache()
+        columns = _put(cache, "/boards/1/columns")
+        spaces = _put(cache, "/spaces")
+        assert cache.invalidate("/boards/1/columns/5") == {"boards", "columns"}
+        assert cache.get(columns)[0] is False
+        assert cache.get(spaces)[0] is True
+        assert cache.counters["invalidations"] == 1
+
+    def test_dependent_families(self):
+        cache = ResponseCache()
+        board = _put(cache, "/boards/1")
+        cache.invalidate("/cards/10")
+        assert cache.get(board)[0] is False
+
+    def test_company_namespace_matches_plain_path(self):
+        cache = ResponseCache()
+        tags = _put(cache, "/tags")
+        cache.invalidate("/company/tags/3")
+        assert cache.get(tags)[0] is False
+
+    def test_result_fetched_before_mutation_is_not_stored(self):
+        cache = ResponseCache()
+        version = cache.version("/spaces/1/boards")
+        cache.invalidate("/spaces/1")
+        cache.put(("/spaces/1/boards", ()), "/spaces/1/boards", [], 1, version)
+        assert len(cache) == 0
+
+
+class TestFromEnv:
+    def test_defaults(self, monkeypatch):
+        for name in ("KAITEN_MCP_CACHE", "KAITEN_MCP_CACHE_MAX_ENTRIES"):
+            monkeypatch.delenv(name, raising=False)
+        cache = ResponseCache.from_env()
+        assert cache is not None
+        assert cache.max_entries == 512
+
+    def test_limits(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_MCP_CACHE_MAX_ENTRIES", "3")
+        monkeypatch.setenv("KAITEN_MCP_CACHE_MAX_BYTES", "100")
+        cache = ResponseCache.from_env()
+        assert (cache.max_entries, cache.max_bytes) == (3, 100)
+
+    @pytest.mark.parametrize("value", ["0", "false", "off"])
+    def test_disabled(self, monkeypatch, value):
+        monkeypatch.setenv("KAITEN_MCP_CACHE", value)
+        assert ResponseCache.from_env() is None
+        assert get_response_cache() is None
+
+    def test_process_wide_cache(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_MCP_CACHE_MAX_BYTES", "100")
+        cache = get_response_cache()
+        assert cache is not None
+        assert cache.max_bytes == 100
+        assert get_response_cache() is cache
+        reset_response_cache()
+        assert get_response_cache() is not cache
+
+
+class TestValidators:
+    def test_validated_entry_outlives_ttl(self, clock):
+        cache = ResponseCache(clock=clock)
+        key = ("/spaces", ())
+        cache.put(key, "/spaces", [1], 1, cache.version("/spaces"), etag='"v1"')
+        clock.now = 61
+        assert cache.get(key) == (False, None)
+        entry = cache.validated(key)
+        assert (entry.value, entry.etag) == ([1], '"v1"')
+
+    def test_uncacheable_path_is_stored_only_with_validators(self):
+        cache = ResponseCache()
+        key = ("/documents", ())
+        cache.put(key, "/documents", [1], 1, cache.version("/documents"))
+        assert cache.validated(key) is None
+        cache.put(key, "/documents", [1], 1, cache.version("/documents"), last_modified="x")
+        # Stale from the start: only a 304 may serve it
+        assert cache.get(key) == (False, None)
+        assert cache.validated(key).last_modified == "x"
+
+    def test_bulk_pages_are_not_stored_for_revalidation(self):
+        cache = ResponseCache()
+        for path in ("/cards", "/spaces/1/activity"):
+            key = (path, (("offset", "0"),))
+            cache.put(key, path, [1], 1, cache.version(path), etag='"v1"')
+            assert cache.validated(key) is None
+        assert len(cache) == 0
+        assert cache.revalidates("/documents")
+        assert not cache.revalidates("/cards")
+
+    def test_entry_without_validators_is_not_revalidatable(self):
+        cache = ResponseCache()
+        key = _put(cache, "/spaces")
+        assert cache.validated(key) is None
@@ -0,0 +1,81 @@
+"""Tests for per-call deadlines."""
+
+import asyncio
+import time
+
+import pytest
+
+from kaiten_mcp.deadline import (
+    anext_before,
+    call_deadline,
+    current_deadline,
+    default_deadline_seconds,
+    earliest,
+    remaining_seconds,
+)
+
+
+class TestCallDeadline:
+    def test_no_deadline_by_default(self):
+        assert current_deadline() is None
+        assert remaining_seconds() is None
+
+    def test_scope_sets_and_restores(self):
+        with call_deadline(10):
+            assert 9 < remaining_seconds() <= 10
+        assert current_deadline() is None
+
+    def test_inner_scope_cannot_extend_outer(self):
+        with call_deadline(1):
+            outer = current_deadline()
+            with call_deadline(60):
+                assert current_deadline() == outer
+            with call_deadline(None):
+                assert current_deadline() == outer
+            with call_deadline(0.5):
+                assert current_deadline() < outer
+
+    async def test_tasks_inherit_the_deadline(self):
+        with call_deadline(5):
+            inherited = await asyncio.ensure_future(asyncio.sleep(0, current_deadline()))
+            assert inherited == current_deadline()
+
+    def test_earliest(self):
+        assert earliest(None, None) is None
+        assert earliest(3.0, None, 2.0) == 2.0
+
+
+class TestDefaultDeadline:
+    @pytest.mark.parametrize(("value", "expected"), [("", None), ("0", None), ("45", 45.0)])
+    def test_from_env(self, monkeypatch, value, expected):
+        monkeypatch.setenv("KAITEN_MCP_CALL_DEADLINE_SECONDS", value)
+        assert default_deadline_seconds() == expected
+
+    def test_invalid(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_MCP_CALL_DEADLINE_SECONDS", "soon")
+        with pytest.raises(ValueError, match="KAITEN_MCP_CALL_DEADLINE_SECONDS"):
+            default_deadline_seconds()
+
+
+async def _numbers(delay: float = 0.0):
+    for number in range(3):
+        await asyncio.sleep(delay)
+        yield number
+
+
+class TestAnextBefore:
+    async def test_without_deadline(self):
+        assert await anext_before(_numbers(), None) == 0
+
+    async def test_in_time(self):
+        assert await anext_before(_numbers(), time.monotonic() + 5) == 0
+
+    async def test_slow_item_times_out(self):
+        with pytest.raises(TimeoutError):
+            await anext_before(_numbers(delay=1), time.monotonic() + 0.02)
+
+    async def test_expired_deadline_does_not_resume(self):
+        numbers = _numbers()
+        with pytest.raises(TimeoutError):
+            await anext_before(numbers, time.monotonic() - 1)
+        assert await anext(numbers) == 0
@@ -0,0 +1,185 @@
+"""Tests for the local fake Kaiten API used by load and benchmark runs."""
+
+import httpx
+import pytest
+
+from kaiten_mcp.client import KaitenApiError, KaitenClient
+from kaiten_mcp.fake_kaiten import FakeKaitenConfig, attach, create_fake_kaiten_app
+from kaiten_mcp.server import ALL_TOOLS
+
+BASE_URL = "http://fake.test/api/latest"
+
+
+def _http(app, token="token"):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=BASE_URL, headers=headers
+    )
+
+
+def _client(app, token="token"):
+    return attach(KaitenClient(base_url="http://fake.test", token=token), app)
+
+
+class TestDataset:
+    def test_is_deterministic(self):
+        config = FakeKaitenConfig(cards=20)
+        first = create_fake_kaiten_app(config).state.store
+        second = create_fake_kaiten_app(config).state.store
+        assert first.collections["/cards"] == second.collections["/cards"]
+
+    async def test_sizes_and_references(self):
+        app = create_fake_kaiten_app(
+            FakeKaitenConfig(spaces=2, boards_per_space=3, cards=40, activity_per_space=15)
+        )
+        async with _http(app) as http:
+            spaces = (await http.get("/spaces")).json()
+            assert len(spaces) == 2
+            boards = (await http.get(f"/spaces/{spaces[0]['id']}/boards")).json()
+            assert len(boards) == 3
+            board = (await http.get(f"/boards/{boards[0]['id']}")).json()
+            columns = (await http.get(f"/boards/{board['id']}/columns")).json()
+            assert [column["id"] for column in columns] == [c["id"] for c in board["columns"]]
+            cards = (await http.get("/cards", params={"board_id": board["id"]})).json()
+            assert cards
+            assert all(card["board_id"] == board["id"] for card in cards)
+            activity = (await http.get(f"/spaces/{spaces[0]['id']}/activity")).json()
+            assert len(activity) == 15
+            assert activity[0]["created"] > activity[-1]["created"]
+            assert (await http.get("/users/current")).json()["id"] == 1
+            assert (await http.get("/companies/current")).json()["name"] == "Fake Company"
+
+    async def test_documents_form_a_tree(self):
+        app = create_fake_kaiten_app(FakeKaitenConfig(cards=0, documents=600))
+        async with _http(app) as http:
+            documents = (await http.get("/documents", params={"limit": 1000})).json()
+            groups = (await http.get("/document-groups")).json()
+        assert len(documents) == 500  # document lists are capped at 500, not 100
+        assert len(groups) == 30
+        group_uids = {group["uid"] for group in groups}
+        assert all(document["parent_entity_uid"] in group_uids for document in documents)
+        assert any(group["parent_entity_uid"] in group_uids for group in groups)
+
+
+class TestApi:
+    async def test_limit_offset_pagination(self):
+        app = create_fake_kaiten_app(FakeKaitenConfig(cards=250))
+        async with _http(app) as http:
+            first = (await http.get("/cards", params={"limit": 100, "offset": 0})).json()
+            last = (await http.get("/cards", params={"limit": 100, "offset": 200})).json()
+            capped = (await http.get("/cards", params={"limit": 500})).json()
+        assert len(first) == 100
+        assert len(last) == 50
+        assert len(capped) == 100
+        assert first[0]["id"] != last[0]["id"]
+
+    async def test_filters(self):
+        app = create_fake_kaiten_app(FakeKaitenConfig(cards=60))
+        async with _http(app) as http:
+            done = (await http.get("/cards", params={"states": "3"})).json()
+            archived = (await http.get("/cards", params={"archived": "true"})).json()
+            recent = (
+                await http.get("/cards", params={"created_after": "2025-01-01T05:00:00.000Z"})
+            ).json()
+            early = (
+                await http.get("/cards", params={"created_before": "2025-01-01T00:10:00.000Z"})
+            ).json()
+            title = done[0]["title"]
+            found = (await http.get("/cards", params={"query": title.upper()})).json()
+        assert done
+        assert all(card["state"] == 3 for card in done)
+        assert archived == []
+        assert recent
+        assert all(card["created"] > "2025-01-01T05:00:00.000Z" for card in recent)
+        assert [card["created"] for card in early] == [
+            "2025-01-01T00:00:00.000Z",
+            "2025-01-01T00:07:00.000Z",
+        ]
+        assert all(title.lower() in card["title"].lower() for card in found)
+
+    async def test_crud(self):
+        app = create_fake_kaiten_app(FakeKaitenConfig(cards=1))
+        async with _http(app) as http:
+            created = (await http.post("/cards", json={"title": "New", "board_id": 7})).json()
+            card_path = f"/cards/{created['id']}"
+            assert (await http.get(card_path)).json()["title"] == "New"
+            patched = await http.patch(card_path, json={"title": "Renamed"})
+            assert patched.json()["title"] == "Renamed"
+            comment = (await http.post(f"{card_path}/comments", json={"text": "hi"})).json()
+            assert (await http.get(f"{card_path}/comments")).json() == [comment]
+            assert (await http.put("/companies/current", json={"name": "X"})).json()["name"] == "X"
+            assert (await http.delete(card_path)).status_code == 200
+            assert (await http.get(card_path)).status_code == 404
+            assert created not in (await http.get("/cards")).json()
+            assert (await http.delete(card_path)).status_code == 404
+            assert (await http.patch(card_path, json={})).status_code == 404
+            empty = await http.post("/tags")
+            assert empty.json()["id"] > 0
+
+    async def test_unknown_collection_is_empty_and_unknown_item_404(self):
+        app = create_fake_kaiten_app(FakeKaitenConfig(cards=1))
+        async with _http(app) as http:
+            assert (await http.get("/cards/1/children")).json() == []
+            assert (await http.get("/sprints/999999")).status_code == 404
+
+    async def test_current_user_depends_on_token(self):
+        app = create_fake_kaiten_app(FakeKaitenConfig(cards=1, users=2))
+        async with _http(app, "a") as first, _http(app, "b") as second, _http(app, "c") as third:
+            ids = [(await http.get("/users/current")).json()["id"] for http in (first, second)]
+            again = (await first.get("/users/current")).json()["id"]
+            wrapped = (await third.get("/users/current")).json()["id"]
+        assert ids == [1, 2]
+        assert again == 1
+        assert wrapped == 1
+
+    async def test_requires_bearer_token(self):
+        app = create_fake_kaiten_app(FakeKaitenConfig(cards=1))
+        async with _http(app, token=None) as http:
+            assert (await http.get("/spaces")).status_code == 401
+        assert app.state.stats["unauthorized"] == 1
+
+
+class TestFaults:
+    async def test_throttles_per_token_with_retry_after(self):
+        app = create_fake_kaiten_app(FakeKaitenConfig(cards=1, rate_limit=1, burst=2))
+        async with _http(app, "a") as first, _http(app, "b") as second:
+            statuses = [(await first.get("/spaces")).status_code for _ in range(3)]
+            other = await second.get("/spaces")
+            throttled = await first.get("/spaces")
+        assert statuses == [200, 200, 429]
+        assert other.status_code == 200
+        assert throttled.headers["Retry-After"] == "1"
+        assert app.state.stats["throttled"] == 2
+
+    async def test_error_rate_and_latency(self):
+        app = create_fake_kaiten_app(
+            FakeKaitenConfig(cards=1, error_rate=1.0, latency=0.001, latency_jitter=0.001)
+        )
+        async with _http(app) as http:
+            response = await http.get("/spaces")
+            stats = (await http.get("http://fake.test/__fake__/stats")).json()
+        assert response.status_code == 503
+        assert stats == {"requests": 1, "faults": 1}
+
+
+class TestWithClient:
+    async def test_bulk_tool_pages_through_fake(self):
+        app = create_fake_kaiten_app(FakeKaitenConfig(cards=230))
+        client = _client(app)
+        try:
+            handler = ALL_TOOLS["kaiten_list_all_cards"]["handler"]
+            cards = await handler(client, {"page_size": 100})
+        finally:
+            await client.close()
+        assert len(cards) == 230
+        assert app.state.stats["GET"] >= 3  # plus speculative pages past the end
+
+    async def test_client_surfaces_injected_faults(self):
+        app = create_fake_kaiten_app(FakeKaitenConfig(cards=1, error_rate=1.0))
+        client = _client(app)
+        try:
+            with pytest.raises(KaitenApiError) as exc_info:
+                await client.get("/spaces")
+        finally:
+            await client.close()
+        assert exc_info.value.status_code == 503
@@ -1,5 +1,6 @@
 """Tests for shared HTTP MCP OAuth onboarding and per-user Kaiten credentials."""
 
+import asyncio
 import base64
 import hashlib
 from contextlib import asynccontextmanager
@@ -17,6 +18,7 @@ from mcp.server.auth.provider import AccessToken
 from starlette.responses import JSONResponse
 from starlette.testclient import TestClient
 
+from kaiten_mcp.admission import AdmissionController
 from kaiten_mcp.auth import (
     AUTH_STORE,
     DEFAULT_REQUIRED_SCOPE,
@@ -590,3 +592,96 @@ async def test_call_tool_uses_request_scoped_kaiten_credential():
     assert used_client.token == "kaiten-user-token"
     assert used_client.base_url == "https://acme.kaiten.ru/api/latest"
     assert result.isError is False
+
+
+async def test_call_tool_reuses_pooled_client_for_same_credential():
+    credential = AUTH_STORE.store_credential(
+        token="kaiten-pooled-token",
+        subdomain="acme",
+        base_domain=None,
+        base_url=None,
+        user={"id": 7, "full_name": "Bob"},
+    )
+    access_token = AccessToken(
+        token="mcp-pooled-token",
+        client_id="client-1",
+        scopes=[DEFAULT_REQUIRED_SCOPE],
+        expires_at=credential.expires_at,
+        resource="https://mcp.example.com/mcp",
+        subject="kaiten:7",
+        claims={"kaiten_credential_id": credential.id},
+    )
+    context_token = auth_context_var.set(AuthenticatedUser(access_token))
+    handler = AsyncMock(return_value={"ok": True})
+    try:
+        with patch.dict(
+            ALL_TOOLS,
+            {
+                "test_tool": {
+                    "handler": handler,
+                    "description": "t",
+                    "inputSchema": {"type": "object", "properties": {}},
+                },
+            },
+        ):
+            await call_tool("test_tool", {})
+            await call_tool("test_tool", {})
+    finally:
+        auth_context_var.reset(context_token)
+
+    first_client, second_client = (call.args[0] for call in handler.await_args_list)
+    assert first_client is second_client
+    assert first_client.token == "kaiten-pooled-token"
+
+
+async def test_call_tool_rejects_tenant_over_admission_limits():
+    credential = AUTH_STORE.store_credential(
+        token="kaiten-busy-token",
+        subdomain="acme",
+        base_domain=None,
+        base_url=None,
+        user={"id": 9, "full_name": "Carol"},
+    )
+    access_token = AccessToken(
+        token="mcp-busy-token",
+        client_id="client-1",
+        scopes=[DEFAULT_REQUIRED_SCOPE],
+        expires_at=credential.expires_at,
+        resource="https://mcp.example.com/mcp",
+        subject="kaiten:9",
+        claims={"kaiten_credential_id": credential.id},
+    )
+    release = asyncio.Event()
+
+    async def slow_handler(client, args):
+        await release.wait()
+        return {"ok": True}
+
+    controller = AdmissionController(tenant_concurrency=1, tenant_queue=0)
+    context_token = auth_context_var.set(AuthenticatedUser(access_token))
+    try:
+        with (
+            patch("kaiten_mcp.runtime._admission", controller),
+            patch.dict(
+                ALL_TOOLS,
+                {
+                    "test_tool": {
+                        "handler": slow_handler,
+                        "description": "t",
+                        "inputSchema": {"type": "object", "properties": {}},
+                    },
+                },
+            ),
+        ):
+            running = asyncio.ensure_future(call_tool("test_tool", {}))
+            await asyncio.sleep(0)
+            rejected = await call_tool("test_tool", {})
+            release.set()
+            completed = await running
+    finally:
+        auth_context_var.reset(context_token)
+
+    assert rejected.isError is True
+    assert rejected.content[0].text.startswith("Server overloaded: too many queued tool calls")
+    assert completed.isError is False
+    assert controller.counters["rejected"] == 1
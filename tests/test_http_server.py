@@ -8,6 +8,7 @@ from starlette.responses import JSONResponse
 from starlette.testclient import TestClient
 
 from kaiten_mcp.http_server import create_http_app
+from kaiten_mcp.resilience import get_upstream_guard
 
 
 class FakeSessionManager:
@@ -47,7 +48,43 @@ def test_readyz_returns_ready_with_auth_mode():
             response = client.get("/readyz")
 
     assert response.status_code == 200
-    assert response.json() == {"status": "ready", "auth_mode": "oauth"}
+    assert response.json() == {"status": "ready", "auth_mode": "oauth", "circuit_breakers": {}}
+
+
+def test_readyz_reports_open_circuit_breakers():
+    breaker = get_upstream_guard("https://acme.kaiten.ru/api/latest").breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    with patch.dict("os.environ", {"MCP_HTTP_AUTH_MODE": "oauth"}, clear=False):
+        app = create_http_app(session_manager_cls=FakeSessionManager)
+        with TestClient(app) as client:
+            response = client.get("/readyz")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "degraded"
+    assert body["circuit_breakers"]["https://acme.kaiten.ru/api/latest"]["state"] == "open"
+
+
+def test_metrics_endpoint_renders_prometheus_text():
+    app = create_http_app(session_manager_cls=FakeSessionManager)
+    with TestClient(app) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE kaiten_mcp_tool_call_duration_seconds histogram" in response.text
+
+
+def test_metrics_endpoint_can_require_token():
+    with patch.dict("os.environ", {"MCP_METRICS_TOKEN": "scrape"}, clear=False):
+        app = create_http_app(session_manager_cls=FakeSessionManager)
+        with TestClient(app) as client:
+            denied = client.get("/metrics")
+            allowed = client.get("/metrics", headers={"Authorization": "Bearer scrape"})
+
+    assert denied.status_code == 401
+    assert allowed.status_code == 200
 
 
 def test_readyz_does_not_require_kaiten_token_in_oauth_mode():
@@ -1,12 +1,13 @@
 """Layer 1 - Tool Registration & Discovery.
 
-Verify that ALL 246 MCP tools are properly registered and discoverable.
+Verify that ALL 249 MCP tools are properly registered and discoverable.
 """
 
 import asyncio
 import inspect
 
 from kaiten_mcp.server import ALL_TOOLS, TOOL_MODULES, list_tools
+from kaiten_mcp.tools.compact import FORMAT_PROPERTY
 
 
 class TestToolRegistration:
@@ -18,7 +19,7 @@ class TestToolRegistration:
             assert isinstance(mod.TOOLS, dict)
 
     def test_total_tool_count(self):
-        assert len(ALL_TOOLS) == 246
+        assert len(ALL_TOOLS) == 249
 
     def test_no_duplicate_tool_names(self):
         names = []
@@ -84,6 +85,12 @@ class TestToolRegistration:
                     for tt in types:
                         assert tt in valid_types, f"{name}.{prop_name}: invalid type '{tt}'"
 
+    def test_list_tools_accept_format(self):
+        for name, defn in ALL_TOOLS.items():
+            if name.startswith("kaiten_list_"):
+                props = defn["inputSchema"]["properties"]
+                assert props.get("format") == FORMAT_PROPERTY, f"{name}: missing format"
+
     def test_no_handler_shared_across_tools(self):
         handler_ids = [id(defn["handler"]) for defn in ALL_TOOLS.values()]
         assert len(handler_ids) == len(set(handler_ids)), (
@@ -102,4 +109,4 @@ class TestToolRegistration:
             assert tool.inputSchema
 
     def test_modules_count(self):
-        assert len(TOOL_MODULES) == 27
+        assert len(TOOL_MODULES) == 28
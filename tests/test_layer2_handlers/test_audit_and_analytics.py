@@ -5,6 +5,7 @@ import json
 from httpx import Response
 
 from kaiten_mcp.tools.audit_and_analytics import TOOLS
+from tests.helpers import paged_responder
 
 # ---------------------------------------------------------------------------
 # Audit Logs
@@ -133,19 +134,13 @@ class TestGetAllSpaceActivity:
 
     async def test_multi_page(self, client, mock_api):
         """Multiple pages with auto-pagination."""
-        page1 = [{"id": i} for i in range(100)]
-        page2 = [{"id": i} for i in range(100, 150)]
-        route = mock_api.get("/spaces/1/activity").mock(
-            side_effect=[
-                Response(200, json=page1),
-                Response(200, json=page2),
-            ]
-        )
+        events = [{"id": i} for i in range(150)]
+        route = mock_api.get("/spaces/1/activity").mock(side_effect=paged_responder(events))
         result = await TOOLS["kaiten_get_all_space_activity"]["handler"](
             client, {"space_id": 1, "page_size": 100}
         )
-        assert route.call_count == 2
-        assert len(result) == 150
+        assert 2 <= route.call_count <= 5
+        assert [event["id"] for event in result] == list(range(150))
 
     async def test_with_actions_filter(self, client, mock_api):
         """Activity with actions filter passed to each page."""
@@ -182,6 +177,42 @@ class TestGetAllSpaceActivity:
         assert route.call_count == 1
         assert result == []
 
+    async def test_output_file(self, client, mock_api, tmp_path, monkeypatch):
+        """output_file streams compacted events into a JSON array file."""
+        monkeypatch.setenv("KAITEN_MCP_OUTPUT_DIR", str(tmp_path))
+        avatar = "data:image/png;base64," + "A" * 2048
+        events = [{"id": i, "author": {"id": 1, "avatar": avatar}} for i in range(120)]
+        mock_api.get("/spaces/1/activity").mock(side_effect=paged_responder(events))
+        result = await TOOLS["kaiten_get_all_space_activity"]["handler"](
+            client, {"space_id": 1, "output_file": "json"}
+        )
+        with open(result["saved_to"], encoding="utf-8") as f:  # noqa: ASYNC230
+            saved = json.load(f)
+        assert [event["id"] for event in saved] == list(range(120))
+        assert avatar not in json.dumps(saved)
+        assert result["total_items"] == 120
+
+    async def test_cursor(self, client, mock_api):
+        """A cursor continues the activity scan."""
+        events = [{"id": i} for i in range(30)]
+        mock_api.get("/spaces/1/activity").mock(side_effect=paged_responder(events))
+        handler = TOOLS["kaiten_get_all_space_activity"]["handler"]
+        first = await handler(client, {"space_id": 1, "batch_size": 20})
+        rest = await handler(client, {"space_id": 1, "cursor": first["next_cursor"]})
+        assert [e["id"] for e in first["items"] + rest["items"]] == list(range(30))
+        assert rest["next_cursor"] is None
+
+    async def test_max_bytes(self, client, mock_api):
+        """max_bytes stops the activity scan with a resume offset."""
+        events = [{"id": i, "action": "card_move"} for i in range(150)]
+        mock_api.get("/spaces/1/activity").mock(side_effect=paged_responder(events))
+        result = await TOOLS["kaiten_get_all_space_activity"]["handler"](
+            client, {"space_id": 1, "max_bytes": 3000, "offset": 10}
+        )
+        assert result["truncated"]["reason"] == "max_bytes"
+        assert result["items"][0]["id"] == 10
+        assert result["truncated"]["resume_offset"] == 10 + len(result["items"])
+
 
 # ---------------------------------------------------------------------------
 # Card History
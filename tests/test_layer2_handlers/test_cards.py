@@ -2,9 +2,11 @@
 
 import json
 
+import pytest
 from httpx import Response
 
 from kaiten_mcp.tools.cards import TOOLS
+from tests.helpers import paged_responder
 
 
 class TestListCardsDefaultLimit:
@@ -410,17 +412,12 @@ class TestListAllCards:
 
     async def test_multi_page(self, client, mock_api):
         """Multiple pages with auto-pagination."""
-        page1 = [{"id": i} for i in range(100)]
-        page2 = [{"id": i} for i in range(100, 170)]
-        route = mock_api.get("/cards").mock(
-            side_effect=[
-                Response(200, json=page1),
-                Response(200, json=page2),
-            ]
-        )
+        cards = [{"id": i} for i in range(170)]
+        route = mock_api.get("/cards").mock(side_effect=paged_responder(cards))
         result = await TOOLS["kaiten_list_all_cards"]["handler"](client, {"page_size": 100})
-        assert route.call_count == 2
-        assert len(result) == 170
+        # Later offsets are requested speculatively while earlier pages are in flight
+        assert 2 <= route.call_count <= 5
+        assert [card["id"] for card in result] == list(range(170))
 
     async def test_with_space_filter(self, client, mock_api):
         """Filters passed to each page request."""
@@ -468,6 +465,65 @@ class TestListAllCards:
         assert route.call_count == 1
         assert result == []
 
+    async def test_output_file_streams_projected_pages(
+        self, client, mock_api, tmp_path, monkeypatch
+    ):
+        """output_file writes every page to a file and returns a summary."""
+        monkeypatch.setenv("KAITEN_MCP_OUTPUT_DIR", str(tmp_path))
+        cards = [{"id": i, "title": f"c{i}", "description": "x"} for i in range(150)]
+        mock_api.get("/cards").mock(side_effect=paged_responder(cards))
+        result = await TOOLS["kaiten_list_all_cards"]["handler"](
+            client, {"output_file": "ndjson", "fields": "id,title"}
+        )
+        with open(result["saved_to"], encoding="utf-8") as f:  # noqa: ASYNC230
+            lines = [json.loads(line) for line in f]
+        assert lines == [{"id": i, "title": f"c{i}"} for i in range(150)]
+        assert result["total_items"] == 150
+        assert result["sample"] == lines[:3]
+
+    async def test_output_file_requires_output_dir(self, client, mock_api, monkeypatch):
+        """Without KAITEN_MCP_OUTPUT_DIR nothing is fetched."""
+        monkeypatch.delenv("KAITEN_MCP_OUTPUT_DIR", raising=False)
+        route = mock_api.get("/cards").mock(return_value=Response(200, json=[]))
+        with pytest.raises(ValueError, match="KAITEN_MCP_OUTPUT_DIR"):
+            await TOOLS["kaiten_list_all_cards"]["handler"](client, {"output_file": "json"})
+        assert not route.called
+
+    async def test_format_columns(self, client, mock_api):
+        """format=columns returns one value array per field."""
+        cards = [{"id": i, "title": f"c{i}"} for i in range(3)]
+        mock_api.get("/cards").mock(return_value=Response(200, json=cards))
+        result = await TOOLS["kaiten_list_all_cards"]["handler"](
+            client, {"format": "columns", "fields": "id,title"}
+        )
+        assert result["columns"] == {"id": [0, 1, 2], "title": ["c0", "c1", "c2"]}
+
+    async def test_cursor_batches(self, client, mock_api):
+        """batch_size returns one batch and a cursor; requests follow consumption."""
+        cards = [{"id": i} for i in range(250)]
+        route = mock_api.get("/cards").mock(side_effect=paged_responder(cards))
+        handler = TOOLS["kaiten_list_all_cards"]["handler"]
+        first = await handler(client, {"batch_size": 50})
+        assert [card["id"] for card in first["items"]] == list(range(50))
+        assert route.call_count == 1
+        second = await handler(client, {"cursor": first["next_cursor"]})
+        assert [card["id"] for card in second["items"]] == list(range(50, 100))
+        assert route.call_count == 1
+        third = await handler(client, {"cursor": second["next_cursor"]})
+        assert third["items"][0]["id"] == 100
+        assert route.call_count == 2
+
+    async def test_max_items_truncates_and_resumes(self, client, mock_api):
+        """max_items returns a truncation marker whose resume_offset continues the scan."""
+        cards = [{"id": i} for i in range(250)]
+        mock_api.get("/cards").mock(side_effect=paged_responder(cards))
+        handler = TOOLS["kaiten_list_all_cards"]["handler"]
+        first = await handler(client, {"max_items": 120})
+        assert [card["id"] for card in first["items"]] == list(range(120))
+        assert first["truncated"] == {"reason": "max_items", "returned": 120, "resume_offset": 120}
+        rest = await handler(client, {"offset": first["truncated"]["resume_offset"]})
+        assert [card["id"] for card in rest] == list(range(120, 250))
+
 
 class TestListCardsRelationsFields:
     """Test relations and fields parameters on card list tools."""
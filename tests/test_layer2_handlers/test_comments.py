@@ -16,6 +16,16 @@ class TestListComments:
         assert route.called
         assert result == [{"id": 10, "text": "hi"}]
 
+    async def test_csv_format(self, client, mock_api):
+        mock_api.get("/cards/1/comments").mock(
+            return_value=Response(200, json=[{"id": 10, "text": "hi"}, {"id": 11, "text": "a,b"}])
+        )
+        result = await TOOLS["kaiten_list_comments"]["handler"](
+            client, {"card_id": 1, "format": "csv"}
+        )
+        assert result.text == 'id,text\n10,hi\n11,"a,b"\n'
+        assert result.total_items == 2
+
 
 class TestCreateComment:
     async def test_required_only(self, client, mock_api):
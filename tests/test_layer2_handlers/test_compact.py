@@ -1,13 +1,24 @@
 """Tests for compact response utilities."""
 
+import csv
+import io
+import json
+
+import pytest
+
+from kaiten_mcp.serialization import take_stripped
 from kaiten_mcp.tools.compact import (
     DEFAULT_LIMIT,
     STRIP_FIELDS,
+    FormattedText,
     _is_base64_avatar,
     _simplify_user,
     compact_response,
+    format_result,
+    project,
     select_fields,
     strip_base64,
+    summarize,
 )
 
 
@@ -376,6 +387,16 @@ class TestStripBase64:
         assert result["photo"].startswith("[base64 ~")
         assert count == 2
 
+    def test_copies_only_containers_with_data_uris(self):
+        """strip_base64 should copy-on-write and leave the input intact."""
+        clean = {"id": 2, "tags": [{"name": "t"}]}
+        data = [{"id": 1, "avatar": "data:image/png;base64,aaa"}, clean]
+        result, count = strip_base64(data)
+        assert count == 1
+        assert result[1] is clean
+        assert data[0]["avatar"] == "data:image/png;base64,aaa"
+        assert strip_base64(clean)[0] is clean
+
     def test_keeps_http_urls(self):
         """strip_base64 should not touch HTTP/HTTPS URLs."""
         data = {"avatar_url": "https://example.com/avatar.png", "id": 1}
@@ -462,3 +483,100 @@ class TestStripBase64:
         result_none, count_none = strip_base64(None)
         assert result_none is None
         assert count_none == 0
+
+
+ROWS = [
+    {"id": 1, "title": "A", "owner": {"id": 5}, "blocked": True},
+    {"id": 2, "title": "B, with comma", "tags": ["x"], "due_date": None},
+    {"id": 3, "title": "Кириллица"},
+    {"id": 4},
+]
+
+
+class TestFormatResult:
+    """Tests for format_result layouts of list results."""
+
+    @pytest.mark.parametrize("fmt", [None, "", "rows"])
+    def test_rows_returns_data_unchanged(self, fmt):
+        assert format_result(ROWS, fmt) is ROWS
+
+    def test_columns(self):
+        result = format_result(ROWS, "columns")
+        assert result["format"] == "columns"
+        assert result["total_items"] == 4
+        assert list(result["columns"]) == ["id", "title", "owner", "blocked", "tags", "due_date"]
+        assert result["columns"]["id"] == [1, 2, 3, 4]
+        assert result["columns"]["owner"] == [{"id": 5}, None, None, None]
+
+    def test_ndjson(self):
+        result = format_result(ROWS, "ndjson")
+        assert isinstance(result, FormattedText)
+        assert [json.loads(line) for line in result.text.splitlines()] == ROWS
+        assert result.total_items == 4
+        assert result.sample == ROWS[:3]
+
+    def test_csv(self):
+        result = format_result(ROWS, "csv")
+        header, *rows = list(csv.reader(io.StringIO(result.text)))
+        assert header == ["id", "title", "owner", "blocked", "tags", "due_date"]
+        assert rows[0] == ["1", "A", '{"id":5}', "true", "", ""]
+        assert rows[1] == ["2", "B, with comma", "", "", '["x"]', ""]
+        assert rows[3] == ["4", "", "", "", "", ""]
+
+    def test_columns_are_smaller_than_rows(self):
+        cards = [
+            {"id": i, "title": f"Card {i}", "board_id": 7, "column_id": 9} for i in range(100)
+        ]
+        rows_size = len(json.dumps(cards))
+        assert len(json.dumps(format_result(cards, "columns"))) < rows_size / 2
+        assert len(format_result(cards, "csv").text) < rows_size / 2
+
+    def test_strips_data_uris_and_keeps_projection_count(self):
+        avatar = "data:image/png;base64," + "A" * 2048
+        data = project(
+            [{"id": 1, "cover": avatar, "owner": {"avatar": avatar}}], fields="id,cover"
+        )
+        result = format_result(data, "columns")
+        assert result["columns"]["cover"] == ["[base64 ~2KB, omitted]"]
+        assert take_stripped(result) == 1
+
+        text = format_result([{"id": 1, "cover": avatar}], "ndjson")
+        assert text.stripped == 1
+        assert avatar not in text.text
+
+    @pytest.mark.parametrize("data", [{"id": 1}, [1, 2], [{"id": 1}, "x"]])
+    def test_non_object_lists_are_left_as_rows(self, data):
+        assert format_result(data, "csv") is data
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError, match="rows, columns, ndjson, csv"):
+            format_result(ROWS, "xml")
+
+
+class TestSummarize:
+    """Tests for summarize counts and samples."""
+
+    def test_list(self):
+        assert summarize(ROWS) == (4, ROWS[:3])
+
+    def test_dict(self):
+        assert summarize({"id": 1}) == (1, {"id": 1})
+
+    def test_columns(self):
+        count, sample = summarize(format_result(ROWS, "columns"))
+        assert count == 4
+        assert sample["id"] == [1, 2, 3]
+
+    def test_formatted_text(self):
+        assert summarize(format_result(ROWS, "ndjson")) == (4, ROWS[:3])
+
+    def test_incomplete_result_is_summarized_by_items(self):
+        truncated = {"reason": "deadline", "returned": 4, "resume_offset": 4}
+        assert summarize({"items": ROWS, "incomplete": True, "truncated": truncated}) == (
+            4,
+            ROWS[:3],
+        )
+        text = format_result(ROWS, "ndjson").text
+        count, sample = summarize({"items": text, "incomplete": True, "truncated": truncated})
+        assert count == 4
+        assert sample == text.splitlines()[:3]
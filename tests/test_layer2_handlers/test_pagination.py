@@ -0,0 +1,495 @@
+"""Tests for the pipelined pagination engine."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from kaiten_mcp.client import DeadlineExceeded
+from kaiten_mcp.deadline import call_deadline
+from kaiten_mcp.ratelimit import Priority, current_priority
+from kaiten_mcp.tools.compact import format_result
+from kaiten_mcp.tools.pagination import (
+    DEFAULT_PAGE_CONCURRENCY,
+    CursorRegistry,
+    CursorScan,
+    FetchedPages,
+    PageBudget,
+    cursor_page,
+    fetch_all_pages,
+    fetch_pages,
+    get_cursor_registry,
+    iter_pages,
+    page_concurrency,
+)
+
+
+class FakePagedClient:
+    """Serve ``total`` items by limit/offset with per-offset latency."""
+
+    def __init__(self, total: int, delays: dict[int, float] | None = None, burst: int = 5):
+        self.total = total
+        self.delays = delays or {}
+        self.burst_capacity = burst
+        self.offsets: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = 0
+        self.fail_at: int | None = None
+        self.priorities: set[Priority] = set()
+
+    async def get(self, path, params=None):
+        offset, limit = params["offset"], params["limit"]
+        self.offsets.append(offset)
+        self.priorities.add(current_priority())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(offset, 0.001))
+            if offset == self.fail_at:
+                raise RuntimeError(f"boom at {offset}")
+            return [{"id": i} for i in range(offset, min(offset + limit, self.total))]
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+
+class SizedPagedClient(FakePagedClient):
+    """Report a response body of ``item_bytes`` per item, like :class:`KaitenClient`."""
+
+    def __init__(self, total: int, item_bytes: int):
+        super().__init__(total)
+        self.item_bytes = item_bytes
+
+    async def get_sized(self, path, params=None):
+        page = await self.get(path, params=params)
+        return page, len(page) * self.item_bytes
+
+
+class DeadlineOnceClient(FakePagedClient):
+    """Run out of call deadline the first time ``offset`` is requested."""
+
+    def __init__(self, total: int, offset: int):
+        super().__init__(total)
+        self.deadline_at: int | None = offset
+
+    async def get(self, path, params=None):
+        if params["offset"] == self.deadline_at:
+            self.offsets.append(self.deadline_at)
+            self.deadline_at = None
+            raise DeadlineExceeded()
+        return await super().get(path, params=params)
+
+
+class TestPageConcurrency:
+    def test_uses_client_burst_capped_by_default(self):
+        assert page_concurrency(FakePagedClient(0, burst=2)) == 2
+        assert page_concurrency(FakePagedClient(0, burst=50)) == DEFAULT_PAGE_CONCURRENCY
+
+    def test_explicit_value_wins(self):
+        assert page_concurrency(FakePagedClient(0), 7) == 7
+        assert page_concurrency(FakePagedClient(0), 0) == 1
+
+    def test_unknown_client_falls_back_to_sequential(self):
+        assert page_concurrency(MagicMock()) == 1
+        assert page_concurrency(object()) == 1
+
+
+class TestIterPages:
+    async def test_pages_in_order_despite_out_of_order_completion(self):
+        client = FakePagedClient(350, delays={10: 0.05, 20: 0.001, 30: 0.02})
+        result = await fetch_all_pages(client, "/cards", page_size=10, max_pages=50)
+        assert [item["id"] for item in result] == list(range(350))
+
+    async def test_first_page_is_fetched_alone(self):
+        client = FakePagedClient(5)
+        result = await fetch_all_pages(client, "/cards", page_size=10, max_pages=50)
+        assert len(result) == 5
+        assert client.offsets == [0]
+
+    async def test_keeps_window_of_requests_in_flight(self):
+        client = FakePagedClient(1000, burst=3)
+        await fetch_all_pages(client, "/cards", page_size=10, max_pages=20)
+        assert client.max_in_flight == 3
+        assert len(client.offsets) == 20
+
+    async def test_stops_issuing_offsets_after_short_page(self):
+        client = FakePagedClient(25, burst=4)
+        result = await fetch_all_pages(client, "/cards", page_size=10, max_pages=50)
+        assert len(result) == 25
+        # Only speculative offsets from the first window can be past the end
+        assert max(client.offsets) <= 40
+
+    async def test_respects_max_pages_and_start_offset(self):
+        client = FakePagedClient(1000)
+        result = await fetch_all_pages(
+            client, "/cards", {"space_id": 1}, page_size=10, max_pages=3, start_offset=100
+        )
+        assert [item["id"] for item in result] == list(range(100, 130))
+        assert sorted(client.offsets) == [100, 110, 120]
+
+    async def test_empty_first_page(self):
+        client = FakePagedClient(0)
+        assert await fetch_all_pages(client, "/cards", page_size=10, max_pages=5) == []
+
+    async def test_error_propagates_and_cancels_speculative_requests(self):
+        client = FakePagedClient(1000, delays={20: 0.2, 30: 0.2, 40: 0.2}, burst=4)
+        client.fail_at = 10
+        with pytest.raises(RuntimeError, match="boom at 10"):
+            await fetch_all_pages(client, "/cards", page_size=10, max_pages=50)
+        assert client.cancelled == 3
+        assert client.in_flight == 0
+
+    async def test_closing_iterator_early_cancels_pending(self):
+        client = FakePagedClient(1000, delays={20: 0.2, 30: 0.2, 40: 0.2}, burst=4)
+        pages = iter_pages(client, "/cards", page_size=10, max_pages=50)
+        first = await pages.__anext__()
+        second = await pages.__anext__()
+        await pages.aclose()
+        assert first[0]["id"] == 0
+        assert second[0]["id"] == 10
+        assert client.in_flight == 0
+
+    async def test_does_not_mutate_caller_params(self):
+        client = FakePagedClient(5)
+        params = {"space_id": 1}
+        await fetch_all_pages(client, "/cards", params, page_size=10, max_pages=5)
+        assert params == {"space_id": 1}
+
+    async def test_pages_are_requested_with_bulk_priority(self):
+        client = FakePagedClient(25)
+        await fetch_all_pages(client, "/cards", page_size=10, max_pages=5)
+        assert client.priorities == {Priority.BULK}
+        assert current_priority() is Priority.INTERACTIVE
+
+
+def _scan(max_pages=50):
+    return CursorScan("/cards", None, page_size=10, max_pages=max_pages)
+
+
+class TestCursorScan:
+    async def test_fetches_only_pages_the_batch_needs(self):
+        client = FakePagedClient(1000)
+        scan = _scan()
+        batch = await scan.next_batch(client, 15)
+        assert [item["id"] for item in batch] == list(range(15))
+        assert client.offsets == [0, 10]
+        batch = await scan.next_batch(client, 5)
+        assert [item["id"] for item in batch] == list(range(15, 20))
+        assert client.offsets == [0, 10]  # served from the buffer
+        assert scan.returned == 20
+        assert not scan.done
+        await scan.aclose()
+
+    async def test_short_page_finishes_without_another_request(self):
+        client = FakePagedClient(25)
+        scan = _scan()
+        assert len(await scan.next_batch(client, 30)) == 25
+        assert scan.done
+        assert client.offsets == [0, 10, 20]
+        await scan.aclose()
+
+    async def test_page_limit_finishes_scan(self):
+        client = FakePagedClient(1000)
+        scan = _scan(max_pages=2)
+        assert len(await scan.next_batch(client, 100)) == 20
+        assert scan.done
+
+    async def test_exact_multiple_ends_with_an_empty_batch(self):
+        client = FakePagedClient(20)
+        scan = _scan()
+        assert len(await scan.next_batch(client, 20)) == 20
+        assert not scan.done
+        assert await scan.next_batch(client, 20) == []
+        assert scan.done
+
+    async def test_deadline_returns_buffered_items_and_resumes(self):
+        client = FakePagedClient(1000, delays={10: 1.0})
+        scan = _scan()
+        with call_deadline(0.1):
+            batch = await scan.next_batch(client, 15)
+        assert [item["id"] for item in batch] == list(range(10))
+        assert scan.interrupted
+        assert not scan.done
+        client.delays = {}
+        batch = await scan.next_batch(client, 10)
+        assert [item["id"] for item in batch] == list(range(10, 20))
+        assert not scan.interrupted
+        # The page cut off by the deadline is requested again
+        assert client.offsets == [0, 10, 10]
+        await scan.aclose()
+
+    async def test_each_call_uses_its_own_client(self):
+        first, second = FakePagedClient(1000), FakePagedClient(1000)
+        scan = _scan()
+        await scan.next_batch(first, 10)
+        await scan.next_batch(second, 10)
+        assert first.offsets == [0]
+        assert second.offsets == [10]
+        await scan.aclose()
+
+
+class TestCursorRegistry:
+    async def test_cursors_are_single_use(self):
+        registry = CursorRegistry()
+        scan = _scan()
+        token = await registry.put(scan)
+        assert token.startswith("cur_")
+        assert await registry.take(token) is scan
+        with pytest.raises(KeyError):
+            await registry.take(token)
+
+    async def test_scans_are_scoped_to_owner(self):
+        registry = CursorRegistry()
+        token = await registry.put(_scan(), owner="alice")
+        with pytest.raises(KeyError):
+            await registry.take(token, "bob")
+        assert await registry.take(token, "alice")
+
+    async def test_overflow_closes_oldest(self):
+        client = FakePagedClient(1000)
+        registry = CursorRegistry(max_scans=1)
+        oldest = _scan()
+        await oldest.next_batch(client, 5)
+        first = await registry.put(oldest)
+        second = await registry.put(_scan())
+        assert len(registry) == 1
+        with pytest.raises(KeyError):
+            await registry.take(first)
+        with pytest.raises(StopAsyncIteration):
+            await oldest._pages.__anext__()  # closed
+        assert await registry.take(second)
+
+    async def test_idle_scans_expire(self, clock):
+        registry = CursorRegistry(idle_seconds=60, clock=clock)
+        stale = await registry.put(_scan())
+        clock.now = 30
+        fresh = await registry.put(_scan())
+        clock.now = 60
+        with pytest.raises(KeyError):
+            await registry.take(stale)
+        assert await registry.take(fresh)
+
+    async def test_close(self):
+        registry = CursorRegistry()
+        await registry.put(_scan())
+        await registry.close()
+        assert len(registry) == 0
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_MCP_CURSOR_MAX_SCANS", "3")
+        monkeypatch.setenv("KAITEN_MCP_CURSOR_IDLE_SECONDS", "12")
+        registry = CursorRegistry.from_env()
+        assert (registry.max_scans, registry.idle_seconds) == (3, 12.0)
+        assert get_cursor_registry() is get_cursor_registry()
+
+
+class TestCursorPage:
+    async def test_batches_until_done(self):
+        client = FakePagedClient(25)
+        args = {"batch_size": 10, "fields": "id", "format": "columns"}
+        first = await cursor_page(
+            client, args, "/cards", None, page_size=10, max_pages=50, compact=False
+        )
+        assert first["items"]["columns"] == {"id": list(range(10))}
+        assert first["returned_total"] == 10
+
+        ids = []
+        cursor = first["next_cursor"]
+        while cursor:
+            # Later calls keep the options of the first one
+            page = await cursor_page(
+                client,
+                {"cursor": cursor},
+                "/cards",
+                None,
+                page_size=10,
+                max_pages=50,
+                compact=True,
+            )
+            ids.extend(page["items"]["columns"]["id"])
+            cursor = page["next_cursor"]
+        assert ids == list(range(10, 25))
+        assert client.offsets == [0, 10, 20]
+        assert len(get_cursor_registry()) == 0
+
+    async def test_text_format(self):
+        page = await cursor_page(
+            FakePagedClient(3),
+            {"batch_size": 5, "format": "ndjson"},
+            "/cards",
+            None,
+            page_size=10,
+            max_pages=5,
+            compact=False,
+        )
+        assert page["items"].splitlines() == ['{"id":0}', '{"id":1}', '{"id":2}']
+        assert page["next_cursor"] is None
+
+    async def test_unknown_cursor(self):
+        with pytest.raises(ValueError, match="Unknown or expired cursor"):
+            await cursor_page(
+                FakePagedClient(3),
+                {"cursor": "cur_x"},
+                "/cards",
+                None,
+                page_size=10,
+                max_pages=5,
+                compact=False,
+            )
+
+    async def test_deadline_returns_partial_batch_with_cursor(self):
+        client = DeadlineOnceClient(25, offset=10)
+        with call_deadline(60):
+            first = await cursor_page(
+                client,
+                {"batch_size": 15},
+                "/cards",
+                None,
+                page_size=10,
+                max_pages=50,
+                compact=False,
+            )
+        assert [item["id"] for item in first["items"]] == list(range(10))
+        assert first["incomplete"] is True
+        assert first["truncated"] == {"reason": "deadline", "returned": 10}
+        rest = await cursor_page(
+            client,
+            {"cursor": first["next_cursor"]},
+            "/cards",
+            None,
+            page_size=10,
+            max_pages=50,
+            compact=False,
+        )
+        assert [item["id"] for item in rest["items"]] == list(range(10, 25))
+        assert "incomplete" not in rest
+        assert rest["next_cursor"] is None
+
+    async def test_error_closes_scan(self):
+        client = FakePagedClient(100)
+        client.fail_at = 10
+        with pytest.raises(RuntimeError):
+            await cursor_page(
+                client,
+                {"batch_size": 15},
+                "/cards",
+                None,
+                page_size=10,
+                max_pages=5,
+                compact=False,
+            )
+        assert len(get_cursor_registry()) == 0
+
+
+async def _fetch(client, budget, **kwargs):
+    return await fetch_pages(client, "/cards", page_size=10, max_pages=50, budget=budget, **kwargs)
+
+
+class TestFetchPages:
+    async def test_unlimited_matches_fetch_all_pages(self):
+        fetched = await _fetch(FakePagedClient(35), PageBudget())
+        assert [item["id"] for item in fetched.items] == list(range(35))
+        assert fetched.truncated_by is None
+
+    async def test_max_items_stops_mid_page(self):
+        fetched = await _fetch(FakePagedClient(100), PageBudget(max_items=15))
+        assert len(fetched.items) == 15
+        assert (fetched.truncated_by, fetched.resume_offset) == ("max_items", 15)
+
+    async def test_max_items_at_full_page_boundary_is_truncated(self):
+        fetched = await _fetch(FakePagedClient(100), PageBudget(max_items=20), start_offset=30)
+        assert fetched.items[0]["id"] == 30
+        assert (fetched.truncated_by, fetched.resume_offset) == ("max_items", 50)
+
+    # A short last page proves the data ended; a full one cannot
+    @pytest.mark.parametrize(("total", "truncated_by"), [(15, None), (20, "max_items")])
+    async def test_max_items_reached_on_the_last_page(self, total, truncated_by):
+        fetched = await _fetch(FakePagedClient(total), PageBudget(max_items=total))
+        assert len(fetched.items) == total
+        assert fetched.truncated_by == truncated_by
+
+    async def test_max_bytes_stops_at_the_item_that_would_exceed_it(self):
+        fetched = await _fetch(SizedPagedClient(100, item_bytes=100), PageBudget(max_bytes=1650))
+        assert len(fetched.items) == 16
+        assert (fetched.truncated_by, fetched.resume_offset) == ("max_bytes", 16)
+
+    async def test_max_bytes_without_body_size_serializes_the_page(self):
+        # The first page encodes as '[{"id":0},...,{"id":9}]', 91 bytes or 9.1 per item
+        fetched = await _fetch(FakePagedClient(100), PageBudget(max_bytes=64))
+        assert len(fetched.items) == 7
+        assert fetched.truncated_by == "max_bytes"
+
+    async def test_max_bytes_and_max_items_report_the_tighter_limit(self):
+        client = SizedPagedClient(100, item_bytes=100)
+        fetched = await _fetch(client, PageBudget(max_items=5, max_bytes=800))
+        assert (len(fetched.items), fetched.truncated_by) == (5, "max_items")
+        fetched = await _fetch(client, PageBudget(max_items=9, max_bytes=800))
+        assert (len(fetched.items), fetched.truncated_by) == (8, "max_bytes")
+
+    async def test_deadline_cancels_requests_in_flight(self):
+        client = FakePagedClient(1000, delays={20: 1.0})
+        started = time.monotonic()
+        fetched = await _fetch(client, PageBudget(deadline=time.monotonic() + 0.1))
+        assert time.monotonic() - started < 0.5
+        assert [item["id"] for item in fetched.items] == list(range(20))
+        assert (fetched.truncated_by, fetched.resume_offset) == ("deadline", 20)
+        assert client.in_flight == 0
+
+    async def test_client_deadline_returns_pages_so_far(self):
+        client = FakePagedClient(100)
+        original_get = client.get
+
+        async def get(path, params=None):
+            if params["offset"] >= 30:
+                raise DeadlineExceeded()
+            return await original_get(path, params)
+
+        client.get = get
+        fetched = await _fetch(client, PageBudget(), concurrency=1)
+        assert [item["id"] for item in fetched.items] == list(range(30))
+        assert (fetched.truncated_by, fetched.resume_offset) == ("deadline", 30)
+
+    async def test_expired_deadline_fetches_nothing(self):
+        client = FakePagedClient(100)
+        fetched = await _fetch(client, PageBudget(deadline=time.monotonic() - 1))
+        assert fetched.items == []
+        assert fetched.truncated_by == "deadline"
+        assert client.offsets == []
+
+
+class TestPageBudget:
+    def test_from_args(self, monkeypatch):
+        monkeypatch.delenv("KAITEN_MCP_BULK_MAX_BYTES", raising=False)
+        budget = PageBudget.from_args({"max_items": 5, "deadline_seconds": 10})
+        assert budget.max_items == 5
+        assert budget.max_bytes == 32 * 1024 * 1024
+        assert 9 < budget.deadline - time.monotonic() <= 10
+
+    def test_call_deadline_applies_when_earlier(self):
+        with call_deadline(2):
+            assert PageBudget.from_args({}).deadline == pytest.approx(time.monotonic() + 2, abs=1)
+            tighter = PageBudget.from_args({"deadline_seconds": 0.5})
+            assert tighter.deadline - time.monotonic() <= 0.5
+
+    def test_server_default_can_be_lifted(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_MCP_BULK_MAX_BYTES", "0")
+        assert PageBudget.from_args({}) == PageBudget()
+        assert PageBudget.from_args({"max_bytes": 100}).max_bytes == 100
+
+
+class TestFetchedPagesWrap:
+    def test_complete_result_is_unchanged(self):
+        data = [{"id": 1}]
+        assert FetchedPages(data).wrap(data) is data
+
+    def test_truncation_marker(self):
+        fetched = FetchedPages([{"id": 1}], "max_bytes", 11)
+        assert fetched.wrap(format_result(fetched.items, "ndjson")) == {
+            "items": '{"id":1}',
+            "incomplete": True,
+            "truncated": {"reason": "max_bytes", "returned": 1, "resume_offset": 11},
+        }
@@ -0,0 +1,110 @@
+"""Equivalence tests: ProjectionPlan against compact_response + select_fields + strip_base64."""
+
+import copy
+
+import pytest
+
+from kaiten_mcp.fake_kaiten import FakeKaitenConfig, FakeKaitenStore
+from kaiten_mcp.runtime import _serialize_result
+from kaiten_mcp.serialization import take_stripped
+from kaiten_mcp.tools.compact import (
+    ProjectionPlan,
+    compact_response,
+    project,
+    select_fields,
+    strip_base64,
+)
+
+AVATAR = "data:image/png;base64," + "A" * 3000
+USER = {"id": 5, "full_name": "Ann", "avatar_url": AVATAR, "email": "a@x"}
+
+_STORE = FakeKaitenStore(FakeKaitenConfig(spaces=2, cards=40, activity_per_space=30))
+
+DATASETS = {
+    "cards": _STORE.collections["/cards"],
+    "activity": _STORE.collections[f"/spaces/{_STORE.collections['/spaces'][0]['id']}/activity"],
+    "users": _STORE.collections["/users"],
+    "single_card": _STORE.collections["/cards"][0],
+    "edge_cases": [
+        {
+            "id": 1,
+            "description": "long text",
+            "avatar": AVATAR,
+            "avatar_url": "https://example.com/a.png",
+            "cover": AVATAR,
+            "owner": USER,
+            "author": {"email": "no-name@x", "photo": AVATAR},
+            "user": "not a dict",
+            "members": [USER, 7, {"username": "bob", "avatar": AVATAR}],
+            "owners": {"id": 3, "avatar_url": AVATAR},
+            "subscribers": "n/a",
+            "files": [AVATAR, "plain", [AVATAR, {"thumb": AVATAR}], 3, None],
+            "board": {"id": 2, "description": "x", "lanes": [{"avatar_url": AVATAR}], "meta": {}},
+            "tags": [],
+        },
+        [AVATAR, {"id": 2}],
+        "loose string",
+        {"id": 3, "owner": {"description": "kept under a simplified user"}},
+    ],
+    "empty": [],
+    "primitive": 42,
+}
+
+FIELD_SETS = [
+    None,
+    "",
+    "id,title",
+    "id, owner ,members,description,avatar,files,board",
+    "id,author",
+    "missing",
+]
+
+
+def _reference(data, compact, fields):
+    return strip_base64(select_fields(compact_response(data, compact), fields))
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("fields", FIELD_SETS)
+@pytest.mark.parametrize("name", list(DATASETS))
+def test_matches_separate_passes(name, compact, fields):
+    data = DATASETS[name]
+    before = copy.deepcopy(data)
+    expected, expected_stripped = _reference(data, compact, fields)
+
+    result = ProjectionPlan(fields, compact).apply(data)
+    stripped = take_stripped(result)
+
+    assert data == before
+    if stripped is None:  # identity and primitive plans leave stripping to the runtime
+        assert result is data
+        result, stripped = strip_base64(result)
+    assert result == expected
+    assert stripped == expected_stripped
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("fields", [None, "id,title,owner,members,avatar"])
+@pytest.mark.parametrize("size", [3, 400])  # pretty-printed and compact JSON
+def test_serialized_output_is_unchanged(compact, fields, size):
+    cards = [
+        {**card, "members": [USER], "cover": AVATAR}
+        for card in (_STORE.collections["/cards"] * 10)[:size]
+    ]
+    expected = _serialize_result("tool", select_fields(compact_response(cards, compact), fields))
+    assert _serialize_result("tool", project(cards, compact=compact, fields=fields)) == expected
+
+
+def test_plan_is_reusable():
+    plan = ProjectionPlan("id,cover", compact=True)
+    first = plan.apply([{"id": 1, "cover": AVATAR}])
+    assert take_stripped(first) == 1
+    second = plan.apply([{"id": 2}])
+    assert take_stripped(second) == 0
+    assert second == [{"id": 2}]
+
+
+def test_stale_mark_is_ignored():
+    marked = project([{"cover": AVATAR}], compact=True)
+    assert take_stripped([{"cover": "other"}]) is None
+    assert take_stripped(marked) is None  # the mark is taken once
@@ -0,0 +1,125 @@
+"""Layer 2 handler tests for stored result tools."""
+
+import pytest
+
+from kaiten_mcp.result_store import Unprojected, get_result_store
+from kaiten_mcp.tools.compact import FormattedText, project
+from kaiten_mcp.tools.results import TOOLS
+
+CARDS = [
+    {"id": i, "title": f"Card {i}", "state": i % 3 + 1, "owner": {"id": 40 + i % 2}}
+    for i in range(10)
+]
+
+
+@pytest.fixture
+def result_id():
+    return get_result_store().put(CARDS, "cards")
+
+
+@pytest.fixture
+def fetched_id():
+    """Handle of ``CARDS`` stored as fetched by a bulk call that kept only ``id``."""
+    fetched = Unprojected(CARDS, lambda data: project(data, fields="id"))
+    return get_result_store().put(fetched, "fetched cards")
+
+
+async def _call(name, args):
+    return await TOOLS[f"kaiten_result_{name}"]["handler"](None, args)
+
+
+class TestResultSlice:
+    async def test_first_page(self, result_id):
+        result = await _call("slice", {"result_id": result_id, "limit": 4})
+        assert result["total_items"] == 10
+        assert result["items"] == CARDS[:4]
+        assert result["next_offset"] == 4
+
+    async def test_last_page_with_fields(self, result_id):
+        result = await _call(
+            "slice", {"result_id": result_id, "offset": 8, "limit": 4, "fields": "id"}
+        )
+        assert result["items"] == [{"id": 8}, {"id": 9}]
+        assert result["offset"] == 8
+        assert result["next_offset"] is None
+
+    async def test_unknown_result(self):
+        with pytest.raises(ValueError, match="Unknown or expired result_id"):
+            await _call("slice", {"result_id": "res_nope"})
+
+    async def test_not_a_list(self):
+        handle = get_result_store().put({"id": 1}, "board")
+        with pytest.raises(ValueError, match="not a list"):
+            await _call("slice", {"result_id": handle})
+
+    async def test_store_disabled(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_MCP_RESULT_STORE", "0")
+        with pytest.raises(ValueError, match="disabled"):
+            await _call("slice", {"result_id": "res_x"})
+
+
+class TestResultFilter:
+    async def test_equality_and_any_of(self, result_id):
+        result = await _call("filter", {"result_id": result_id, "where": {"state": [1, 2]}})
+        assert [item["id"] for item in result["items"]] == [0, 1, 3, 4, 6, 7, 9]
+        assert result["total_matches"] == 7
+
+    async def test_dotted_path(self, result_id):
+        result = await _call(
+            "filter",
+            {"result_id": result_id, "where": {"owner.id": 41, "state": 2}, "fields": "id"},
+        )
+        assert result["items"] == [{"id": 1}, {"id": 7}]
+
+    @pytest.mark.parametrize("where", [{"missing": 1}, {"owner.id.x": 1}, {"missing": [1]}])
+    async def test_missing_fields_do_not_match(self, result_id, where):
+        result = await _call("filter", {"result_id": result_id, "where": where})
+        assert result["items"] == []
+        assert result["next_offset"] is None
+
+    @pytest.mark.parametrize("where", [{}, "state=1"])
+    async def test_invalid_where(self, result_id, where):
+        with pytest.raises(ValueError, match="where"):
+            await _call("filter", {"result_id": result_id, "where": where})
+
+
+class TestResultProject:
+    async def test_fields(self, result_id):
+        result = await _call("project", {"result_id": result_id, "fields": "id,state"})
+        assert result == [{"id": c["id"], "state": c["state"]} for c in CARDS]
+
+    async def test_format(self, result_id):
+        result = await _call("project", {"result_id": result_id, "format": "csv"})
+        assert isinstance(result, FormattedText)
+        assert result.text.splitlines()[0] == "id,title,state,owner"
+
+    async def test_dict_result(self):
+        handle = get_result_store().put({"id": 1, "description": "x"}, "board")
+        result = await _call("project", {"result_id": handle, "compact": True})
+        assert result == {"id": 1}
+
+
+class TestUnprojectedResult:
+    async def test_slice_keeps_the_original_fields(self, fetched_id):
+        result = await _call("slice", {"result_id": fetched_id, "limit": 2})
+        assert result["items"] == [{"id": 0}, {"id": 1}]
+
+    async def test_slice_fields_bring_back_dropped_fields(self, fetched_id):
+        result = await _call("slice", {"result_id": fetched_id, "limit": 1, "fields": "title"})
+        assert result["items"] == [{"title": "Card 0"}]
+
+    async def test_filter_matches_dropped_fields(self, fetched_id):
+        result = await _call("filter", {"result_id": fetched_id, "where": {"owner.id": 41}})
+        assert result["items"] == [{"id": i} for i in (1, 3, 5, 7, 9)]
+
+    async def test_project_restores_dropped_fields(self, fetched_id):
+        result = await _call("project", {"result_id": fetched_id, "fields": "id,title"})
+        assert result == [{"id": c["id"], "title": c["title"]} for c in CARDS]
+
+    async def test_project_without_fields_keeps_the_original_fields(self, fetched_id):
+        result = await _call("project", {"result_id": fetched_id, "format": "csv"})
+        assert result.text.splitlines()[:2] == ["id", "0"]
+
+    async def test_compact_false_restores_everything(self, fetched_id):
+        result = await _call("project", {"result_id": fetched_id, "compact": False})
+        assert result == CARDS
@@ -131,7 +131,7 @@ class TestFileBasedOutput:
             assert len(saved_data) == item_count
 
     async def test_no_file_output_without_env(self):
-        """Without KAITEN_MCP_OUTPUT_DIR, oversized responses are returned inline."""
+        """Without KAITEN_MCP_OUTPUT_DIR and the result store, oversized responses are inline."""
         from kaiten_mcp.server import FILE_OUTPUT_THRESHOLD
 
         item_count = (FILE_OUTPUT_THRESHOLD // 30) + 100
@@ -139,6 +139,7 @@ class TestFileBasedOutput:
         handler = AsyncMock(return_value=large_data)
         env = os.environ.copy()
         env.pop("KAITEN_MCP_OUTPUT_DIR", None)
+        env["KAITEN_MCP_RESULT_STORE"] = "0"
         with (
             patch.dict(
                 ALL_TOOLS,
@@ -184,6 +185,211 @@ class TestFileBasedOutput:
             assert isinstance(parsed, list)
             assert parsed == [{"id": 1}]
 
+    async def test_formatted_text_saved_with_its_extension(self):
+        """ndjson/csv results are saved as text files with the matching extension."""
+        from kaiten_mcp.server import FILE_OUTPUT_THRESHOLD
+        from kaiten_mcp.tools.compact import format_result
+
+        item_count = (FILE_OUTPUT_THRESHOLD // 20) + 100
+        rows = [{"id": i, "data": "x" * 20} for i in range(item_count)]
+        handler = AsyncMock(return_value=format_result(rows, "csv"))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with (
+                patch.dict(
+                    ALL_TOOLS,
+                    {
+                        "test_tool": {
+                            "handler": handler,
+                            "description": "t",
+                            "inputSchema": {"type": "object", "properties": {}},
+                        },
+                    },
+                ),
+                patch.dict(os.environ, {"KAITEN_MCP_OUTPUT_DIR": tmpdir}),
+            ):
+                result = await call_tool("test_tool", {})
+            summary = json.loads(_text(result))
+            assert summary["saved_to"].endswith(".csv")
+            assert summary["total_items"] == item_count
+            assert summary["sample"] == rows[:3]
+            with open(summary["saved_to"]) as f:  # noqa: ASYNC230
+                assert f.readline() == "id,data\n"
+
+    async def test_small_formatted_text_is_returned_inline(self):
+        """Small ndjson results are sent as text, with the base64 note."""
+        from kaiten_mcp.tools.compact import format_result
+
+        rows = [{"id": 1, "cover": "data:image/png;base64," + "A" * 2048}, {"id": 2}]
+        handler = AsyncMock(return_value=format_result(rows, "ndjson"))
+        with patch.dict(
+            ALL_TOOLS,
+            {
+                "test_tool": {
+                    "handler": handler,
+                    "description": "t",
+                    "inputSchema": {"type": "object", "properties": {}},
+                },
+            },
+        ):
+            result = await call_tool("test_tool", {})
+        text = _text(result)
+        lines = text.split("\n\n")[0].splitlines()
+        assert json.loads(lines[1]) == {"id": 2}
+        assert "[Omitted 1 base64-encoded field(s)" in text
+
+
+class TestResultStoreOutput:
+    """Oversized results are kept in the result store and returned as a handle."""
+
+    @staticmethod
+    def _tools(result):
+        return {
+            "test_tool": {
+                "handler": AsyncMock(return_value=result),
+                "description": "t",
+                "inputSchema": {"type": "object", "properties": {}},
+            },
+        }
+
+    @staticmethod
+    def _env():
+        env = os.environ.copy()
+        env.pop("KAITEN_MCP_OUTPUT_DIR", None)
+        env.pop("KAITEN_MCP_RESULT_STORE", None)
+        return env
+
+    async def test_handle_is_returned_and_sliceable(self):
+        from kaiten_mcp.server import FILE_OUTPUT_THRESHOLD
+
+        item_count = (FILE_OUTPUT_THRESHOLD // 30) + 100
+        large_data = [{"id": i, "data": "x" * 20} for i in range(item_count)]
+        with (
+            patch.dict(ALL_TOOLS, self._tools(large_data)),
+            patch.dict(os.environ, self._env(), clear=True),
+        ):
+            summary = json.loads(_text(await call_tool("test_tool", {})))
+            assert summary["result_id"].startswith("res_")
+            assert summary["total_items"] == item_count
+            assert summary["sample"] == large_data[:3]
+            assert "saved_to" not in summary
+
+            page = await call_tool(
+                "kaiten_result_slice",
+                {"result_id": summary["result_id"], "offset": 5, "limit": 2},
+            )
+        assert json.loads(_text(page))["items"] == large_data[5:7]
+
+    async def test_file_and_handle_together(self):
+        from kaiten_mcp.server import FILE_OUTPUT_THRESHOLD
+
+        large_data = [{"id": i, "data": "x" * 20} for i in range(FILE_OUTPUT_THRESHOLD // 20)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = {**self._env(), "KAITEN_MCP_OUTPUT_DIR": tmpdir}
+            with (
+                patch.dict(ALL_TOOLS, self._tools(large_data)),
+                patch.dict(os.environ, env, clear=True),
+            ):
+                summary = json.loads(_text(await call_tool("test_tool", {})))
+        assert summary["saved_to"].endswith(".json")
+        assert summary["result_id"].startswith("res_")
+        assert "kaiten_result_slice" in summary["tip"]
+
+    async def test_columns_layout_is_not_stored(self):
+        from kaiten_mcp.server import FILE_OUTPUT_THRESHOLD
+        from kaiten_mcp.tools.compact import format_result
+
+        rows = [{"id": i, "data": "x" * 20} for i in range(FILE_OUTPUT_THRESHOLD // 20)]
+        with (
+            patch.dict(ALL_TOOLS, self._tools(format_result(rows, "columns"))),
+            patch.dict(os.environ, self._env(), clear=True),
+        ):
+            parsed = json.loads(_text(await call_tool("test_tool", {})))
+        assert parsed["format"] == "columns"
+        assert len(parsed["columns"]["id"]) == len(rows)
+
+    async def test_truncated_bulk_result_keeps_marker_and_stores_items(self):
+        from kaiten_mcp.server import FILE_OUTPUT_THRESHOLD
+        from kaiten_mcp.tools.pagination import FetchedPages
+
+        items = [{"id": i, "data": "x" * 20} for i in range(FILE_OUTPUT_THRESHOLD // 20)]
+        result = FetchedPages(items, "max_items", len(items)).wrap(items)
+        with (
+            patch.dict(ALL_TOOLS, self._tools(result)),
+            patch.dict(os.environ, self._env(), clear=True),
+        ):
+            text = _text(await call_tool("test_tool", {}))
+            summary = json.loads(text)
+            page = await call_tool(
+                "kaiten_result_slice", {"result_id": summary["result_id"], "limit": 2}
+            )
+        assert len(text) < 2000
+        assert summary["total_items"] == len(items)
+        assert summary["sample"] == items[:3]
+        assert summary["incomplete"] is True
+        assert summary["truncated"] == result["truncated"]
+        assert json.loads(_text(page))["items"] == items[:2]
+
+    async def test_bulk_result_is_stored_as_fetched(self):
+        from kaiten_mcp.server import FILE_OUTPUT_THRESHOLD
+        from kaiten_mcp.tools.compact import project_fetched
+
+        cards = [{"id": i, "title": f"Card {i}"} for i in range(FILE_OUTPUT_THRESHOLD // 8)]
+        tools = self._tools(None)
+        tools["test_tool"]["handler"] = AsyncMock(
+            side_effect=lambda client, args: project_fetched(cards, fields="id")
+        )
+        with (
+            patch.dict(ALL_TOOLS, tools),
+            patch.dict(os.environ, self._env(), clear=True),
+        ):
+            summary = json.loads(_text(await call_tool("test_tool", {})))
+            assert summary["sample"] == [{"id": 0}, {"id": 1}, {"id": 2}]
+            handle = summary["result_id"]
+            page = await call_tool("kaiten_result_slice", {"result_id": handle, "limit": 2})
+            projected = await call_tool(
+                "kaiten_result_project", {"result_id": handle, "fields": "title"}
+            )
+        assert json.loads(_text(page))["items"] == [{"id": 0}, {"id": 1}]
+        restored = json.loads(_text(projected))["sample"]
+        assert restored == [{"title": "Card 0"}, {"title": "Card 1"}, {"title": "Card 2"}]
+
+    async def test_bulk_result_too_large_to_keep_as_fetched_is_stored_projected(self):
+        from kaiten_mcp.server import FILE_OUTPUT_THRESHOLD
+        from kaiten_mcp.tools.compact import project_fetched
+
+        cards = [{"id": i, "title": "x" * 100} for i in range(FILE_OUTPUT_THRESHOLD // 8)]
+        tools = self._tools(None)
+        tools["test_tool"]["handler"] = AsyncMock(
+            side_effect=lambda client, args: project_fetched(cards, fields="id")
+        )
+        env = {**self._env(), "KAITEN_MCP_RESULT_STORE_MAX_BYTES": str(FILE_OUTPUT_THRESHOLD * 2)}
+        with patch.dict(ALL_TOOLS, tools), patch.dict(os.environ, env, clear=True):
+            summary = json.loads(_text(await call_tool("test_tool", {})))
+            projected = await call_tool(
+                "kaiten_result_project", {"result_id": summary["result_id"], "fields": "title"}
+            )
+        assert json.loads(_text(projected)) == [{} for _ in cards]
+
+    async def test_interrupted_cursor_page_keeps_its_cursor(self):
+        from kaiten_mcp.server import FILE_OUTPUT_THRESHOLD
+
+        items = [{"id": i, "data": "x" * 20} for i in range(FILE_OUTPUT_THRESHOLD // 20)]
+        result = {
+            "items": items,
+            "returned_total": len(items),
+            "next_cursor": "cur_next",
+            "incomplete": True,
+            "truncated": {"reason": "deadline", "returned": len(items)},
+        }
+        with (
+            patch.dict(ALL_TOOLS, self._tools(result)),
+            patch.dict(os.environ, self._env(), clear=True),
+        ):
+            summary = json.loads(_text(await call_tool("test_tool", {})))
+        assert summary["next_cursor"] == "cur_next"
+        assert summary["returned_total"] == len(items)
+        assert summary["truncated"]["reason"] == "deadline"
+
 
 class TestBase64AutoStripping:
     """Test that base64 data URIs are automatically stripped from all tool responses."""
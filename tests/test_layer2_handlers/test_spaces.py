@@ -24,6 +24,15 @@ class TestListSpaces:
         assert "archived" in str(request.url)
         assert result == []
 
+    async def test_format(self, client, mock_api):
+        mock_api.get("/spaces").mock(
+            return_value=Response(200, json=[{"id": 1, "title": "One"}, {"id": 2}])
+        )
+        result = await TOOLS["kaiten_list_spaces"]["handler"](
+            client, {"compact": True, "format": "columns"}
+        )
+        assert result["columns"] == {"id": [1, 2], "title": ["One", None]}
+
 
 class TestGetSpace:
     async def test_required_only(self, client, mock_api):
@@ -0,0 +1,356 @@
+"""Tests for time-window partitioned bulk scans."""
+
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from httpx import Response
+
+from kaiten_mcp.client import KaitenClient
+from kaiten_mcp.fake_kaiten import FakeKaitenConfig, attach, create_fake_kaiten_app
+from kaiten_mcp.tools.audit_and_analytics import TOOLS as AUDIT_TOOLS
+from kaiten_mcp.tools.cards import TOOLS as CARD_TOOLS
+from kaiten_mcp.tools.compact import format_result
+from kaiten_mcp.tools.pagination import PageBudget, fetch_all_pages
+from kaiten_mcp.tools.windows import (
+    MIN_WINDOW,
+    WindowScan,
+    format_timestamp,
+    item_timestamps,
+    parse_timestamp,
+    scan_windows,
+    split_full_window,
+    split_range,
+    window_field,
+)
+
+# Fake Kaiten cards are created every 7 minutes from 2025-01-01
+RANGE = {"created_after": "2024-12-31T00:00:00Z", "created_before": "2025-02-01T00:00:00Z"}
+
+
+@pytest.fixture
+def fast_limiter(monkeypatch):
+    """Lift the client-side rate limit so scans of the fake API run at full speed."""
+    monkeypatch.setenv("KAITEN_RATE_LIMIT_RPS", "10000")
+    monkeypatch.setenv("KAITEN_RATE_LIMIT_BURST", "100")
+
+
+def _fake_client(cards: int) -> KaitenClient:
+    app = create_fake_kaiten_app(FakeKaitenConfig(cards=cards))
+    return attach(KaitenClient(base_url="http://fake.test", token="token"), app)
+
+
+class RecordingClient:
+    """Serve ``total`` items by offset, ignoring date filters, and record each request."""
+
+    def __init__(self, total: int, fail_after: str | None = None, slow_after: str | None = None):
+        self.total = total
+        self.fail_after = fail_after
+        self.slow_after = slow_after
+        self.burst_capacity = 4
+        self.requests: list[dict] = []
+        self.cancelled = 0
+
+    async def get(self, path, params=None):
+        self.requests.append(dict(params))
+        if self.fail_after is not None and params.get("created_after") == self.fail_after:
+            raise RuntimeError("window failed")
+        try:
+            slow = self.slow_after is not None and params.get("created_after") == self.slow_after
+            await asyncio.sleep(1.0 if slow else 0.01 if self.fail_after else 0)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        offset, limit = params["offset"], params["limit"]
+        return [{"id": i} for i in range(offset, min(offset + limit, self.total))]
+
+
+class DistinctWindowsClient(RecordingClient):
+    """Serve ``total`` items per window, with ids unique to the window and 100 bytes each."""
+
+    async def get_sized(self, path, params=None):
+        page = await self.get(path, params=params)
+        window = params["created_after"]
+        return [{"id": f"{window}/{item['id']}"} for item in page], 100 * len(page)
+
+
+class TestTimestamps:
+    def test_parse_assumes_utc(self):
+        assert parse_timestamp("2025-01-01") == datetime(2025, 1, 1, tzinfo=UTC)
+        assert parse_timestamp("2025-01-01T03:00:00+03:00") == datetime(2025, 1, 1, tzinfo=UTC)
+
+    def test_parse_rejects_garbage(self):
+        with pytest.raises(ValueError, match="Invalid ISO 8601"):
+            parse_timestamp("yesterday")
+
+    def test_format_matches_kaiten(self):
+        value = datetime(2025, 1, 1, 12, 30, 5, 123456, tzinfo=UTC)
+        assert format_timestamp(value) == "2025-01-01T12:30:05.123Z"
+
+    def test_window_field(self):
+        assert window_field({"created_after": "2025-01-01"}) == "created"
+        assert window_field({"updated_after": "2025-01-01"}) == "updated"
+        with pytest.raises(ValueError, match="created_after"):
+            window_field({"created_before": "2025-01-01"})
+
+    def test_item_timestamps(self):
+        items = [{"created": "2025-01-01"}, {"created": "2025-01-02T00:00:00Z"}]
+        assert item_timestamps(items, "created") == [
+            datetime(2025, 1, 1, tzinfo=UTC),
+            datetime(2025, 1, 2, tzinfo=UTC),
+        ]
+        assert item_timestamps([*items, {"id": 1}], "created") is None
+        assert item_timestamps([{"created": "soon"}], "created") is None
+
+    def test_split_range(self):
+        start = datetime(2025, 1, 1, tzinfo=UTC)
+        windows = split_range(start, start + timedelta(hours=4), 4)
+        assert [hi - lo for lo, hi in windows] == [timedelta(hours=1)] * 4
+        assert windows[0][0] == start
+        assert windows[-1][1] == start + timedelta(hours=4)
+        assert split_range(start, start + timedelta(hours=1), 0) == [
+            (start, start + timedelta(hours=1))
+        ]
+
+
+class TestSplitFullWindow:
+    LO = datetime(2025, 1, 1, tzinfo=UTC)
+    HI = LO + timedelta(hours=4)
+
+    def _at(self, *hours):
+        return [self.LO + timedelta(hours=hour) for hour in hours]
+
+    def test_ascending_items_continue_after_the_last_one(self):
+        (last,) = self._at(1)
+        covered, rest = split_full_window(self.LO, self.HI, self._at(0, 0.5, 1))
+        assert covered == (self.LO, last)
+        assert rest == split_range(last, self.HI, 2)
+
+    def test_descending_items_continue_before_the_last_one(self):
+        (last,) = self._at(3)
+        covered, rest = split_full_window(self.LO, self.HI, self._at(4, 3.5, 3))
+        assert covered == (last, self.HI)
+        assert rest == split_range(self.LO, last, 2)
+
+    def test_short_remainder_is_not_halved(self):
+        last = self.HI - MIN_WINDOW
+        _, rest = split_full_window(self.LO, self.HI, [self.LO, last])
+        assert rest == [(last, self.HI)]
+
+    def test_unsorted_items_split_at_their_median(self):
+        (median,) = self._at(3)
+        covered, rest = split_full_window(self.LO, self.HI, self._at(3.5, 1, 3))
+        assert covered == (self.LO, self.HI)
+        assert rest == [(self.LO, median), (median, self.HI)]
+
+    @pytest.mark.parametrize("stamps", [None, [], [LO, LO]])
+    def test_without_order_falls_back_to_the_midpoint(self, stamps):
+        middle = self.LO + timedelta(hours=2)
+        assert split_full_window(self.LO, self.HI, stamps)[1] == [
+            (self.LO, middle),
+            (middle, self.HI),
+        ]
+
+    def test_tiny_window_without_progress_is_paged_by_offset(self):
+        hi = self.LO + MIN_WINDOW
+        assert split_full_window(self.LO, hi, [self.LO, self.LO]) is None
+        assert split_full_window(self.LO, hi, [hi, self.LO, hi]) is None
+
+
+class TestScanWindows:
+    async def test_matches_offset_scan(self, fast_limiter):
+        client = _fake_client(cards=600)
+        expected = await fetch_all_pages(
+            client, "/cards", dict(RANGE), page_size=50, max_pages=100
+        )
+        requests = client.stats()["get_requests"]
+        # Two windows of 300 cards each fill 2 pages and move on past their last card
+        result = await scan_windows(
+            client, "/cards", dict(RANGE), page_size=50, max_pages=100, windows=2, split_pages=2
+        )
+        await client.close()
+        assert len(expected) == 600
+        assert [card["id"] for card in result.items] == [card["id"] for card in expected]
+        assert result.pending == []
+        # Pages already fetched are kept, not requested again after a split
+        assert client.stats()["get_requests"] - requests <= 2 * 12
+
+    async def test_newest_first_activity_matches_offset_scan(self, fast_limiter):
+        client = _fake_client(cards=0)
+        path = f"/spaces/{(await client.get('/spaces'))[0]['id']}/activity"
+        expected = await fetch_all_pages(client, path, dict(RANGE), page_size=50, max_pages=100)
+        requests = client.stats()["get_requests"]
+        result = await scan_windows(
+            client, path, dict(RANGE), page_size=50, max_pages=100, windows=1, split_pages=2
+        )
+        await client.close()
+        assert len(expected) == 300
+        assert sorted(event["id"] for event in result.items) == sorted(
+            event["id"] for event in expected
+        )
+        assert client.stats()["get_requests"] - requests <= 2 * 6
+
+    async def test_outer_edges_keep_caller_bounds(self):
+        client = RecordingClient(total=0)
+        params = {"created_after": "2025-01-01T00:00:00Z", "created_before": "2025-01-02"}
+        await scan_windows(client, "/cards", params, page_size=10, max_pages=5, windows=2)
+        first, second = sorted(client.requests, key=lambda request: request["created_after"])
+        assert first["created_after"] == "2025-01-01T00:00:00Z"
+        assert first["created_before"] == "2025-01-01T12:00:00.001Z"
+        assert second["created_after"] == "2025-01-01T11:59:59.999Z"
+        assert second["created_before"] == "2025-01-02"
+
+    async def test_open_range_ends_now(self):
+        client = RecordingClient(total=0)
+        since = format_timestamp(datetime.now(UTC) - timedelta(days=1))
+        await scan_windows(
+            client, "/cards", {"updated_after": since}, page_size=10, max_pages=5, windows=1
+        )
+        (request,) = client.requests
+        assert request["updated_after"] == since
+        assert parse_timestamp(request["updated_before"]) <= datetime.now(UTC)
+
+    async def test_empty_range(self):
+        client = RecordingClient(total=5)
+        params = {"created_after": "2025-01-02", "created_before": "2025-01-01"}
+        result = await scan_windows(client, "/cards", params, page_size=10, max_pages=5)
+        assert result.items == []
+        assert client.requests == []
+
+    async def test_duplicates_at_edges_are_dropped(self):
+        # Every window returns the same items, as an item on a shared edge would
+        client = RecordingClient(total=7)
+        result = await scan_windows(
+            client, "/cards", dict(RANGE), page_size=10, max_pages=5, windows=4
+        )
+        assert len(client.requests) == 4
+        assert [item["id"] for item in result.items] == list(range(7))
+
+    async def test_tiny_full_window_falls_back_to_offset_paging(self):
+        client = RecordingClient(total=30)
+        params = {
+            "created_after": "2025-01-01T00:00:00Z",
+            "created_before": "2025-01-01T00:00:02Z",
+        }
+        result = await scan_windows(
+            client, "/cards", params, page_size=10, max_pages=9, windows=1, split_pages=1
+        )
+        assert [item["id"] for item in result.items] == list(range(30))
+        offsets = sorted(request["offset"] for request in client.requests)
+        # The 2s window, then both 1s halves paged on from offset 10 to the end
+        assert offsets == [0, 0, 0, 10, 10, 20, 20, 30, 30]
+
+    async def test_failure_cancels_other_windows(self):
+        client = RecordingClient(total=5, fail_after="2025-01-01T11:59:59.999Z")
+        params = {"created_after": "2025-01-01T00:00:00Z", "created_before": "2025-01-02"}
+        with pytest.raises(RuntimeError, match="window failed"):
+            await scan_windows(client, "/cards", params, page_size=10, max_pages=5, windows=2)
+        assert client.cancelled == 1
+
+    async def test_deadline_returns_finished_windows(self):
+        client = RecordingClient(total=3, slow_after="2025-01-01T11:59:59.999Z")
+        params = {"created_after": "2025-01-01T00:00:00Z", "created_before": "2025-01-02"}
+        result = await scan_windows(
+            client,
+            "/cards",
+            params,
+            page_size=10,
+            max_pages=5,
+            windows=2,
+            budget=PageBudget(deadline=time.monotonic() + 0.1),
+        )
+        assert [item["id"] for item in result.items] == [0, 1, 2]
+        assert result.pending == [
+            {"created_after": "2025-01-01T11:59:59.999Z", "created_before": "2025-01-02"}
+        ]
+        assert result.wrap(format_result(result.items, "ndjson")) == {
+            "items": '{"id":0}\n{"id":1}\n{"id":2}',
+            "incomplete": True,
+            "truncated": {"reason": "deadline", "returned": 3, "resume_windows": result.pending},
+        }
+
+    async def test_max_pages_counts_every_window(self):
+        client = RecordingClient(total=30)
+        params = {"created_after": "2025-01-01T00:00:00Z", "created_before": "2025-01-03"}
+        result = await scan_windows(
+            client, "/cards", params, page_size=10, max_pages=5, windows=2, concurrency=1
+        )
+        assert len(client.requests) == 5
+        assert result.truncated_by == "max_pages"
+        # The first window is done; the second one is cut short and pending
+        assert result.pending == [
+            {"created_after": "2025-01-01T23:59:59.999Z", "created_before": "2025-01-03"}
+        ]
+        assert [item["id"] for item in result.items] == list(range(30))
+
+    @pytest.mark.parametrize(
+        ("budget", "reason", "returned"),
+        [
+            (PageBudget(max_items=25), "max_items", 25),
+            (PageBudget(max_bytes=2250), "max_bytes", 22),
+        ],
+    )
+    async def test_budget_is_shared_by_all_windows(self, budget, reason, returned):
+        client = DistinctWindowsClient(total=15)
+        result = await scan_windows(
+            client,
+            "/cards",
+            dict(RANGE),
+            page_size=10,
+            max_pages=50,
+            windows=4,
+            concurrency=1,
+            budget=budget,
+        )
+        # The first window holds 15 items, the second one is cut short
+        assert len(result.items) == returned
+        assert len(result.pending) == 3
+        assert result.wrap(result.items)["truncated"]["reason"] == reason
+
+    async def test_complete_scan_is_not_wrapped(self):
+        result = WindowScan([{"id": 1}])
+        assert result.wrap(result.items) is result.items
+
+
+class TestWindowedTools:
+    async def test_list_all_cards(self, fast_limiter):
+        client = _fake_client(cards=300)
+        result = await CARD_TOOLS["kaiten_list_all_cards"]["handler"](
+            client,
+            {
+                **RANGE,
+                "scan_mode": "windows",
+                "windows": 3,
+                "window_split_pages": 1,
+                "page_size": 50,
+                "fields": "id",
+            },
+        )
+        await client.close()
+        assert result == [{"id": card_id} for card_id in sorted(c["id"] for c in result)]
+        assert len(result) == 300
+
+    async def test_list_all_cards_needs_a_range(self, client, mock_api):
+        route = mock_api.get("/cards").mock(return_value=Response(200, json=[]))
+        with pytest.raises(ValueError, match="created_after"):
+            await CARD_TOOLS["kaiten_list_all_cards"]["handler"](client, {"scan_mode": "windows"})
+        assert not route.called
+
+    async def test_all_space_activity(self, client, mock_api):
+        route = mock_api.get("/spaces/1/activity").mock(
+            return_value=Response(200, json=[{"id": 1, "action": "card_add"}])
+        )
+        result = await AUDIT_TOOLS["kaiten_get_all_space_activity"]["handler"](
+            client,
+            {
+                "space_id": 1,
+                "created_after": "2025-01-01",
+                "created_before": "2025-01-02",
+                "scan_mode": "windows",
+                "windows": 2,
+                "format": "columns",
+            },
+        )
+        assert route.call_count == 2
+        assert result["columns"] == {"id": [1], "action": ["card_add"]}
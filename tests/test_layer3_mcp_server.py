@@ -1,13 +1,17 @@
 """Layer 3: MCP server integration tests for call_tool and list_tools."""
 
+import asyncio
 import json
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 import respx
 from mcp.types import CallToolResult, TextContent, Tool
 
+from kaiten_mcp import metrics
 from kaiten_mcp.client import KaitenApiError, KaitenClient
+from kaiten_mcp.deadline import remaining_seconds
 from kaiten_mcp.server import ALL_TOOLS, call_tool, get_client, list_tools
 
 BASE_URL = "https://test-company.kaiten.ru/api/latest"
@@ -193,6 +197,22 @@ async def test_call_tool_key_error():
     assert result.isError is True
 
 
+async def test_call_tool_records_duration_and_response_size():
+    tool_name = "kaiten_get_space"
+    ok_before = metrics.TOOL_CALL_DURATION.count(tool=tool_name, outcome="ok")
+    error_before = metrics.TOOL_CALL_DURATION.count(tool=tool_name, outcome="error")
+    bytes_before = metrics.TOOL_RESPONSE_BYTES.sum(tool=tool_name)
+    handler = AsyncMock(side_effect=[{"id": 1}, KaitenApiError(404, "Not found")])
+    with patch.dict(ALL_TOOLS, {tool_name: {**ALL_TOOLS[tool_name], "handler": handler}}):
+        ok = await call_tool(tool_name, {"space_id": 1})
+        await call_tool(tool_name, {"space_id": 2})
+    await call_tool("no_such_tool", {})
+    assert metrics.TOOL_CALL_DURATION.count(tool=tool_name, outcome="ok") == ok_before + 1
+    assert metrics.TOOL_CALL_DURATION.count(tool=tool_name, outcome="error") == error_before + 1
+    assert metrics.TOOL_RESPONSE_BYTES.sum(tool=tool_name) == bytes_before + len(_text(ok))
+    assert metrics.TOOL_CALL_DURATION.count(tool="no_such_tool", outcome="error") == 0
+
+
 # ── 8. list_tools returns correct count ─────────────────────────────────────
 
 
@@ -343,3 +363,57 @@ async def test_call_tool_with_respx(
     assert route.called
     parsed = json.loads(_text(result))
     assert parsed == response_json
+
+
+# ── 11. Call deadline ───────────────────────────────────────────────────────
+
+
+async def test_call_tool_sets_deadline_from_argument_and_env(monkeypatch):
+    tool_name = "kaiten_list_all_cards"
+    seen = []
+
+    async def handler(client, args):
+        seen.append(remaining_seconds())
+        return []
+
+    with patch.dict(ALL_TOOLS, {tool_name: {**ALL_TOOLS[tool_name], "handler": handler}}):
+        await call_tool(tool_name, {})
+        monkeypatch.setenv("KAITEN_MCP_CALL_DEADLINE_SECONDS", "30")
+        await call_tool(tool_name, {})
+        await call_tool(tool_name, {"deadline_seconds": 5})
+    assert seen[0] is None
+    assert 29 < seen[1] <= 30
+    assert 4 < seen[2] <= 5
+
+
+@respx.mock
+async def test_call_tool_bulk_deadline_returns_partial_result(monkeypatch):
+    monkeypatch.setenv("KAITEN_MCP_CALL_DEADLINE_SECONDS", "0.2")
+
+    async def respond(request):
+        offset = int(request.url.params["offset"])
+        if offset >= 100:
+            await asyncio.sleep(2)
+        return httpx.Response(200, json=[{"id": offset + i} for i in range(100)])
+
+    respx.get(f"{BASE_URL}/cards").mock(side_effect=respond)
+    result = await call_tool("kaiten_list_all_cards", {"fields": "id"})
+    assert result.isError is False
+    parsed = json.loads(_text(result))
+    assert parsed["incomplete"] is True
+    assert parsed["truncated"] == {"reason": "deadline", "returned": 100, "resume_offset": 100}
+    assert parsed["items"] == [{"id": i} for i in range(100)]
+
+
+@respx.mock
+async def test_call_tool_single_request_deadline_is_an_error(monkeypatch):
+    monkeypatch.setenv("KAITEN_MCP_CALL_DEADLINE_SECONDS", "0.05")
+
+    async def respond(request):
+        await asyncio.sleep(2)
+        return httpx.Response(200, json={"id": 1})
+
+    respx.get(f"{BASE_URL}/spaces/1").mock(side_effect=respond)
+    result = await call_tool("kaiten_get_space", {"space_id": 1})
+    assert result.isError is True
+    assert _text(result).startswith("Kaiten API Error 504: Call deadline exceeded")
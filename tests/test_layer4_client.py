@@ -1,17 +1,25 @@
 """Tests for KaitenClient - Layer 4 (HTTP transport)."""
 
 import asyncio
+import time
 
 import httpx
 import pytest
 import respx
 
+from kaiten_mcp import metrics
+from kaiten_mcp.cache import ResponseCache
 from kaiten_mcp.client import (
     RATE_LIMIT_DELAY,
+    CircuitOpenError,
+    DeadlineExceeded,
     KaitenApiError,
     KaitenClient,
     build_api_base_url,
 )
+from kaiten_mcp.deadline import call_deadline
+from kaiten_mcp.ratelimit import RateLimiter
+from kaiten_mcp.resilience import get_upstream_guard
 
 DOMAIN = "test-company"
 TOKEN = "test-token-12345"
@@ -24,6 +32,13 @@ STAND_BASE = "https://kaiten.kaiten-stand-b.ru/api/latest"
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(autouse=True)
+def _fast_backoff(monkeypatch):
+    """Shrink retry backoff so retry tests do not sleep for seconds."""
+    monkeypatch.setattr("kaiten_mcp.client.RETRY_DELAY", 0.01)
+    monkeypatch.setattr("kaiten_mcp.client.MAX_RETRY_DELAY", 0.05)
+
+
 @pytest.fixture
 def client():
     """Return a KaitenClient with rate-limit delay neutralised."""
@@ -311,6 +326,60 @@ class TestRetry429:
         assert route.call_count == 2
 
 
+class TestAdaptiveRate:
+    @respx.mock
+    async def test_throttling_lowers_reported_rate(self, client):
+        route = respx.get(f"{BASE}/cards")
+        route.side_effect = [
+            httpx.Response(429, text="rate limited", headers={"Retry-After": "0"}),
+            httpx.Response(200, json=[]),
+        ]
+        await client.get("/cards")
+        # Halved on 429, then one success adds a little back
+        assert 2.25 < client.stats()["rate_limit_rps"] < 2.5
+
+    @respx.mock
+    async def test_advertised_policy_raises_ceiling(self, client):
+        respx.get(f"{BASE}/cards").respond(json=[], headers={"RateLimit-Policy": "20;w=1"})
+        for _ in range(5):
+            await client.get("/cards")
+        assert client._rate_limiter.max_rate == 18.0
+        assert client.stats()["rate_limit_rps"] > 4.5
+
+
+class TestMetrics:
+    @respx.mock
+    async def test_upstream_attempts_are_measured_by_template(self, client):
+        labels = {"method": "GET", "path": "/cards/{id}", "status": "200"}
+        before = metrics.UPSTREAM_DURATION.count(**labels)
+        throttled = metrics.UPSTREAM_THROTTLED.value()
+        retries = metrics.UPSTREAM_RETRIES.value(reason="throttled")
+        respx.get(f"{BASE}/cards/42").mock(
+            side_effect=[httpx.Response(429), httpx.Response(200, json={})]
+        )
+        await client.get("/cards/42")
+        assert metrics.UPSTREAM_DURATION.count(**labels) == before + 1
+        assert metrics.UPSTREAM_THROTTLED.value() == throttled + 1
+        assert metrics.UPSTREAM_RETRIES.value(reason="throttled") == retries + 1
+
+    @respx.mock
+    async def test_connection_errors_and_cache_lookups(self, client):
+        errors = metrics.UPSTREAM_DURATION.count(method="GET", path="/spaces", status="error")
+        retries = metrics.UPSTREAM_RETRIES.value(reason="connection")
+        hits = metrics.CACHE_LOOKUPS.value(result="hit")
+        respx.get(f"{BASE}/spaces").mock(
+            side_effect=[httpx.ConnectError("refused"), httpx.Response(200, json=[])]
+        )
+        await client.get("/spaces")
+        await client.get("/spaces")
+        assert (
+            metrics.UPSTREAM_DURATION.count(method="GET", path="/spaces", status="error")
+            == errors + 1
+        )
+        assert metrics.UPSTREAM_RETRIES.value(reason="connection") == retries + 1
+        assert metrics.CACHE_LOOKUPS.value(result="hit") == hits + 1
+
+
 # ---------------------------------------------------------------------------
 # Connection errors (httpx.HTTPError)
 # ---------------------------------------------------------------------------
@@ -337,6 +406,73 @@ class TestConnectionErrors:
         assert route.call_count == 2
 
 
+# ---------------------------------------------------------------------------
+# Retry budget and circuit breaker
+# ---------------------------------------------------------------------------
+
+
+class TestResilience:
+    @respx.mock
+    async def test_retry_budget_stops_retry_storm(self, client):
+        guard = get_upstream_guard(client.base_url)
+        guard.budget._balance = 1.0
+        route = respx.get(f"{BASE}/cards").respond(429, text="rate limited")
+        with pytest.raises(KaitenApiError) as exc_info:
+            await client.get("/cards")
+        assert exc_info.value.status_code == 429
+        # One retry from the budget instead of MAX_RETRIES attempts
+        assert route.call_count == 2
+        assert guard.budget.exhausted == 1
+
+    @respx.mock
+    async def test_connection_error_not_retried_without_budget(self, client):
+        get_upstream_guard(client.base_url).budget._balance = 0.0
+        route = respx.get(f"{BASE}/me").mock(side_effect=httpx.ConnectError("refused"))
+        with pytest.raises(KaitenApiError, match="Connection error"):
+            await client.get("/me")
+        assert route.call_count == 1
+
+    @respx.mock
+    async def test_sustained_failures_open_circuit(self, client):
+        route = respx.get(f"{BASE}/cards").respond(502, text="bad gateway")
+        for _ in range(5):
+            with pytest.raises(KaitenApiError):
+                await client.get("/cards")
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await client.get("/cards")
+        assert exc_info.value.status_code == 503
+        assert "circuit breaker open" in exc_info.value.message
+        assert route.call_count == 5
+
+    @respx.mock
+    async def test_half_open_circuit_says_it_is_probing(self, client):
+        breaker = get_upstream_guard(client.base_url).breaker
+        breaker._state = "half_open"
+        breaker._probe_started_at = time.monotonic()
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await client.get("/cards")
+        assert exc_info.value.probing
+        assert "probe request" in exc_info.value.message
+        assert "paused for 0s" not in exc_info.value.message
+        assert 29 < exc_info.value.retry_after <= 30
+
+    @respx.mock
+    async def test_client_errors_keep_circuit_closed(self, client):
+        respx.get(f"{BASE}/cards/1").respond(404, json={"message": "Not found"})
+        for _ in range(6):
+            with pytest.raises(KaitenApiError):
+                await client.get("/cards/1")
+        assert get_upstream_guard(client.base_url).breaker.state == "closed"
+
+    @respx.mock
+    async def test_circuit_is_shared_by_clients_of_one_host(self, client):
+        get_upstream_guard(client.base_url).breaker._state = "open"
+        get_upstream_guard(client.base_url).breaker._opened_at = float("inf")
+        other = KaitenClient(domain=DOMAIN, token="another-token")
+        with pytest.raises(CircuitOpenError):
+            await other.get("/cards")
+
+
 # ---------------------------------------------------------------------------
 # Rate limiting
 # ---------------------------------------------------------------------------
@@ -357,29 +493,356 @@ class TestRateLimit:
         assert t2 >= t1
 
     @respx.mock
-    async def test_rate_lock_serializes_concurrent_requests(self, client):
+    async def test_concurrent_requests_share_the_bucket(self, client):
         respx.get(f"{BASE}/me").respond(json={})
-        # Run two concurrent requests; the lock should serialize them
         results = await asyncio.gather(client.get("/me"), client.get("/me"))
         assert all(r == {} for r in results)
-        # Both should complete; the lock prevents race conditions
         assert client._last_request_time > 0
 
     @respx.mock
-    async def test_rate_limit_delays_rapid_requests(self, client):
+    async def test_rate_limit_delays_rapid_requests(self):
         respx.get(f"{BASE}/me").respond(json={})
-        # Make the first request to set a recent _last_request_time
+        limiter = RateLimiter("spacing", rate=1 / RATE_LIMIT_DELAY, burst=1)
+        client = KaitenClient(domain=DOMAIN, token=TOKEN, rate_limiter=limiter)
+        # The first request spends the only burst token
         await client.get("/me")
-        # Set _last_request_time to "now" so next request must wait
-        loop = asyncio.get_running_loop()
-        client._last_request_time = loop.time()
 
+        loop = asyncio.get_running_loop()
         start = loop.time()
         await client.get("/me")
         elapsed = loop.time() - start
         # Should have waited approximately RATE_LIMIT_DELAY
         assert elapsed >= RATE_LIMIT_DELAY * 0.8
 
+    @respx.mock
+    async def test_burst_requests_are_not_spaced(self):
+        respx.get(f"{BASE}/me").respond(json={})
+        limiter = RateLimiter("burst", rate=1.0, burst=3)
+        client = KaitenClient(domain=DOMAIN, token=TOKEN, rate_limiter=limiter)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(client.get("/me") for _ in range(3)))
+        assert loop.time() - start < 0.5
+
+    def test_clients_with_same_token_share_limiter(self):
+        first = KaitenClient(domain=DOMAIN, token=TOKEN)
+        second = KaitenClient(domain="other-company", token=TOKEN)
+        other = KaitenClient(domain=DOMAIN, token="another-token")
+        assert first._rate_limiter is second._rate_limiter
+        assert first._rate_limiter is not other._rate_limiter
+
+
+# ---------------------------------------------------------------------------
+# Coalescing of identical in-flight GETs
+# ---------------------------------------------------------------------------
+
+
+def _slow_json(payload, delay=0.05):
+    async def respond(request):
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json=payload)
+
+    return respond
+
+
+class TestGetCoalescing:
+    @respx.mock
+    async def test_identical_concurrent_gets_share_one_request(self, client):
+        route = respx.get(f"{BASE}/cards").mock(side_effect=_slow_json([{"id": 1}]))
+        coalesced = metrics.GET_COALESCED.value()
+        results = await asyncio.gather(*(client.get("/cards") for _ in range(3)))
+        assert route.call_count == 1
+        assert results == [[{"id": 1}]] * 3
+        stats = client.stats()
+        assert (stats["get_requests"], stats["get_coalesced"]) == (3, 2)
+        assert metrics.GET_COALESCED.value() == coalesced + 2
+
+    @respx.mock
+    async def test_params_are_normalized(self, client):
+        route = respx.get(f"{BASE}/boards").mock(side_effect=_slow_json([]))
+        await asyncio.gather(
+            client.get("/boards", params={"a": 1, "b": 2, "c": None}),
+            client.get("/boards", params={"b": "2", "a": "1"}),
+        )
+        assert route.call_count == 1
+
+    @respx.mock
+    async def test_different_params_are_not_coalesced(self, client):
+        route = respx.get(f"{BASE}/boards").mock(side_effect=_slow_json([]))
+        await asyncio.gather(
+            client.get("/boards", params={"space_id": 1}),
+            client.get("/boards", params={"space_id": 2}),
+        )
+        assert route.call_count == 2
+
+    @respx.mock
+    async def test_sequential_gets_are_not_coalesced(self, client):
+        route = respx.get(f"{BASE}/cards").respond(json=[])
+        await client.get("/cards")
+        await client.get("/cards")
+        assert route.call_count == 2
+        assert client._inflight == {}
+
+    @respx.mock
+    async def test_error_is_fanned_out(self, client):
+        async def fail(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(404, json={"message": "Not found"})
+
+        route = respx.get(f"{BASE}/spaces/9").mock(side_effect=fail)
+        results = await asyncio.gather(
+            client.get("/spaces/9"), client.get("/spaces/9"), return_exceptions=True
+        )
+        assert route.call_count == 1
+        assert all(isinstance(r, KaitenApiError) and r.status_code == 404 for r in results)
+
+    @respx.mock
+    async def test_cancelled_caller_does_not_cancel_others(self, client):
+        route = respx.get(f"{BASE}/spaces").mock(side_effect=_slow_json([{"id": 1}], 0.1))
+        first = asyncio.ensure_future(client.get("/spaces"))
+        second = asyncio.ensure_future(client.get("/spaces"))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        assert await second == [{"id": 1}]
+        assert first.cancelled()
+        assert route.call_count == 1
+
+    @respx.mock
+    async def test_abandoned_failing_flight_is_cleaned_up(self, client):
+        async def fail(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(400, json={"message": "bad"})
+
+        respx.get(f"{BASE}/spaces").mock(side_effect=fail)
+        caller = asyncio.ensure_future(client.get("/spaces"))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0.1)
+        assert client._inflight == {}
+
+
+class TestCallDeadline:
+    @respx.mock
+    async def test_expired_deadline_sends_nothing(self, client):
+        get_route = respx.get(f"{BASE}/cards").respond(json=[])
+        post_route = respx.post(f"{BASE}/cards").respond(json={})
+        with call_deadline(-1):
+            with pytest.raises(DeadlineExceeded):
+                await client.get("/cards")
+            with pytest.raises(DeadlineExceeded):
+                await client.post("/cards", json={"title": "x"})
+        assert not get_route.called
+        assert not post_route.called
+
+    @respx.mock
+    async def test_slow_response_raises_504(self, client):
+        respx.get(f"{BASE}/cards").mock(side_effect=_slow_json([], 1.0))
+        started = time.monotonic()
+        with call_deadline(0.05), pytest.raises(KaitenApiError) as excinfo:
+            await client.get("/cards")
+        assert time.monotonic() - started < 0.5
+        assert isinstance(excinfo.value, DeadlineExceeded)
+        assert excinfo.value.status_code == 504
+
+    @respx.mock
+    async def test_retry_backoff_is_cut_short(self, client):
+        respx.patch(f"{BASE}/cards/1").respond(429, headers={"Retry-After": "5"})
+        started = time.monotonic()
+        with call_deadline(0.1), pytest.raises(DeadlineExceeded):
+            await client.patch("/cards/1", json={"title": "x"})
+        assert time.monotonic() - started < 1
+
+    @respx.mock
+    async def test_timed_out_caller_leaves_shared_request_running(self, client):
+        route = respx.get(f"{BASE}/spaces").mock(side_effect=_slow_json([{"id": 1}], 0.1))
+
+        async def hurried():
+            with call_deadline(0.02):
+                return await client.get("/spaces")
+
+        results = await asyncio.gather(hurried(), client.get("/spaces"), return_exceptions=True)
+        assert isinstance(results[0], DeadlineExceeded)
+        assert results[1] == [{"id": 1}]
+        assert route.call_count == 1
+
+
+# ---------------------------------------------------------------------------
+# Reference-data cache
+# ---------------------------------------------------------------------------
+
+
+class TestResponseCache:
+    @respx.mock
+    async def test_reference_data_is_served_from_cache(self, client):
+        route = respx.get(f"{BASE}/boards/1/columns").respond(json=[{"id": 5}])
+        assert await client.get("/boards/1/columns") == [{"id": 5}]
+        assert await client.get("/boards/1/columns") == [{"id": 5}]
+        assert route.call_count == 1
+        assert client.stats()["cache_hits"] == 1
+
+    @respx.mock
+    async def test_get_sized_reports_body_bytes_fresh_and_cached(self, client):
+        respx.get(f"{BASE}/boards/1/columns").respond(content=b'[{"id": 5}]')
+        respx.get(f"{BASE}/cards").respond(content=b'[{"id": 1}, {"id": 2}]')
+        assert await client.get_sized("/boards/1/columns") == ([{"id": 5}], 11)
+        assert await client.get_sized("/boards/1/columns") == ([{"id": 5}], 11)
+        assert await client.get_sized("/cards") == ([{"id": 1}, {"id": 2}], 22)
+
+    @respx.mock
+    async def test_mutation_invalidates_family(self, client):
+        route = respx.get(f"{BASE}/boards/1/columns")
+        route.side_effect = [
+            httpx.Response(200, json=[{"id": 5, "title": "Old"}]),
+            httpx.Response(200, json=[{"id": 5, "title": "New"}]),
+        ]
+        respx.patch(f"{BASE}/boards/1/columns/5").respond(json={"id": 5})
+        await client.get("/boards/1/columns")
+        await client.patch("/boards/1/columns/5", json={"title": "New"})
+        assert await client.get("/boards/1/columns") == [{"id": 5, "title": "New"}]
+        assert route.call_count == 2
+
+    @respx.mock
+    async def test_failed_mutation_still_invalidates(self, client):
+        route = respx.get(f"{BASE}/tags").respond(json=[])
+        respx.post(f"{BASE}/company/tags").respond(500, json={"message": "boom"})
+        await client.get("/tags")
+        with pytest.raises(KaitenApiError):
+            await client.post("/company/tags", json={"name": "x"})
+        await client.get("/tags")
+        assert route.call_count == 2
+
+    @respx.mock
+    async def test_reader_does_not_join_get_started_before_mutation(self, client):
+        async def respond(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=[{"id": 1}])
+
+        route = respx.get(f"{BASE}/spaces").mock(side_effect=respond)
+        respx.post(f"{BASE}/spaces").respond(json={"id": 2})
+        stale = asyncio.ensure_future(client.get("/spaces"))
+        await asyncio.sleep(0.01)
+        await client.post("/spaces", json={"title": "New"})
+        fresh = asyncio.ensure_future(client.get("/spaces"))
+        await asyncio.gather(stale, fresh)
+        assert route.call_count == 2
+        # The GET that raced the mutation was not cached either
+        await client.get("/spaces")
+        assert route.call_count == 2
+
+    @respx.mock
+    async def test_cache_can_be_disabled(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_MCP_CACHE", "off")
+        client = KaitenClient(domain=DOMAIN, token=TOKEN)
+        route = respx.get(f"{BASE}/spaces").respond(json=[])
+        await client.get("/spaces")
+        await client.get("/spaces")
+        assert route.call_count == 2
+        assert client.stats() == {"get_requests": 2, "rate_limit_rps": 4.5}
+        # Mutations without a cache are a no-op for invalidation
+        respx.delete(f"{BASE}/spaces/1").respond(204)
+        await client.delete("/spaces/1")
+
+
+# ---------------------------------------------------------------------------
+# Conditional GETs
+# ---------------------------------------------------------------------------
+
+
+class TestConditionalGet:
+    @respx.mock
+    async def test_not_modified_is_served_from_stored_copy(self, client):
+        route = respx.get(f"{BASE}/documents")
+        route.side_effect = [
+            httpx.Response(200, json=[{"uid": "a"}], headers={"ETag": '"v1"'}),
+            httpx.Response(304, headers={"ETag": '"v1"'}),
+        ]
+        first = await client.get("/documents", params={"limit": 500})
+        second = await client.get("/documents", params={"limit": 500})
+        assert second is first
+        assert route.calls[0].request.headers.get("If-None-Match") is None
+        assert route.calls[1].request.headers["If-None-Match"] == '"v1"'
+        assert client.stats()["conditional_hits"] == 1
+
+    @respx.mock
+    async def test_changed_resource_replaces_stored_copy(self, client):
+        route = respx.get(f"{BASE}/documents")
+        route.side_effect = [
+            httpx.Response(200, json=[1], headers={"ETag": '"v1"'}),
+            httpx.Response(200, json=[2], headers={"ETag": '"v2"'}),
+            httpx.Response(304),
+        ]
+        before = {
+            result: metrics.CONDITIONAL_REQUESTS.value(result=result)
+            for result in ("not_modified", "modified")
+        }
+        await client.get("/documents")
+        assert await client.get("/documents") == [2]
+        assert await client.get("/documents") == [2]
+        assert route.calls[2].request.headers["If-None-Match"] == '"v2"'
+        stats = client.stats()
+        assert (stats["conditional_hits"], stats["conditional_misses"]) == (1, 1)
+        for result, count in before.items():
+            assert metrics.CONDITIONAL_REQUESTS.value(result=result) == count + 1
+
+    @respx.mock
+    async def test_last_modified_validator(self, client):
+        stamp = "Wed, 14 Oct 2026 10:00:00 GMT"
+        route = respx.get(f"{BASE}/documents")
+        route.side_effect = [
+            httpx.Response(200, json=[1], headers={"Last-Modified": stamp}),
+            httpx.Response(304),
+        ]
+        await client.get("/documents")
+        assert await client.get("/documents") == [1]
+        assert route.calls[1].request.headers["If-Modified-Since"] == stamp
+
+    @respx.mock
+    async def test_expired_ttl_entry_is_revalidated(self):
+        clock = [0.0]
+        client = KaitenClient(
+            domain=DOMAIN, token=TOKEN, cache=ResponseCache(clock=lambda: clock[0])
+        )
+        route = respx.get(f"{BASE}/spaces")
+        route.side_effect = [
+            httpx.Response(200, json=[{"id": 1}], headers={"ETag": 'W/"s1"'}),
+            httpx.Response(304),
+        ]
+        await client.get("/spaces")
+        await client.get("/spaces")  # fresh: no request
+        clock[0] = 61
+        assert await client.get("/spaces") == [{"id": 1}]
+        assert route.call_count == 2
+        assert route.calls[1].request.headers["If-None-Match"] == 'W/"s1"'
+
+    @respx.mock
+    async def test_without_validators_every_read_downloads(self, client):
+        route = respx.get(f"{BASE}/documents").respond(json=[1])
+        unvalidated = metrics.UNVALIDATED_RESPONSES.value()
+        await client.get("/documents")
+        await client.get("/documents")
+        assert route.call_count == 2
+        assert route.calls[1].request.headers.get("If-None-Match") is None
+        assert client.stats()["no_validators"] == 2
+        assert metrics.UNVALIDATED_RESPONSES.value() == unvalidated + 2
+
+    @respx.mock
+    async def test_bulk_pages_are_not_revalidated(self, client):
+        route = respx.get(f"{BASE}/cards").respond(json=[1], headers={"ETag": '"v1"'})
+        await client.get("/cards", params={"offset": 0})
+        await client.get("/cards", params={"offset": 0})
+        assert route.calls[1].request.headers.get("If-None-Match") is None
+        assert len(client._cache) == 0
+
+    @respx.mock
+    async def test_mutation_drops_validated_entry(self, client):
+        route = respx.get(f"{BASE}/documents").respond(json=[1], headers={"ETag": '"v1"'})
+        respx.post(f"{BASE}/documents").respond(json={"uid": "b"})
+        await client.get("/documents")
+        await client.post("/documents", json={"title": "b"})
+        await client.get("/documents")
+        assert route.calls[1].request.headers.get("If-None-Match") is None
+
 
 # ---------------------------------------------------------------------------
 # Client lifecycle
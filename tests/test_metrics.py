@@ -0,0 +1,161 @@
+"""Tests for the in-process Prometheus metrics registry."""
+
+import asyncio
+import builtins
+import time
+
+import pytest
+
+from kaiten_mcp import metrics
+from kaiten_mcp.metrics import Registry, path_template
+from kaiten_mcp.ratelimit import get_rate_limiter, release_rate_limiter
+
+
+class TestPathTemplate:
+    @pytest.mark.parametrize(
+        ("path", "expected"),
+        [
+            ("/cards/12", "/cards/{id}"),
+            ("/cards/12/tags/3", "/cards/{id}/tags/{id}"),
+            ("/spaces", "/spaces"),
+            ("/users/current", "/users/current"),
+            (
+                "/company/custom-properties/5/select-values",
+                "/company/custom-properties/{id}/select-values",
+            ),
+            ("/documents/8f14e45f-ceea-467f-a0e6-0c0b6a0a6f3c?x=1", "/documents/{id}"),
+            ("/cards/PROJ-12", "/cards/{id}"),
+        ],
+    )
+    def test_collapses_identifiers(self, path, expected):
+        assert path_template(path) == expected
+
+
+class TestRegistry:
+    def test_counter_render(self):
+        registry = Registry()
+        counter = registry.counter("jobs_total", "Jobs.", ("kind",))
+        counter.inc(kind="a")
+        counter.inc(2, kind='b"\n\\')
+        assert counter.value(kind="a") == 1
+        assert registry.render() == (
+            "# HELP jobs_total Jobs.\n"
+            "# TYPE jobs_total counter\n"
+            'jobs_total{kind="a"} 1\n'
+            'jobs_total{kind="b\\"\\n\\\\"} 2\n'
+        )
+
+    def test_histogram_render_is_cumulative(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert (histogram.count(), histogram.sum()) == (4, 3.65)
+        assert registry.render().splitlines()[2:] == [
+            'latency_seconds_bucket{le="0.1"} 2',
+            'latency_seconds_bucket{le="1"} 3',
+            'latency_seconds_bucket{le="+Inf"} 4',
+            "latency_seconds_sum 3.65",
+            "latency_seconds_count 4",
+        ]
+
+    def test_histogram_without_samples(self):
+        histogram = Registry().histogram("h", "H.", ("tool",))
+        assert (histogram.count(tool="x"), histogram.sum(tool="x")) == (0, 0.0)
+
+    def test_derived_gauge(self):
+        registry = Registry()
+        registry.derived_gauge("ratio", "Ratio.", lambda: 0.5)
+        assert registry.render().endswith("ratio 0.5\n")
+
+    def test_derived_gauge_family(self):
+        registry = Registry()
+        series = {("b",): 2.5, ("a",): 1.0}
+        family = registry.derived_gauge_family("rate", "Rate.", ("limiter",), series.items)
+        assert family.values() == series
+        assert registry.render().splitlines()[2:] == [
+            'rate{limiter="a"} 1',
+            'rate{limiter="b"} 2.5',
+        ]
+        series.clear()
+        assert registry.render().splitlines()[2:] == []
+
+    def test_label_mismatch_rejected(self):
+        counter = Registry().counter("c", "C.", ("tool",))
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.inc(path="/x")
+
+    def test_duplicate_name_rejected(self):
+        registry = Registry()
+        registry.counter("c", "C.")
+        with pytest.raises(ValueError, match="already registered"):
+            registry.counter("c", "C.")
+
+
+def test_cache_hit_ratio_counts_hits_and_not_modified(monkeypatch):
+    lookups = Registry().counter("lookups", "L.", ("result",))
+    monkeypatch.setattr(metrics, "CACHE_LOOKUPS", lookups)
+    assert metrics._cache_hit_ratio() == 0.0
+    for result in ("hit", "not_modified", "miss", "modified"):
+        lookups.inc(result=result)
+    assert metrics._cache_hit_ratio() == 0.5
+
+
+def test_default_registry_exposes_server_metrics():
+    text = metrics.REGISTRY.render()
+    for name in (
+        "kaiten_mcp_tool_call_duration_seconds",
+        "kaiten_mcp_tool_response_bytes",
+        "kaiten_mcp_upstream_request_duration_seconds",
+        "kaiten_mcp_rate_limit_wait_seconds",
+        "kaiten_mcp_rate_limit_rate",
+        "kaiten_mcp_rate_limit_max_rate",
+        "kaiten_mcp_upstream_retries_total",
+        "kaiten_mcp_upstream_throttled_total",
+        "kaiten_mcp_get_coalesced_total",
+        "kaiten_mcp_conditional_requests_total",
+        "kaiten_mcp_unvalidated_responses_total",
+        "kaiten_mcp_cache_lookups_total",
+        "kaiten_mcp_cache_hit_ratio",
+        "kaiten_mcp_event_loop_lag_seconds",
+        "process_resident_memory_bytes",
+    ):
+        assert f"# TYPE {name} " in text
+
+
+def test_rate_limit_gauges_follow_live_limiters(monkeypatch):
+    monkeypatch.setenv("KAITEN_RATE_LIMIT_MAX_RPS", "9")
+    limiter = get_rate_limiter("tok")
+    limiter.observe(429, {})
+    labels = ((limiter.key,),)
+    assert metrics.RATE_LIMIT_RATE.values() == dict.fromkeys(labels, limiter.rate)
+    assert metrics.RATE_LIMIT_MAX_RATE.values() == dict.fromkeys(labels, 9.0)
+    assert f'kaiten_mcp_rate_limit_rate{{limiter="{limiter.key}"}} ' in metrics.REGISTRY.render()
+    release_rate_limiter("tok")
+    assert metrics.RATE_LIMIT_RATE.values() == {}
+
+
+def _block_loop(seconds):
+    time.sleep(seconds)
+
+
+async def test_event_loop_lag_records_blocked_loop(monkeypatch):
+    lag = Registry().histogram("lag", "L.", buckets=metrics.LAG_BUCKETS)
+    monkeypatch.setattr(metrics, "EVENT_LOOP_LAG", lag)
+    watcher = asyncio.create_task(metrics.watch_event_loop_lag(0.01))
+    await asyncio.sleep(0)
+    _block_loop(0.06)  # past the probe's deadline
+    await asyncio.sleep(0.03)
+    watcher.cancel()
+    assert lag.count() >= 1
+    assert lag.sum() >= 0.04
+
+
+def test_resident_memory_bytes(monkeypatch):
+    assert metrics._resident_memory_bytes() > 1_000_000
+
+    def unavailable(*args, **kwargs):
+        raise FileNotFoundError(args[0])
+
+    monkeypatch.setattr(builtins, "open", unavailable)
+    assert metrics._resident_memory_bytes() == 0.0
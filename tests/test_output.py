@@ -0,0 +1,124 @@
+"""Tests for result files in KAITEN_MCP_OUTPUT_DIR."""
+
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from kaiten_mcp.client import DeadlineExceeded
+from kaiten_mcp.output import PageFileWriter, new_output_path, stream_pages_to_file
+
+AVATAR = "data:image/png;base64," + "A" * 2048
+
+
+async def _pages(*pages, error=None, delay=0.0):
+    for page in pages:
+        yield page
+        await asyncio.sleep(delay)
+    if error is not None:
+        raise error
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "out"
+    monkeypatch.setenv("KAITEN_MCP_OUTPUT_DIR", str(directory))
+    return directory
+
+
+class TestNewOutputPath:
+    def test_paths_are_unique(self, output_dir):
+        first = new_output_path("tool", "json")
+        second = new_output_path("tool", "json")
+        assert first != second
+        assert os.path.dirname(first) == str(output_dir)
+        assert output_dir.is_dir()
+        assert first.endswith(".json")
+
+    def test_requires_output_dir(self, monkeypatch):
+        monkeypatch.delenv("KAITEN_MCP_OUTPUT_DIR", raising=False)
+        with pytest.raises(ValueError, match="KAITEN_MCP_OUTPUT_DIR"):
+            new_output_path("tool", "json")
+
+
+class TestPageFileWriter:
+    @pytest.mark.parametrize("fmt", ["json", "ndjson"])
+    def test_pages_are_concatenated(self, tmp_path, fmt):
+        writer = PageFileWriter(str(tmp_path / f"items.{fmt}"), fmt)
+        writer.write_page([{"id": 1}, {"id": 2, "title": "Кириллица"}])
+        writer.write_page([{"id": 3}, {"id": 4}])
+        summary = writer.close()
+
+        text = _read(summary["saved_to"])
+        items = json.loads(text) if fmt == "json" else [json.loads(x) for x in text.splitlines()]
+        assert [item["id"] for item in items] == [1, 2, 3, 4]
+        assert summary["total_items"] == 4
+        assert summary["size_bytes"] == len(text.encode("utf-8"))
+        assert summary["sample"] == items[:3]
+        assert "omitted_base64_fields" not in summary
+
+    @pytest.mark.parametrize(("fmt", "content"), [("json", "[]\n"), ("ndjson", "")])
+    def test_empty_file(self, tmp_path, fmt, content):
+        writer = PageFileWriter(str(tmp_path / "empty"), fmt)
+        summary = writer.close()
+        assert _read(summary["saved_to"]) == content
+        assert summary["total_items"] == 0
+        assert summary["sample"] == []
+
+    def test_strips_data_uris(self, tmp_path):
+        writer = PageFileWriter(str(tmp_path / "items.ndjson"), "ndjson")
+        writer.write_page([{"id": 1, "owner": {"avatar": AVATAR}}, {"id": 2, "cover": AVATAR}])
+        summary = writer.close()
+        assert AVATAR not in _read(summary["saved_to"])
+        assert summary["omitted_base64_fields"] == 2
+        assert summary["sample"][0]["owner"]["avatar"] == "[base64 ~2KB, omitted]"
+
+    def test_rejects_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError, match="json, ndjson"):
+            PageFileWriter(str(tmp_path / "items.csv"), "csv")
+
+
+class TestStreamPagesToFile:
+    async def test_applies_transform_per_page(self, output_dir):
+        seen = []
+
+        def transform(page):
+            seen.append(len(page))
+            return [{"id": item["id"]} for item in page]
+
+        summary = await stream_pages_to_file(
+            _pages([{"id": 1, "x": 1}], [{"id": 2, "x": 2}]), "tool", "json", transform
+        )
+        assert seen == [1, 1]
+        assert json.loads(_read(summary["saved_to"])) == [{"id": 1}, {"id": 2}]
+        assert summary["saved_to"].startswith(str(output_dir))
+
+    async def test_partial_file_is_removed_on_error(self, output_dir):
+        with pytest.raises(RuntimeError):
+            await stream_pages_to_file(
+                _pages([{"id": 1}], error=RuntimeError("boom")), "tool", "ndjson"
+            )
+        assert os.listdir(output_dir) == []
+
+    async def test_deadline_keeps_pages_written_so_far(self, output_dir):
+        pages = _pages([{"id": 1}, {"id": 2}], [{"id": 3}], delay=1.0)
+        summary = await stream_pages_to_file(
+            pages, "tool", "ndjson", deadline=time.monotonic() + 0.05, start_offset=40
+        )
+        assert _read(summary["saved_to"]) == '{"id":1}\n{"id":2}\n'
+        assert summary["incomplete"] is True
+        assert summary["truncated"] == {"reason": "deadline", "returned": 2, "resume_offset": 42}
+
+    async def test_client_deadline_keeps_the_file(self, output_dir):
+        summary = await stream_pages_to_file(
+            _pages([{"id": 1}], error=DeadlineExceeded()), "tool", "json"
+        )
+        assert json.loads(_read(summary["saved_to"])) == [{"id": 1}]
+        assert summary["truncated"]["resume_offset"] == 1
@@ -0,0 +1,174 @@
+"""Tests for the pooled per-credential Kaiten clients."""
+
+import dataclasses
+
+import httpx
+import pytest
+import respx
+
+from kaiten_mcp.auth import KaitenCredential
+from kaiten_mcp.cache import get_response_cache
+from kaiten_mcp.pool import KaitenClientPool
+from kaiten_mcp.ratelimit import get_rate_limiter
+
+
+def _credential(cred_id: str = "kcred_1", expires_at: int = 10_000) -> KaitenCredential:
+    return KaitenCredential(
+        id=cred_id,
+        token=f"token-{cred_id}",
+        subdomain="acme",
+        base_domain=None,
+        base_url=None,
+        user_id="42",
+        user_label="Alice",
+        expires_at=expires_at,
+    )
+
+
+@pytest.fixture
+def clock(clock):
+    clock.now = 1_000.0
+    return clock
+
+
+async def test_same_credential_reuses_client(clock):
+    pool = KaitenClientPool(clock=clock)
+    first = pool.acquire(_credential())
+    await pool.release(first)
+    second = pool.acquire(_credential())
+    assert second is first
+    assert second.token == "token-kcred_1"
+    assert second.base_url == "https://acme.kaiten.ru/api/latest"
+
+
+async def test_different_credentials_get_different_clients(clock):
+    pool = KaitenClientPool(clock=clock)
+    assert pool.acquire(_credential("a")) is not pool.acquire(_credential("b"))
+    assert len(pool) == 2
+
+
+@respx.mock
+async def test_cache_byte_budget_is_shared_by_pooled_clients(clock, monkeypatch):
+    monkeypatch.setenv("KAITEN_MCP_CACHE_MAX_BYTES", "1000")
+    body = [{"id": 1, "title": "x" * 280}]
+    size = len(httpx.Response(200, json=body).content)
+    respx.get("https://acme.kaiten.ru/api/latest/spaces").respond(json=body)
+    pool = KaitenClientPool(clock=clock)
+    clients = [pool.acquire(_credential(f"c{i}")) for i in range(5)]
+    for client in clients:
+        assert await client.get("/spaces") == body
+    assert respx.calls.call_count == 5  # entries are kept apart per token
+    cache = get_response_cache()
+    assert all(client._cache is cache for client in clients)
+    # Five clients would each fit their response, but together they share 1000 bytes
+    assert 5 * size > 1000
+    assert cache.size_bytes <= 1000
+    assert len(cache) == 1000 // size
+    assert await clients[-1].get("/spaces") == body
+    assert respx.calls.call_count == 5  # the newest entry was kept
+    await pool.close()
+
+
+async def test_idle_client_is_closed_and_replaced(clock):
+    pool = KaitenClientPool(idle_seconds=60, clock=clock)
+    first = pool.acquire(_credential())
+    await first._get_client()
+    await pool.release(first)
+
+    clock.now += 61
+    second = pool.acquire(_credential())
+    assert second is not first
+    await pool.release(second)
+    assert first._client.is_closed
+
+
+async def test_busy_client_is_not_idle_evicted(clock):
+    pool = KaitenClientPool(idle_seconds=60, clock=clock)
+    first = pool.acquire(_credential())
+    clock.now += 120
+    assert pool.acquire(_credential()) is first
+
+
+async def test_expired_credential_client_is_dropped_after_release(clock):
+    pool = KaitenClientPool(clock=clock)
+    client = pool.acquire(_credential(expires_at=1_010))
+    await client._get_client()
+    clock.now = 1_020
+    await pool.release(client)
+    assert len(pool) == 0
+    assert client._client.is_closed
+
+
+async def test_lru_eviction_skips_busy_clients(clock):
+    pool = KaitenClientPool(max_size=2, clock=clock)
+    busy = pool.acquire(_credential("busy"))
+    idle = pool.acquire(_credential("idle"))
+    await idle._get_client()
+    await pool.release(idle)
+
+    pool.acquire(_credential("new"))
+    assert len(pool) == 2
+    assert pool.acquire(_credential("busy")) is busy
+    # The idle client was retired and gets closed at the next release
+    await pool.release(busy)
+    assert idle._client.is_closed
+
+
+async def test_pool_overflows_when_every_client_is_busy(clock):
+    pool = KaitenClientPool(max_size=1, clock=clock)
+    pool.acquire(_credential("a"))
+    pool.acquire(_credential("b"))
+    assert len(pool) == 2
+
+
+async def test_retired_busy_client_closed_only_after_release(clock):
+    pool = KaitenClientPool(max_size=1, clock=clock)
+    a = pool.acquire(_credential("a"))
+    await a._get_client()
+    await pool.release(a)
+    a_again = pool.acquire(_credential("a"))
+    assert a_again is a
+    clock.now = 20_000  # credential expired while the call is running
+    b = pool.acquire(_credential("b", expires_at=30_000))
+    await pool.release(b)
+    assert not a._client.is_closed
+    await pool.release(a)
+    assert a._client.is_closed
+
+
+async def test_release_of_unknown_client_is_noop(clock):
+    pool = KaitenClientPool(clock=clock)
+    other = KaitenClientPool(clock=clock).acquire(_credential())
+    await pool.release(other)
+    assert len(pool) == 0
+
+
+async def test_close_closes_everything(clock):
+    pool = KaitenClientPool(clock=clock)
+    client = pool.acquire(_credential())
+    await client._get_client()
+    await pool.close()
+    assert len(pool) == 0
+    assert client._client.is_closed
+
+
+async def test_dropped_client_releases_its_rate_limiter(clock):
+    pool = KaitenClientPool(idle_seconds=60, clock=clock)
+    client = pool.acquire(_credential("a"))
+    limiter = client._rate_limiter
+    await pool.release(client)
+    # Another credential with the same token keeps the limiter alive
+    shared = pool.acquire(dataclasses.replace(_credential("b"), token=client.token))
+    clock.now += 61
+    await pool.release(shared)
+    assert get_rate_limiter(client.token) is limiter
+    clock.now += 61
+    await pool.close()
+    assert get_rate_limiter(client.token) is not limiter
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("KAITEN_MCP_CLIENT_POOL_SIZE", "3")
+    monkeypatch.setenv("KAITEN_MCP_CLIENT_IDLE_SECONDS", "7.5")
+    pool = KaitenClientPool.from_env()
+    assert (pool.max_size, pool.idle_seconds) == (3, 7.5)
@@ -0,0 +1,130 @@
+"""Tests for on-demand tool call profiling."""
+
+import pstats
+import tracemalloc
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from kaiten_mcp import runtime
+from kaiten_mcp.client import KaitenClient
+from kaiten_mcp.profiling import ToolProfiler
+from kaiten_mcp.server import ALL_TOOLS, call_tool
+
+
+def _busy():
+    return sum(i * i for i in range(10_000))
+
+
+def _profiles(tmp_path, suffix):
+    return sorted((tmp_path / "profiles").glob(f"*{suffix}"))
+
+
+class TestToolProfiler:
+    def test_disabled_by_default(self, tmp_path):
+        profiler = ToolProfiler(output_dir=str(tmp_path))
+        with profiler.profile("kaiten_list_all_cards"):
+            _busy()
+        assert profiler.profiled == 0
+        assert not (tmp_path / "profiles").exists()
+
+    def test_patterns(self):
+        profiler = ToolProfiler(["kaiten_list_all_*", "kaiten_get_card"])
+        assert profiler.matches("kaiten_list_all_cards")
+        assert profiler.matches("kaiten_get_card")
+        assert not profiler.matches("kaiten_get_card_tags")
+
+    def test_unmatched_call_is_not_profiled(self, tmp_path):
+        profiler = ToolProfiler(["kaiten_list_all_*"], output_dir=str(tmp_path))
+        with profiler.profile("kaiten_get_card"):
+            _busy()
+        assert profiler.profiled == 0
+
+    def test_writes_cpu_profile_and_summary(self, tmp_path):
+        profiler = ToolProfiler(["*"], output_dir=str(tmp_path), top=5)
+        with profiler.profile("kaiten/odd name"):
+            _busy()
+        [prof] = _profiles(tmp_path, ".prof")
+        assert prof.name.startswith("kaiten_odd_name_")
+        stats = pstats.Stats(str(prof))
+        assert any(func[2] == "_busy" for func in stats.stats)
+        [summary] = _profiles(tmp_path, ".txt")
+        assert "cumulative" in summary.read_text(encoding="utf-8")
+        assert _profiles(tmp_path, ".mem.txt") == []
+        assert profiler.profiled == 1
+
+    def test_memory_snapshot(self, tmp_path):
+        assert not tracemalloc.is_tracing()
+        profiler = ToolProfiler(["*"], memory=True, output_dir=str(tmp_path))
+        with profiler.profile("tool"):
+            blob = [bytes(1024) for _ in range(1000)]
+        del blob
+        assert not tracemalloc.is_tracing()
+        [mem] = _profiles(tmp_path, ".mem.txt")
+        first_line = mem.read_text(encoding="utf-8").splitlines()[0]
+        assert int(first_line.removeprefix("peak_bytes: ")) >= 1000 * 1024
+
+    def test_keeps_tracemalloc_started_elsewhere(self, tmp_path):
+        tracemalloc.start()
+        try:
+            with ToolProfiler(["*"], memory=True, output_dir=str(tmp_path)).profile("tool"):
+                pass
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+    def test_overlapping_call_runs_unprofiled(self, tmp_path):
+        profiler = ToolProfiler(["*"], output_dir=str(tmp_path))
+        with profiler.profile("outer"), profiler.profile("inner"):
+            pass
+        assert (profiler.profiled, profiler.skipped) == (1, 1)
+        assert [path.name.split("_")[0] for path in _profiles(tmp_path, ".prof")] == ["outer"]
+
+    def test_write_failure_does_not_fail_the_call(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("x")
+        profiler = ToolProfiler(["*"], output_dir=str(blocker))
+        with profiler.profile("tool"):
+            pass
+        assert profiler.profiled == 1
+
+    def test_exception_still_writes_profile(self, tmp_path):
+        profiler = ToolProfiler(["*"], output_dir=str(tmp_path))
+        with pytest.raises(RuntimeError, match="boom"), profiler.profile("tool"):
+            raise RuntimeError("boom")
+        assert len(_profiles(tmp_path, ".prof")) == 1
+        with profiler.profile("tool"):  # the lock was released
+            pass
+        assert profiler.profiled == 2
+
+    def test_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("KAITEN_MCP_PROFILE", " kaiten_list_all_* , ,kaiten_get_card")
+        monkeypatch.setenv("KAITEN_MCP_PROFILE_MEMORY", "1")
+        monkeypatch.setenv("KAITEN_MCP_OUTPUT_DIR", str(tmp_path))
+        profiler = ToolProfiler.from_env()
+        assert profiler.patterns == ("kaiten_list_all_*", "kaiten_get_card")
+        assert profiler.memory
+        assert profiler.output_dir == str(tmp_path)
+
+    def test_from_env_defaults(self, monkeypatch):
+        for name in ("KAITEN_MCP_PROFILE", "KAITEN_MCP_PROFILE_MEMORY", "KAITEN_MCP_OUTPUT_DIR"):
+            monkeypatch.delenv(name, raising=False)
+        profiler = ToolProfiler.from_env()
+        assert (profiler.patterns, profiler.memory) == ((), False)
+        assert profiler.output_dir.endswith("kaiten-mcp")
+
+
+async def test_call_tool_profiles_matching_handler(tmp_path):
+    tool_name = "kaiten_list_spaces"
+    handler = AsyncMock(return_value=[{"id": 1}])
+    profiler = ToolProfiler([tool_name], output_dir=str(tmp_path))
+    with (
+        patch.object(runtime, "_profiler", profiler),
+        patch.object(runtime, "_client", KaitenClient(domain="test-company", token="t")),
+        patch.dict(ALL_TOOLS, {tool_name: {**ALL_TOOLS[tool_name], "handler": handler}}),
+    ):
+        result = await call_tool(tool_name, {})
+    assert not result.isError
+    [prof] = _profiles(tmp_path, ".prof")
+    stats = pstats.Stats(str(prof))
+    assert any(func[2] == "_serialize_result" for func in stats.stats)
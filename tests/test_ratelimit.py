@@ -0,0 +1,340 @@
+"""Tests for the shared token-bucket rate limiter."""
+
+import asyncio
+import os
+import struct
+import threading
+import time
+
+import pytest
+
+from kaiten_mcp.ratelimit import (
+    DEFAULT_BURST,
+    DEFAULT_RATE,
+    FileLockBucketBackend,
+    InProcessBucketBackend,
+    Priority,
+    RateLimiter,
+    current_priority,
+    get_rate_limiter,
+    parse_rate_policy,
+    parse_seconds,
+    release_rate_limiter,
+    request_priority,
+    token_key,
+)
+
+
+class TestInProcessBackend:
+    def test_burst_is_free_then_requests_queue(self):
+        backend = InProcessBucketBackend()
+        delays = [backend.reserve("k", 2.0, 3.0) for _ in range(5)]
+        assert delays[:3] == [0.0, 0.0, 0.0]
+        # Each queued reservation waits one more refill interval
+        assert delays[3] == pytest.approx(0.5, abs=0.05)
+        assert delays[4] == pytest.approx(1.0, abs=0.05)
+
+    def test_keys_are_independent(self):
+        backend = InProcessBucketBackend()
+        assert backend.reserve("a", 1.0, 1.0) == 0.0
+        assert backend.reserve("b", 1.0, 1.0) == 0.0
+        assert backend.reserve("a", 1.0, 1.0) > 0
+
+    def test_forget_drops_the_bucket(self):
+        backend = InProcessBucketBackend()
+        backend.reserve("a", 1.0, 1.0)
+        backend.forget("a")
+        backend.forget("missing")
+        assert backend.reserve("a", 1.0, 1.0) == 0.0
+
+
+class TestFileLockBackend:
+    def test_state_is_shared_between_backend_instances(self, tmp_path):
+        # Two backend instances over one directory behave like two processes
+        first = FileLockBucketBackend(str(tmp_path))
+        second = FileLockBucketBackend(str(tmp_path))
+        assert first.reserve("tok", 1.0, 2.0) == 0.0
+        assert second.reserve("tok", 1.0, 2.0) == 0.0
+        assert first.reserve("tok", 1.0, 2.0) == pytest.approx(1.0, abs=0.05)
+
+    def test_truncated_state_file_starts_full(self, tmp_path):
+        backend = FileLockBucketBackend(str(tmp_path))
+        (tmp_path / "tok.bucket").write_bytes(b"\x00\x01")
+        assert backend.reserve("tok", 1.0, 1.0) == 0.0
+        raw = (tmp_path / "tok.bucket").read_bytes()
+        tokens, _ = struct.unpack("<dd", raw)
+        assert tokens == pytest.approx(0.0, abs=0.01)
+
+    def test_creates_directory(self, tmp_path):
+        directory = tmp_path / "nested" / "buckets"
+        FileLockBucketBackend(str(directory))
+        assert directory.is_dir()
+
+    def test_forget_keeps_the_shared_file(self, tmp_path):
+        backend = FileLockBucketBackend(str(tmp_path))
+        backend.reserve("tok", 1.0, 1.0)
+        backend.forget("tok")
+        assert backend.reserve("tok", 1.0, 1.0) > 0
+
+    async def test_limiter_reserves_off_the_event_loop(self, tmp_path, monkeypatch):
+        backend = FileLockBucketBackend(str(tmp_path))
+        threads = []
+        reserve = backend.reserve
+
+        def recording_reserve(*args):
+            threads.append(threading.get_ident())
+            return reserve(*args)
+
+        monkeypatch.setattr(backend, "reserve", recording_reserve)
+        await RateLimiter("tok", backend=backend).acquire()
+        assert threads
+        assert threads[0] != threading.get_ident()
+
+
+class TestRateLimiter:
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError, match="positive"):
+            RateLimiter("k", rate=0)
+
+    def test_burst_at_least_one(self):
+        assert RateLimiter("k", burst=0).burst == 1.0
+
+    async def test_acquire_waits_for_queued_token(self):
+        limiter = RateLimiter("k", rate=50.0, burst=1)
+        assert await limiter.acquire() == 0.0
+        assert 0.01 <= await limiter.acquire() < 0.1
+
+    def test_token_key_hides_token(self):
+        key = token_key("secret-token")
+        assert "secret" not in key
+        assert key == token_key("secret-token")
+        assert key != token_key("other-token")
+
+
+class TestPriorityScheduling:
+    @staticmethod
+    async def _run(limiter, plan):
+        """Start waiters in ``plan`` order; return their names in grant order."""
+        granted = []
+
+        async def waiter(name, priority):
+            await limiter.acquire(priority)
+            granted.append(name)
+
+        tasks = []
+        for name, priority in plan:
+            tasks.append(asyncio.ensure_future(waiter(name, priority)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return granted
+
+    async def test_interactive_jumps_ahead_of_queued_bulk(self):
+        limiter = RateLimiter("prio", rate=50.0, burst=1)
+        plan = [("free", Priority.BULK)]
+        plan += [(f"bulk{i}", Priority.BULK) for i in range(3)]
+        plan += [("card", Priority.INTERACTIVE)]
+        granted = await self._run(limiter, plan)
+        assert granted == ["free", "card", "bulk0", "bulk1", "bulk2"]
+
+    async def test_bulk_is_not_starved(self):
+        limiter = RateLimiter("prio", rate=50.0, burst=1, interactive_streak=2)
+        plan = [("free", Priority.INTERACTIVE), ("bulk", Priority.BULK)]
+        plan += [(f"i{i}", Priority.INTERACTIVE) for i in range(4)]
+        granted = await self._run(limiter, plan)
+        assert granted == ["free", "i0", "i1", "bulk", "i2", "i3"]
+
+    async def test_priority_defaults_to_context(self):
+        limiter = RateLimiter("prio", rate=50.0, burst=1)
+
+        async def bulk_call():
+            with request_priority(Priority.BULK):
+                await limiter.acquire()
+            return "bulk"
+
+        async def interactive_call():
+            await limiter.acquire()
+            return "interactive"
+
+        limiter.reserve()  # spend the burst so both calls queue
+        order = []
+        tasks = [asyncio.ensure_future(bulk_call()), asyncio.ensure_future(interactive_call())]
+        for task in asyncio.as_completed(tasks):
+            order.append(await task)
+        assert order == ["interactive", "bulk"]
+        assert current_priority() is Priority.INTERACTIVE
+
+    async def test_cancelled_waiter_passes_its_slot_on(self):
+        limiter = RateLimiter("prio", rate=100.0, burst=1)
+        limiter.reserve()
+        cancelled = asyncio.ensure_future(limiter.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        other = asyncio.ensure_future(limiter.acquire(Priority.BULK))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        waited = await asyncio.wait_for(other, 1)
+        assert 0 < waited < 0.05
+
+
+class TestAdaptiveRate:
+    def test_multiplicative_decrease_once_per_hold(self):
+        limiter = RateLimiter("aimd", rate=4.0)
+        limiter.observe(429, {})
+        limiter.observe(429, {})  # same throttling episode
+        assert limiter.rate == 2.0
+        limiter._decrease_hold_until = 0.0
+        limiter.observe(429, {})
+        assert limiter.rate == 1.0
+        assert limiter.stats() == {
+            "rate": 1.0,
+            "max_rate": 4.0,
+            "adaptive": True,
+            "throttled": 3,
+            "decreases": 2,
+        }
+
+    def test_never_below_minimum(self):
+        limiter = RateLimiter("aimd", rate=1.0)
+        for _ in range(5):
+            limiter._decrease_hold_until = 0.0
+            limiter.observe(429, {})
+        assert limiter.rate == 0.5
+
+    def test_additive_increase_up_to_ceiling(self):
+        limiter = RateLimiter("aimd", rate=2.0, max_rate=3.0)
+        limiter.observe(200, {})
+        assert limiter.rate == pytest.approx(2.125)
+        for _ in range(100):
+            limiter.observe(200, {})
+        assert limiter.rate == 3.0
+
+    def test_default_ceiling_only_recovers_to_configured_rate(self):
+        limiter = RateLimiter("aimd", rate=4.0)
+        limiter.observe(429, {})
+        for _ in range(100):
+            limiter.observe(200, {})
+        assert limiter.rate == limiter.max_rate == 4.0
+
+    def test_errors_do_not_change_rate(self):
+        limiter = RateLimiter("aimd", rate=2.0, max_rate=3.0)
+        limiter.observe(500, {})
+        limiter.observe(404, {})
+        assert limiter.rate == 2.0
+
+    @staticmethod
+    def _limiter(clock, sleep=None, **kwargs):
+        return RateLimiter(
+            "aimd",
+            backend=InProcessBucketBackend(clock),
+            clock=clock,
+            sleep=sleep or clock.sleep,
+            **kwargs,
+        )
+
+    async def test_retry_after_pauses_every_caller(self, clock):
+        limiter = self._limiter(clock, rate=100.0, burst=10)
+        limiter.observe(429, {"Retry-After": "0.05"})
+        assert await limiter.acquire() == pytest.approx(0.05)
+        assert clock.now == pytest.approx(0.05)
+
+    async def test_pause_then_queue_reports_total_wait(self, clock):
+        async def oversleep(seconds):
+            await clock.sleep(seconds + 0.004)
+
+        limiter = self._limiter(clock, oversleep, rate=50.0, burst=1)
+        limiter.reserve()
+        limiter._paused_until = 0.005
+        # The pause does not cover the whole refill interval, so the caller also
+        # queues; the bucket refills during the overshoot, so only the real
+        # elapsed time counts: 0.009 paused, then 0.011 + 0.004 queued
+        assert await limiter.acquire() == pytest.approx(0.024)
+
+    def test_exhausted_remaining_pauses_until_reset(self, clock):
+        limiter = self._limiter(clock, rate=4.0)
+        limiter.observe(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "2"})
+        assert limiter._paused_until == 2
+        limiter.observe(200, {"RateLimit-Remaining": "3", "RateLimit-Reset": "9"})
+        assert limiter._paused_until == 2
+
+    def test_advertised_policy_sets_ceiling(self):
+        limiter = RateLimiter("aimd", rate=4.5)
+        limiter.observe(200, {"RateLimit-Policy": "2;w=1"})
+        assert (limiter.max_rate, limiter.rate) == (1.8, 1.8)
+
+    def test_not_adaptive_ignores_feedback(self):
+        limiter = RateLimiter("aimd", rate=4.0, adaptive=False)
+        limiter.observe(429, {"Retry-After": "10"})
+        assert limiter.rate == 4.0
+        assert limiter._paused_until == 0.0
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            ("5;w=1", 5.0),
+            ('"default";q=100;w=60, "burst";q=10;w=1', 100 / 60),
+            ("100", None),
+            ("garbage", None),
+            ("5;w=0", None),
+        ],
+    )
+    def test_parse_rate_policy(self, value, expected):
+        result = parse_rate_policy(value)
+        assert result == (pytest.approx(expected) if expected else None)
+
+    def test_parse_seconds(self):
+        assert parse_seconds(None) is None
+        assert parse_seconds("soon") is None
+        assert parse_seconds("1.5") == 1.5
+        assert parse_seconds("-3") == 0.0
+        assert parse_seconds(str(time.time() + 30)) == pytest.approx(30, abs=1)
+
+
+class TestRegistry:
+    def test_defaults(self, monkeypatch):
+        for name in ("KAITEN_RATE_LIMIT_RPS", "KAITEN_RATE_LIMIT_BURST"):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv("KAITEN_RATE_LIMIT_BACKEND", raising=False)
+        limiter = get_rate_limiter("tok")
+        assert limiter.rate == DEFAULT_RATE
+        assert limiter.burst == DEFAULT_BURST
+        assert isinstance(limiter.backend, InProcessBucketBackend)
+        assert get_rate_limiter("tok") is limiter
+
+    def test_env_configuration(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("KAITEN_RATE_LIMIT_BACKEND", "file")
+        monkeypatch.setenv("KAITEN_RATE_LIMIT_DIR", str(tmp_path))
+        monkeypatch.setenv("KAITEN_RATE_LIMIT_RPS", "10")
+        monkeypatch.setenv("KAITEN_RATE_LIMIT_BURST", "2")
+        limiter = get_rate_limiter("tok")
+        assert isinstance(limiter.backend, FileLockBucketBackend)
+        assert limiter.backend.directory == str(tmp_path)
+        assert (limiter.rate, limiter.burst) == (10.0, 2.0)
+        # Different tokens share the backend but not the bucket
+        assert get_rate_limiter("other").backend is limiter.backend
+        limiter.reserve()
+        assert os.path.exists(tmp_path / f"{limiter.key}.bucket")
+
+    def test_invalid_backend_rejected(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_RATE_LIMIT_BACKEND", "redis")
+        with pytest.raises(ValueError, match="KAITEN_RATE_LIMIT_BACKEND"):
+            get_rate_limiter("tok")
+
+    def test_invalid_number_rejected(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_RATE_LIMIT_RPS", "fast")
+        with pytest.raises(ValueError, match="KAITEN_RATE_LIMIT_RPS"):
+            get_rate_limiter("tok")
+
+    def test_adaptive_configuration(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_RATE_LIMIT_MAX_RPS", "20")
+        limiter = get_rate_limiter("tok")
+        assert (limiter.adaptive, limiter.max_rate) == (True, 20.0)
+        monkeypatch.setenv("KAITEN_RATE_LIMIT_ADAPTIVE", "off")
+        assert get_rate_limiter("tok").adaptive is False
+
+    def test_release_forgets_limiters_and_bucket(self):
+        limiter = get_rate_limiter("tok")
+        other = get_rate_limiter("other")
+        limiter.reserve()
+        release_rate_limiter("tok")
+        assert limiter.key not in limiter.backend._state
+        assert get_rate_limiter("tok") is not limiter
+        assert get_rate_limiter("other") is other
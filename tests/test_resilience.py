@@ -0,0 +1,126 @@
+"""Tests for retry backoff, retry budget and circuit breaker."""
+
+import pytest
+
+from kaiten_mcp.resilience import (
+    CircuitBreaker,
+    RetryBudget,
+    circuit_breaker_states,
+    decorrelated_jitter,
+    get_upstream_guard,
+)
+
+
+class TestDecorrelatedJitter:
+    def test_range_grows_from_previous_delay(self):
+        assert decorrelated_jitter(2.0, 1.0, 30.0, rng=lambda low, high: high) == 6.0
+        assert decorrelated_jitter(2.0, 1.0, 30.0, rng=lambda low, high: low) == 1.0
+
+    def test_capped(self):
+        assert decorrelated_jitter(20.0, 1.0, 30.0, rng=lambda low, high: high) == 30.0
+
+    def test_real_random_stays_in_bounds(self):
+        delay = 1.0
+        for _ in range(50):
+            delay = decorrelated_jitter(delay, 1.0, 8.0)
+            assert 1.0 <= delay <= 8.0
+
+
+class TestRetryBudget:
+    def test_reserve_then_ratio(self):
+        budget = RetryBudget(ratio=0.5, reserve=2)
+        assert [budget.try_retry() for _ in range(3)] == [True, True, False]
+        budget.record_request()
+        assert budget.try_retry() is False
+        budget.record_request()
+        assert budget.try_retry() is True
+        assert budget.exhausted == 2
+
+    def test_balance_capped_at_reserve(self):
+        budget = RetryBudget(ratio=1.0, reserve=3)
+        for _ in range(10):
+            budget.record_request()
+        assert budget.balance == 3
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self, clock):
+        breaker = CircuitBreaker(failure_threshold=3, cooldown=10, clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow() is True
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.allow() is False
+        assert breaker.trips == 1
+
+    def test_half_open_probe_closes_on_success(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+        breaker.record_failure()
+        assert breaker.retry_after() == 10
+        clock.now = 10
+        assert breaker.state == "half_open"
+        assert breaker.allow() is True
+        assert breaker.allow() is False  # one probe at a time
+        clock.now = 14
+        # Until the probe is given up and replaced
+        assert breaker.retry_after() == 6
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow() is True
+
+    def test_failed_probe_reopens(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow() is True
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.trips == 2
+        assert breaker.snapshot() == {
+            "state": "open",
+            "consecutive_failures": 2,
+            "retry_after": 10,
+            "trips": 2,
+        }
+
+    def test_lost_probe_is_replaced_after_cooldown(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow() is True
+        clock.now = 20
+        assert breaker.allow() is True
+
+    def test_failures_while_open_do_not_count_as_trips(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.trips == 1
+
+
+class TestRegistry:
+    def test_guard_shared_per_base_url(self):
+        first = get_upstream_guard("https://a.kaiten.ru/api/latest")
+        assert get_upstream_guard("https://a.kaiten.ru/api/latest") is first
+        assert get_upstream_guard("https://b.kaiten.ru/api/latest") is not first
+        assert set(circuit_breaker_states()) == {
+            "https://a.kaiten.ru/api/latest",
+            "https://b.kaiten.ru/api/latest",
+        }
+
+    def test_env_configuration(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_RETRY_BUDGET_RATIO", "0.5")
+        monkeypatch.setenv("KAITEN_CIRCUIT_BREAKER_THRESHOLD", "2")
+        monkeypatch.setenv("KAITEN_CIRCUIT_BREAKER_COOLDOWN", "5")
+        guard = get_upstream_guard("https://env.kaiten.ru/api/latest")
+        assert guard.budget.ratio == 0.5
+        assert (guard.breaker.failure_threshold, guard.breaker.cooldown) == (2, 5.0)
+
+    def test_invalid_number_rejected(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_RETRY_BUDGET_RATIO", "lots")
+        with pytest.raises(ValueError, match="KAITEN_RETRY_BUDGET_RATIO"):
+            get_upstream_guard("https://bad.kaiten.ru/api/latest")
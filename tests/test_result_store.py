@@ -0,0 +1,159 @@
+"""Tests for the bounded store of large tool results."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from kaiten_mcp import result_store
+from kaiten_mcp.result_store import (
+    ResultStore,
+    current_owner,
+    get_result_store,
+    mark_unprojected,
+    reset_result_store,
+    take_unprojected,
+)
+
+
+class TestResultStore:
+    def test_put_and_get(self):
+        store = ResultStore()
+        data = [{"id": 1}]
+        handle = store.put(data, '[{"id":1}]')
+        assert handle.startswith("res_")
+        assert store.get(handle) is data
+        assert store.counters["hits"] == 1
+        assert store.size_bytes == len('[{"id":1}]')
+
+    def test_handles_are_content_addressed(self):
+        store = ResultStore()
+        first = store.put([1], "[1]")
+        assert store.put([1], "[1]") == first
+        assert store.put([2], "[2]") != first
+        assert len(store) == 2
+        assert store.size_bytes == 6
+
+    def test_owners_are_isolated(self):
+        store = ResultStore()
+        handle = store.put([1], "[1]", owner="alice")
+        assert handle != store.handle_for("[1]", "bob")
+        assert store.get(handle, "alice") == [1]
+        with pytest.raises(KeyError):
+            store.get(handle, "bob")
+        with pytest.raises(KeyError):
+            store.get(handle)
+
+    def test_unknown_handle(self):
+        store = ResultStore()
+        with pytest.raises(KeyError):
+            store.get("res_missing")
+        assert store.counters["misses"] == 1
+
+    def test_ttl_expiry(self, clock):
+        store = ResultStore(ttl=10, clock=clock)
+        handle = store.put([1], "[1]")
+        clock.now = 9.9
+        assert store.get(handle) == [1]
+        clock.now = 10.0
+        with pytest.raises(KeyError):
+            store.get(handle)
+        assert store.counters["expirations"] == 1
+        assert len(store) == 0
+        assert store.size_bytes == 0
+
+    def test_put_refreshes_ttl(self, clock):
+        store = ResultStore(ttl=10, clock=clock)
+        handle = store.put([1], "[1]")
+        clock.now = 8
+        store.put([1], "[1]")
+        clock.now = 15
+        assert store.get(handle) == [1]
+
+    def test_lru_eviction_by_entries(self):
+        store = ResultStore(max_entries=2)
+        first = store.put([1], "[1]")
+        second = store.put([2], "[2]")
+        store.get(first)
+        store.put([3], "[3]")
+        assert store.get(first) == [1]
+        with pytest.raises(KeyError):
+            store.get(second)
+        assert store.counters["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        store = ResultStore(max_bytes=10)
+        first = store.put("a", "x" * 6)
+        store.put("b", "y" * 6)
+        with pytest.raises(KeyError):
+            store.get(first)
+        assert store.size_bytes == 6
+
+    def test_too_large_is_not_stored(self):
+        store = ResultStore(max_bytes=4)
+        assert store.put([1, 2], "[1,2]") is None
+        assert len(store) == 0
+
+    def test_clear(self):
+        store = ResultStore()
+        store.put([1], "[1]")
+        store.clear()
+        assert len(store) == 0
+        assert store.size_bytes == 0
+
+
+class TestFromEnv:
+    def test_defaults(self, monkeypatch):
+        for name in ("", "_MAX_ENTRIES", "_MAX_BYTES", "_TTL"):
+            monkeypatch.delenv(f"KAITEN_MCP_RESULT_STORE{name}", raising=False)
+        store = ResultStore.from_env()
+        assert store.max_entries == 32
+        assert store.ttl == 900
+
+    def test_configured(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_MCP_RESULT_STORE_MAX_ENTRIES", "4")
+        monkeypatch.setenv("KAITEN_MCP_RESULT_STORE_MAX_BYTES", "1000")
+        monkeypatch.setenv("KAITEN_MCP_RESULT_STORE_TTL", "30")
+        store = ResultStore.from_env()
+        assert (store.max_entries, store.max_bytes, store.ttl) == (4, 1000, 30.0)
+
+    @pytest.mark.parametrize("value", ["0", "false", "off"])
+    def test_disabled(self, monkeypatch, value):
+        monkeypatch.setenv("KAITEN_MCP_RESULT_STORE", value)
+        assert ResultStore.from_env() is None
+
+
+class TestSharedStore:
+    def test_created_once(self, monkeypatch):
+        monkeypatch.delenv("KAITEN_MCP_RESULT_STORE", raising=False)
+        store = get_result_store()
+        assert store is not None
+        assert get_result_store() is store
+        reset_result_store()
+        assert get_result_store() is not store
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setenv("KAITEN_MCP_RESULT_STORE", "0")
+        assert get_result_store() is None
+
+    def test_current_owner(self, monkeypatch):
+        assert current_owner() is None
+        monkeypatch.setattr(
+            result_store, "current_kaiten_credential", lambda: SimpleNamespace(id="cred-1")
+        )
+        assert current_owner() == "cred-1"
+
+
+class TestUnprojectedMark:
+    def test_taken_once_for_the_marked_result(self):
+        items, data = [{"id": 1, "title": "a"}], [{"id": 1}]
+        mark_unprojected(data, items, len)
+        unprojected = take_unprojected(data)
+        assert unprojected.items is items
+        assert unprojected.view is len
+        assert take_unprojected(data) is None
+
+    def test_other_result_clears_the_mark(self):
+        data = [{"id": 1}]
+        mark_unprojected(data, [{"id": 1, "title": "a"}], len)
+        assert take_unprojected([{"id": 1}]) is None
+        assert take_unprojected(data) is None
@@ -15,3 +15,12 @@ async def test_close_client_closes_and_clears_cached_client():
 
     client.close.assert_awaited_once()
     assert runtime._client is None
+
+
+@pytest.mark.asyncio
+async def test_close_client_closes_client_pool():
+    pool = AsyncMock()
+    with patch("kaiten_mcp.runtime._client_pool", pool):
+        await runtime.close_client()
+
+    pool.close.assert_awaited_once()
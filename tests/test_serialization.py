@@ -0,0 +1,157 @@
+"""Tests for single-pass serialization of tool results."""
+
+import json
+import math
+import random
+from dataclasses import dataclass
+from datetime import datetime
+
+import pytest
+
+from kaiten_mcp import serialization
+from kaiten_mcp.serialization import backend, dumps, prepare
+
+AVATAR = "data:image/png;base64," + "A" * 2048
+
+
+@dataclass
+class _Point:
+    x: int
+
+
+SHAPES = [
+    {},
+    [],
+    {"a": 1},
+    [1],
+    {"id": 7, "title": "Card", "tags": [], "owner": {}, "flags": [True, False, None]},
+    [[[]], [{"k": "v"}], 1.5, -3],
+    {1: "int key", "nested": {"deep": [{"x": [1, 2]}]}},
+    {"when": datetime(2025, 1, 2, 3, 4, 5), "point": _Point(1)},
+    [{"title": "Кириллица и emoji ✓"}],
+]
+
+
+class TestPrepare:
+    @pytest.mark.parametrize("data", SHAPES)
+    def test_estimate_matches_indented_json(self, data):
+        expected = json.dumps(data, ensure_ascii=False, indent=2, default=str)
+        assert prepare(data).estimated_size == len(expected)
+
+    def test_strips_without_copying_clean_containers(self):
+        clean = {"id": 2, "labels": ["a"]}
+        data = [{"id": 1, "owner": {"avatar": AVATAR, "name": "x"}, "files": [AVATAR]}, clean]
+        prepared = prepare(data)
+        assert prepared.stripped == 1
+        assert prepared.data[0]["owner"] == {"avatar": "[base64 ~2KB, omitted]", "name": "x"}
+        assert prepared.data[0]["files"] is data[0]["files"]
+        assert prepared.data[1] is clean
+        assert data[0]["owner"]["avatar"] == AVATAR  # the input is not modified
+
+    def test_clean_input_is_returned_as_is(self):
+        data = [{"id": i, "tags": [{"name": "t"}]} for i in range(3)]
+        assert prepare(data).data is data
+        assert prepare(data, size_limit=0).data is data
+
+    def test_estimate_accounts_for_placeholders(self):
+        data = {"avatar": AVATAR}
+        stripped = {"avatar": "[base64 ~2KB, omitted]"}
+        assert prepare(data).estimated_size == len(json.dumps(stripped, indent=2))
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            [
+                {"id": i, "owner": {"avatar": AVATAR, "meta": {}}, "files": [[AVATAR], ["a", 1]]}
+                for i in range(50)
+            ],
+            [[{"avatar": AVATAR}], [1, "plain", [2]]] * 25,
+        ],
+    )
+    def test_size_limit_stops_estimating_but_keeps_stripping(self, data):
+        full = prepare(data)
+        limited = prepare(data, size_limit=100)
+        assert 100 < limited.estimated_size < full.estimated_size
+        assert limited.stripped == full.stripped > 0
+        assert limited.data == full.data
+
+    def test_primitives_are_left_alone(self):
+        assert prepare(AVATAR).data == AVATAR
+        assert prepare(AVATAR).stripped == 0
+
+    @pytest.mark.parametrize("size_limit", [math.inf, 0])
+    def test_data_uris_directly_in_lists_are_kept(self, size_limit):
+        # Only object fields are stripped, as the per-field strip_base64 always did
+        data = {"b": [1, AVATAR, [AVATAR]], "c": [{"d": AVATAR}]}
+        prepared = prepare(data, size_limit=size_limit)
+        assert prepared.stripped == 1
+        assert prepared.data["b"] is data["b"]
+        assert prepared.data["c"] == [{"d": "[base64 ~2KB, omitted]"}]
+        assert prepare([AVATAR], size_limit=size_limit).data == [AVATAR]
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_strips_like_the_original_strip_base64(self, seed):
+        data = _random_value(random.Random(seed), 5)
+        expected = _reference_strip(data)
+        for size_limit in (math.inf, 0):
+            prepared = prepare(data, size_limit=size_limit)
+            assert (prepared.data, prepared.stripped) == expected
+
+
+def _random_value(rng, depth):
+    choice = rng.randrange(6 if depth else 3)
+    if choice == 0:
+        return rng.choice([AVATAR, "data:x", "plain", "", "data"])
+    if choice == 1:
+        return rng.choice([None, True, 1, 2.5])
+    if choice == 2:
+        return rng.choice([AVATAR, "text", 0])
+    if choice in (3, 4):
+        return {f"k{i}": _random_value(rng, depth - 1) for i in range(rng.randrange(4))}
+    return [_random_value(rng, depth - 1) for _ in range(rng.randrange(4))]
+
+
+def _reference_strip(data):
+    """The original recursive strip_base64: data URIs in object fields only."""
+    count = [0]
+
+    def strip(value, in_dict):
+        if isinstance(value, str) and in_dict and value.startswith("data:"):
+            count[0] += 1
+            return f"[base64 ~{len(value) // 1024}KB, omitted]"
+        if isinstance(value, dict):
+            return {key: strip(item, True) for key, item in value.items()}
+        if isinstance(value, list):
+            return [strip(item, False) for item in value]
+        return value
+
+    return strip(data, False), count[0]
+
+
+class TestDumps:
+    @pytest.mark.parametrize("json_backend", ["orjson", "stdlib"])
+    @pytest.mark.parametrize("data", SHAPES)
+    def test_matches_stdlib_output(self, monkeypatch, json_backend, data):
+        monkeypatch.setenv("KAITEN_MCP_JSON_BACKEND", json_backend)
+        assert dumps(data, indent=True) == json.dumps(
+            data, ensure_ascii=False, indent=2, default=str
+        )
+        assert dumps(data, indent=False) == json.dumps(
+            data, ensure_ascii=False, separators=(",", ":"), default=str
+        )
+
+    def test_backend_selection(self, monkeypatch):
+        monkeypatch.delenv("KAITEN_MCP_JSON_BACKEND", raising=False)
+        assert backend() == ("stdlib" if serialization.orjson is None else "orjson")
+        monkeypatch.setenv("KAITEN_MCP_JSON_BACKEND", "stdlib")
+        assert backend() == "stdlib"
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.delenv("KAITEN_MCP_JSON_BACKEND", raising=False)
+        monkeypatch.setattr(serialization, "orjson", None)
+        assert backend() == "stdlib"
+        assert dumps({"a": [1]}, indent=False) == '{"a":[1]}'
+
+    def test_falls_back_to_stdlib_for_big_integers(self, monkeypatch):
+        monkeypatch.delenv("KAITEN_MCP_JSON_BACKEND", raising=False)
+        assert dumps({"n": 2**70}, indent=False) == '{"n":1180591620717411303424}'
@@ -0,0 +1,196 @@
+"""Tests for per-call tracing spans and the local JSONL exporter."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+import respx
+
+from kaiten_mcp import tracing
+from kaiten_mcp.client import KaitenClient
+from kaiten_mcp.server import call_tool
+from kaiten_mcp.tools.compact import compact_response
+from kaiten_mcp.tools.pagination import fetch_all_pages
+
+BASE_URL = "https://test-company.kaiten.ru/api/latest"
+
+
+@pytest.fixture(autouse=True)
+def _reset_tracing():
+    yield
+    tracing.configure(None)
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    tracing.configure(str(path))
+    return path
+
+
+def _spans(path):
+    spans = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        [resource] = json.loads(line)["resourceSpans"]
+        [scope] = resource["scopeSpans"]
+        spans.extend(scope["spans"])
+    return spans
+
+
+def _attributes(span):
+    return {item["key"]: item["value"] for item in span["attributes"]}
+
+
+class TestSpans:
+    def test_disabled_returns_shared_noop(self):
+        tracing.configure(None)
+        assert not tracing.enabled()
+        with tracing.span("anything", x=1) as span:
+            span.set_attribute("y", 2)
+            span.set_error("ignored")
+        assert span is tracing.span("other")
+
+    def test_lazily_configured_from_env(self, monkeypatch, tmp_path):
+        path = tmp_path / "env.jsonl"
+        monkeypatch.setenv("KAITEN_MCP_TRACE_FILE", str(path))
+        monkeypatch.setenv("KAITEN_MCP_TRACE_MAX_BYTES", "2048")
+        monkeypatch.setenv("KAITEN_MCP_TRACE_BACKUPS", "1")
+        monkeypatch.setattr(tracing, "_configured", False)
+        assert tracing.enabled()
+        assert tracing._exporter is not None
+        assert tracing._exporter.path == str(path)
+        assert tracing._exporter._handler.maxBytes == 2048
+
+    def test_writes_otlp_json_lines(self, trace_file):
+        with tracing.span("outer", tool="t", count=3, ratio=0.5, ok=True) as span:
+            span.set_attribute("extra", None)
+        [record] = trace_file.read_text(encoding="utf-8").splitlines()
+        resource = json.loads(record)["resourceSpans"][0]
+        assert resource["resource"]["attributes"] == [
+            {"key": "service.name", "value": {"stringValue": "kaiten-mcp"}}
+        ]
+        [otlp] = resource["scopeSpans"][0]["spans"]
+        assert otlp["name"] == "outer"
+        assert len(otlp["traceId"]) == 32
+        assert len(otlp["spanId"]) == 16
+        assert "parentSpanId" not in otlp
+        assert int(otlp["endTimeUnixNano"]) >= int(otlp["startTimeUnixNano"]) > 0
+        assert otlp["status"] == {"code": 1}
+        assert _attributes(otlp) == {
+            "tool": {"stringValue": "t"},
+            "count": {"intValue": "3"},
+            "ratio": {"doubleValue": 0.5},
+            "ok": {"boolValue": True},
+            "extra": {"stringValue": "None"},
+        }
+
+    async def test_children_share_trace_and_link_to_parent(self, trace_file):
+        async def child(name):
+            with tracing.span(name):
+                await asyncio.sleep(0)
+
+        with tracing.span("root"):
+            await asyncio.gather(child("a"), child("b"))
+        with tracing.span("second"):
+            pass
+        spans = {span["name"]: span for span in _spans(trace_file)}
+        root = spans["root"]
+        for name in ("a", "b"):
+            assert spans[name]["traceId"] == root["traceId"]
+            assert spans[name]["parentSpanId"] == root["spanId"]
+        assert spans["second"]["traceId"] != root["traceId"]
+
+    def test_exception_marks_span_as_error(self, trace_file):
+        with pytest.raises(ValueError, match="bad input"), tracing.span("boom"):
+            raise ValueError("bad input")
+        with tracing.span("explicit") as span:
+            span.set_error("tool failed")
+        spans = {span["name"]: span for span in _spans(trace_file)}
+        assert spans["boom"]["status"] == {"code": 2, "message": "ValueError: bad input"}
+        assert spans["explicit"]["status"] == {"code": 2, "message": "tool failed"}
+
+    def test_rotates_by_size(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        tracing.configure(str(path), max_bytes=1024, backups=2)
+        for i in range(50):
+            with tracing.span("s", i=i):
+                pass
+        assert path.stat().st_size <= 1024
+        assert (tmp_path / "spans.jsonl.1").exists()
+        assert (tmp_path / "spans.jsonl.2").exists()
+        assert not (tmp_path / "spans.jsonl.3").exists()
+
+    def test_traced_decorator(self, trace_file):
+        data = {"id": 1, "owner": {"id": 2, "full_name": "A", "avatar_url": "x"}}
+        expected = compact_response(data, compact=True)
+        tracing.configure(None)
+        assert compact_response(data, compact=True) == expected
+        tracing.configure(str(trace_file))
+        assert [span["name"] for span in _spans(trace_file)] == ["compact_response"]
+
+
+class TestInstrumentation:
+    @respx.mock
+    async def test_tool_call_spans(self, trace_file):
+        respx.get(f"{BASE_URL}/spaces").mock(
+            side_effect=[
+                httpx.Response(429, headers={"Retry-After": "0"}),
+                httpx.Response(200, json=[{"id": 1}]),
+            ]
+        )
+        client = KaitenClient(domain="test-company", token="test-token")
+        with patch("kaiten_mcp.runtime._client", client):
+            result = await call_tool("kaiten_list_spaces", {})
+        assert not result.isError
+        spans = _spans(trace_file)
+        by_name = {}
+        for span in spans:
+            by_name.setdefault(span["name"], []).append(span)
+        [root] = by_name["call_tool"]
+        [request] = by_name["kaiten.request"]
+        attempts = by_name["http.attempt"]
+        assert {span["traceId"] for span in spans} == {root["traceId"]}
+        assert request["parentSpanId"] == root["spanId"]
+        assert _attributes(request) == {
+            "method": {"stringValue": "GET"},
+            "path": {"stringValue": "/spaces"},
+            "status_code": {"intValue": "200"},
+        }
+        assert [_attributes(span)["status_code"]["intValue"] for span in attempts] == [
+            "429",
+            "200",
+        ]
+        assert all(span["parentSpanId"] == request["spanId"] for span in attempts)
+        assert len(by_name["rate_limit.wait"]) == 2
+        [serialize] = by_name["serialize"]
+        assert serialize["parentSpanId"] == root["spanId"]
+        assert int(_attributes(serialize)["bytes"]["intValue"]) > 0
+        assert _attributes(root) == {"tool": {"stringValue": "kaiten_list_spaces"}}
+
+    async def test_page_spans(self, trace_file):
+        client = AsyncMock()
+        client.get.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}]]
+        with tracing.span("scan"):
+            items = await fetch_all_pages(
+                client, "/cards", page_size=2, max_pages=5, concurrency=1
+            )
+        assert len(items) == 3
+        pages = [span for span in _spans(trace_file) if span["name"] == "page"]
+        assert [
+            (_attributes(span)["offset"]["intValue"], _attributes(span)["items"]["intValue"])
+            for span in pages
+        ] == [("0", "2"), ("2", "1")]
+
+    @respx.mock
+    async def test_failed_tool_call_span_is_error(self, trace_file):
+        respx.get(f"{BASE_URL}/spaces").mock(return_value=httpx.Response(404, json={}))
+        client = KaitenClient(domain="test-company", token="test-token")
+        with patch("kaiten_mcp.runtime._client", client):
+            result = await call_tool("kaiten_list_spaces", {})
+        assert result.isError
+        spans = {span["name"]: span for span in _spans(trace_file)}
+        assert spans["call_tool"]["status"]["code"] == 2
+        assert spans["call_tool"]["status"]["message"].startswith("Kaiten API Error 404")
+        assert spans["kaiten.request"]["status"]["code"] == 2